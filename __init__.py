@@ -1 +1,26 @@
-from chains.src import Chains, Branch, Request, Response, RequestHandler
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from chains.src import (
+        Chains, ChainsASGI, Branch, StaticBranch, Metrics, PrometheusBranch, Profiler, BackgroundTasks, Request, Response,
+        RequestHandler
+    )
+
+__all__ = [
+    "Chains", "ChainsASGI", "Branch", "StaticBranch", "Metrics", "PrometheusBranch", "Profiler", "BackgroundTasks", "Request",
+    "Response", "RequestHandler"
+]
+
+def __getattr__(name: str) -> Any:
+    # Resolved lazily by chains.src, see chains/src/__init__.py
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from chains import src
+    value: Any = getattr(src, name)
+    globals()[name] = value
+    return value
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
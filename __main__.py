@@ -0,0 +1,3 @@
+from chains.src.runner import main
+
+main()
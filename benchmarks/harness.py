@@ -0,0 +1,100 @@
+# Shared helpers for the benchmarks that drive the WSGI callable directly:
+# synthetic environs, timing of individual calls, JSON results and comparisons
+# against a stored baseline.
+from __future__ import annotations
+
+import json
+from io import BytesIO
+from platform import python_implementation, python_version
+from time import perf_counter_ns
+from typing import Any, Callable, Iterable
+
+
+
+def make_environ(
+    path: str,
+    method: str = "GET",
+    headers: dict[str, str]|None = None,
+    body: bytes = b"",
+    query_string: str = ""
+) -> dict[str, Any]:
+    environ: dict[str, Any] = {
+        "REQUEST_METHOD": method,
+        "PATH_INFO": path,
+        "QUERY_STRING": query_string,
+        "SERVER_NAME": "localhost",
+        "SERVER_PORT": "80",
+        "SERVER_PROTOCOL": "HTTP/1.1",
+        "CONTENT_LENGTH": str(len(body)) if len(body) > 0 else "",
+        "CONTENT_TYPE": "application/octet-stream" if len(body) > 0 else "",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": "http",
+        "wsgi.input": BytesIO(body),
+        "wsgi.errors": None,
+        "wsgi.multithread": False,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False
+    }
+    for name, value in (headers if headers is not None else dict()).items():
+        environ[f"HTTP_{name.upper().replace('-', '_')}"] = value
+    return environ
+
+def start_response(status: str, headers: list[tuple[str, str]], exc_info: Any = None) -> Callable[[bytes], None]:
+    return lambda data: None
+
+def call(application: Callable, environ: dict[str, Any]) -> None:
+    # Does what a WSGI server does with the response
+    response_iterable: Iterable[bytes] = application(environ, start_response)
+    try:
+        for _ in response_iterable:
+            pass
+    finally:
+        if hasattr(response_iterable, "close"):
+            response_iterable.close()
+    return None
+
+def run(application: Callable, environs: Callable[[], dict[str, Any]], iterations: int, warmup: int = 500) -> dict[str, float]:
+    for _ in range(warmup):
+        call(application, environs())
+    # The environs are built before timing since they're the server's work
+    prepared: list[dict[str, Any]] = [environs() for _ in range(iterations)]
+    latencies: list[int] = [0] * iterations
+    started: int = perf_counter_ns()
+    for i, environ in enumerate(prepared):
+        start: int = perf_counter_ns()
+        call(application, environ)
+        latencies[i] = perf_counter_ns() - start
+    elapsed: int = perf_counter_ns() - started
+    latencies.sort()
+    return {
+        "ops_per_sec": iterations / (elapsed / 1_000_000_000),
+        "p50_us": latencies[int(iterations * 0.50)] / 1_000,
+        "p99_us": latencies[min(int(iterations * 0.99), iterations - 1)] / 1_000
+    }
+
+def save(results: dict[str, dict[str, float]], path: str) -> None:
+    with open(path, "w") as file:
+        json.dump({
+            "python": f"{python_implementation()} {python_version()}",
+            "results": results
+        }, file, indent=2, sort_keys=True)
+    return None
+
+def load(path: str) -> dict[str, dict[str, float]]:
+    with open(path) as file:
+        return json.load(file)["results"]
+
+def compare(results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], threshold: float) -> list[str]:
+    # Returns the benchmarks whose throughput dropped, or whose median latency
+    # rose, by more than the threshold (a fraction) compared to the baseline
+    regressions: list[str] = list()
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        throughput_change: float = result["ops_per_sec"] / baseline[name]["ops_per_sec"] - 1
+        latency_change: float = result["p50_us"] / baseline[name]["p50_us"] - 1
+        if throughput_change < -threshold or latency_change > threshold:
+            regressions.append(
+                f"{name}: {throughput_change:+.1%} ops/sec, {latency_change:+.1%} p50 latency"
+            )
+    return regressions
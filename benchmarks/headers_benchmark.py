@@ -0,0 +1,65 @@
+# Microbenchmarks setting, getting and serializing (for start_response) 5, 20
+# and 100 headers with HeadersV1_1 and CompactHeadersV1_1. The response column
+# is what a response goes through, its headers are set, read once and serialized.
+#
+# The repository is expected to be cloned as a directory named 'chains' (see
+# the README), run this script with: python chains/benchmarks/headers_benchmark.py
+import sys
+from pathlib import Path
+from timeit import timeit
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from chains.src.header import IHeaders, HeadersV1_1, CompactHeadersV1_1
+
+
+
+HEADER_COUNTS: tuple[int, ...] = (5, 20, 100)
+REPETITIONS: int = 2_000
+
+
+
+def set_headers(headers: IHeaders, names: list[str]) -> None:
+    for name in names:
+        headers.set_single_value_header(name=name, value="value")
+
+def get_headers(headers: IHeaders, names: list[str]) -> None:
+    for name in names:
+        headers.get_single_value_header(name=name)
+
+def serialize_headers(headers: IHeaders) -> None:
+    # This is what the WSGI adapter has to produce for start_response
+    headers.header_list()
+
+def response_headers(headers_class: type[IHeaders], names: list[str]) -> None:
+    headers: IHeaders = headers_class()
+    set_headers(headers=headers, names=names)
+    get_headers(headers=headers, names=names)
+    serialize_headers(headers=headers)
+
+def measure(function: Callable[[], None]) -> float:
+    return timeit(function, number=REPETITIONS) / REPETITIONS * 1_000_000
+
+
+
+def main() -> None:
+    print(f"{'headers':>8} {'class':>20} {'set (us)':>10} {'get (us)':>10} {'serialize (us)':>15} {'response (us)':>14}")
+    for header_count in HEADER_COUNTS:
+        names: list[str] = [f"X-Header-{i}" for i in range(header_count)]
+        for headers_class in (HeadersV1_1, CompactHeadersV1_1):
+            set_latency: float = measure(lambda: set_headers(headers=headers_class(), names=names))
+            headers: IHeaders = headers_class()
+            set_headers(headers=headers, names=names)
+            get_latency: float = measure(lambda: get_headers(headers=headers, names=names))
+            serialize_latency: float = measure(lambda: serialize_headers(headers=headers))
+            response_latency: float = measure(lambda: response_headers(headers_class=headers_class, names=names))
+            print(
+                f"{header_count:>8} {headers_class.__name__:>20} {set_latency:>10.2f} "
+                f"{get_latency:>10.2f} {serialize_latency:>15.2f} {response_latency:>14.2f}"
+            )
+
+
+
+if __name__ == "__main__":
+    main()
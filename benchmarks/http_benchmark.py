@@ -0,0 +1,193 @@
+# Serves an application over HTTP and measures it end to end with client
+# processes that send requests over keep-alive connections, reporting the
+# throughput (ops/sec) and the p50/p99 latency of every scenario:
+#   - concurrency: 1, 8 and 64 connections sending one request at a time
+#   - pipelining: 8 connections with 1, 4 and 16 requests in flight each
+#
+# The bundled server is used by default, '--server wsgiref' serves the same
+# application with the wsgiref server of the standard library, which closes the
+# connection after every response, for comparison.
+#
+# The repository is expected to be cloned as a directory named 'chains' (see
+# the README), run this script with:
+#   python chains/benchmarks/http_benchmark.py --output results.json
+#   python chains/benchmarks/http_benchmark.py --server wsgiref
+import sys
+from argparse import ArgumentParser, Namespace
+from multiprocessing import Pool
+from pathlib import Path
+from socket import create_connection, socket
+from threading import Thread
+from time import perf_counter_ns
+from typing import Any, Callable
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from chains import Chains, Request, Response
+from chains.benchmarks.harness import save
+
+
+
+REQUEST: bytes = b"GET /users/42 HTTP/1.1\r\nHost: localhost\r\nUser-Agent: http_benchmark\r\n\r\n"
+
+
+
+def make_app() -> Chains:
+    application: Chains = Chains()
+
+    @application.route(path="/users/<>", method="GET")
+    def get_user(request: Request) -> Response:
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = b'{"id": 42, "name": "chains"}'
+        response.headers.set_single_value_header(
+            name="Content-Type", value="application/json"
+        ).set_single_value_header(
+            name="Content-Length", value=len(response.body)
+        )
+        return response
+    return application.freeze()
+
+class QuietRequestHandler(WSGIRequestHandler):
+
+    def log_message(self, format: str, *args: Any) -> None:
+        return None
+
+def start_server(server_name: str, threads: int) -> tuple[tuple[str, int], Callable[[], None]]:
+    # Returns the address of the server and a function that stops it
+    application: Chains = make_app()
+    if server_name == "wsgiref":
+        server = make_server("127.0.0.1", 0, application, handler_class=QuietRequestHandler)
+    else:
+        from chains.src.server import HTTPServer
+        server = HTTPServer(app=application, port=0, threads=threads)
+    thread: Thread = Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def stop() -> None:
+        server.shutdown()
+        thread.join()
+    return server.server_address[:2], stop
+
+
+
+def read_response(client: socket, buffer: bytearray) -> bool:
+    # Reads one response from the connection, returns whether it can be reused
+    while True:
+        end: int = buffer.find(b"\r\n\r\n")
+        if end >= 0:
+            break
+        chunk: bytes = client.recv(65536)
+        if len(chunk) < 1:
+            raise ConnectionError("The server closed the connection")
+        buffer += chunk
+    head: str = buffer[:end].decode("latin-1").lower()
+    del buffer[:end + 4]
+    content_length: int|None = None
+    for line in head.split("\r\n")[1:]:
+        name, _, value = line.partition(":")
+        if name == "content-length":
+            content_length = int(value)
+    keep_alive: bool = head.startswith("http/1.1") and "connection: close" not in head
+    if content_length is None:
+        # Read to the end of the connection
+        while len(client.recv(65536)) > 0:
+            pass
+        return False
+    while len(buffer) < content_length:
+        chunk = client.recv(65536)
+        if len(chunk) < 1:
+            raise ConnectionError("The server closed the connection")
+        buffer += chunk
+    del buffer[:content_length]
+    return keep_alive
+
+def run_client(address: tuple[str, int], requests: int, depth: int) -> list[int]:
+    latencies: list[int] = list()
+    client: socket|None = None
+    buffer: bytearray = bytearray()
+    while len(latencies) < requests:
+        if client is None:
+            client = create_connection(address)
+            buffer.clear()
+        batch: int = min(depth, requests - len(latencies))
+        start: int = perf_counter_ns()
+        client.sendall(REQUEST * batch)
+        keep_alive: bool = True
+        for _ in range(batch):
+            keep_alive = read_response(client, buffer)
+            latencies.append(perf_counter_ns() - start)
+            if not keep_alive:
+                break
+        if not keep_alive:
+            client.close()
+            client = None
+    if client is not None:
+        client.close()
+    return latencies
+
+def run(address: tuple[str, int], connections: int, depth: int, requests: int) -> dict[str, float]:
+    per_connection: int = max(requests // connections, depth)
+    with Pool(processes=connections) as pool:
+        # A short warmup so the connections and the server threads exist before timing
+        pool.starmap(run_client, [(address, depth * 10, depth)] * connections)
+        started: int = perf_counter_ns()
+        results: list[list[int]] = pool.starmap(run_client, [(address, per_connection, depth)] * connections)
+        elapsed: int = perf_counter_ns() - started
+    latencies: list[int] = sorted(latency for result in results for latency in result)
+    return {
+        "ops_per_sec": len(latencies) / (elapsed / 1_000_000_000),
+        "p50_us": latencies[int(len(latencies) * 0.50)] / 1_000,
+        "p99_us": latencies[min(int(len(latencies) * 0.99), len(latencies) - 1)] / 1_000
+    }
+
+SCENARIOS: dict[str, tuple[tuple[int, int], ...]] = {
+    "concurrency": ((1, 1), (8, 1), (64, 1)),
+    "pipelining": ((8, 1), (8, 4), (8, 16))
+}
+
+
+
+def parse_arguments() -> Namespace:
+    parser: ArgumentParser = ArgumentParser(description="Benchmarks a Chains application served over HTTP")
+    parser.add_argument("--server", default="chains", choices=("chains", "wsgiref"), help="the server to use")
+    parser.add_argument("--threads", type=int, default=16, help="worker threads of the bundled server")
+    parser.add_argument("--requests", type=int, default=20_000, help="requests per benchmark")
+    parser.add_argument("--only", action="append", default=None, choices=list(SCENARIOS), help="run only these scenarios")
+    parser.add_argument("--output", default=None, help="save the results to this JSON file")
+    return parser.parse_args()
+
+def main() -> int:
+    arguments: Namespace = parse_arguments()
+    address, stop = start_server(
+        server_name=arguments.server,
+        threads=arguments.threads
+    )
+    results: dict[str, dict[str, float]] = dict()
+    print(f"{'benchmark':>28} {'ops/sec':>12} {'p50 (us)':>10} {'p99 (us)':>10}")
+    try:
+        for scenario_name, parameters in SCENARIOS.items():
+            if arguments.only is not None and scenario_name not in arguments.only:
+                continue
+            for connections, depth in parameters:
+                if depth > 1 and arguments.server == "wsgiref":
+                    # Pipelined requests are lost when wsgiref closes the connection
+                    continue
+                name: str = f"{scenario_name}[{connections if scenario_name == 'concurrency' else depth}]"
+                results[name] = run(
+                    address=address,
+                    connections=connections,
+                    depth=depth,
+                    requests=arguments.requests
+                )
+                print(f"{name:>28} {results[name]['ops_per_sec']:>12.0f} {results[name]['p50_us']:>10.2f} {results[name]['p99_us']:>10.2f}")
+    finally:
+        stop()
+    if arguments.output is not None:
+        save(results=results, path=arguments.output)
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit(main())
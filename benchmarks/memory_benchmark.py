@@ -0,0 +1,133 @@
+# Measures the memory used per request by the WSGI adapter with tracemalloc,
+# with and without a request pool.
+#
+# Two numbers are reported per configuration:
+#   - retained: bytes held per in-flight request, the route keeps every request
+#     and response alive and the response iterables aren't closed until the
+#     measurement is taken, like a server with that many concurrent requests.
+#   - peak: the peak bytes traced while serving requests one after the other,
+#     closing each response iterable like a WSGI server would.
+#
+# Only the WSGI callable is used, so the script can be run against older
+# versions of the package to get the numbers from before a change.
+#
+# The repository is expected to be cloned as a directory named 'chains' (see
+# the README), run this script with: python chains/benchmarks/memory_benchmark.py
+import sys
+import tracemalloc
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from chains import Chains, Request, Response
+
+
+
+REQUESTS: int = 5_000
+POOL_SIZE: int = 64
+
+
+
+def make_app(held: list[Any]|None, request_pool_size: int|None) -> Chains:
+    try:
+        app: Chains = Chains(request_pool_size=request_pool_size) if request_pool_size is not None else Chains()
+    except TypeError:
+        # Versions without request pools
+        return None
+
+    @app.route("/users/profile", "GET")
+    def profile(request: Request) -> Response:
+        request.headers.get_single_value_header(name="Accept")
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = b"profile"
+        response.headers.set_single_value_header(
+            name="Content-Type", value="text/plain"
+        ).set_single_value_header(
+            name="Content-Length", value=len(response.body)
+        )
+        if held is not None:
+            held.append((request, response))
+        return response
+    if hasattr(app, "freeze"):
+        app.freeze()
+    return app
+
+def make_environ() -> dict[str, Any]:
+    return {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": "/users/profile",
+        "CONTENT_LENGTH": "",
+        "CONTENT_TYPE": "",
+        "HTTP_HOST": "localhost",
+        "HTTP_ACCEPT": "text/plain",
+        "HTTP_USER_AGENT": "memory-benchmark",
+        "wsgi.input": BytesIO(b"")
+    }
+
+def start_response(status: str, headers: list[tuple[str, str]]) -> None:
+    return None
+
+def call(app: Chains, environ: dict[str, Any]) -> Any:
+    response_iterable: Any = app(environ, start_response)
+    for _ in response_iterable:
+        pass
+    return response_iterable
+
+def measure_retained(request_pool_size: int|None) -> float|None:
+    held: list[Any] = list()
+    app: Chains|None = make_app(held=held, request_pool_size=request_pool_size)
+    if app is None:
+        return None
+    # The environs are built up front, they belong to the server and not to the request
+    environs: list[dict[str, Any]] = [make_environ() for _ in range(REQUESTS)]
+    call(app=app, environ=make_environ())
+    held.clear()
+    iterables: list[Any] = [None] * REQUESTS
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    for i, environ in enumerate(environs):
+        iterables[i] = call(app=app, environ=environ)
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    for response_iterable in iterables:
+        getattr(response_iterable, "close", lambda: None)()
+    return (after - before) / REQUESTS
+
+def measure_peak(request_pool_size: int|None) -> float|None:
+    app: Chains|None = make_app(held=None, request_pool_size=request_pool_size)
+    if app is None:
+        return None
+    environs: list[dict[str, Any]] = [make_environ() for _ in range(REQUESTS)]
+    getattr(call(app=app, environ=make_environ()), "close", lambda: None)()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    for environ in environs:
+        getattr(call(app=app, environ=environ), "close", lambda: None)()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return float(peak - before)
+
+def report(name: str, function: Callable[[int|None], float|None], request_pool_size: int|None) -> None:
+    result: float|None = function(request_pool_size)
+    if result is None:
+        print(f"{name:>32} {'not supported':>14}")
+        return None
+    print(f"{name:>32} {result:>14.0f}")
+    return None
+
+
+
+def main() -> None:
+    print(f"{'measurement':>32} {'bytes':>14}")
+    report(name="retained per request", function=measure_retained, request_pool_size=None)
+    report(name="retained per request (pooled)", function=measure_retained, request_pool_size=POOL_SIZE)
+    report(name="peak, sequential", function=measure_peak, request_pool_size=None)
+    report(name="peak, sequential (pooled)", function=measure_peak, request_pool_size=POOL_SIZE)
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# Measures the per-layer overhead of middleware, before freezing (linked
+# MiddlewareHandlerV1_1 objects) and after freezing (pre-composed chains).
+#
+# The repository is expected to be cloned as a directory named 'chains' (see
+# the README), run this script with: python chains/benchmarks/middleware_benchmark.py
+import sys
+from pathlib import Path
+from time import perf_counter_ns
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from chains import Chains, Branch, Request, Response, RequestHandler
+
+
+
+MIDDLEWARE_DEPTHS: tuple[int, ...] = (0, 1, 5, 10)
+ITERATIONS: int = 50_000
+
+
+
+def route_function(request: Request) -> Response:
+    return Response(status_code=200, status_text="OK")
+
+def passthrough_middleware(request: Request, next: RequestHandler) -> Response:
+    return next(request)
+
+def passthrough_middleware_with_dependencies(request: Request, next: RequestHandler, limit: int, name: str) -> Response:
+    return next(request)
+
+def build_application(middleware_depth: int, with_dependencies: bool) -> Chains:
+    application: Chains = Chains()
+    branch: Branch = Branch()
+    branch.route(path="/resource", method="GET")(route_function)
+    for i in range(middleware_depth):
+        target: Branch = application if i % 2 == 0 else branch
+        if with_dependencies:
+            target.middleware(limit=i, name="dependency")(passthrough_middleware_with_dependencies)
+        else:
+            target.middleware()(passthrough_middleware)
+    application.add_branch(path="/branch", branch=branch)
+    return application
+
+def measure(application: Chains) -> float:
+    requests: list[Request] = [
+        Request(method="GET", path="/branch/resource")
+        for _ in range(ITERATIONS)
+    ]
+    handle_request = application.handle_request
+    start: int = perf_counter_ns()
+    for request in requests:
+        handle_request(request)
+    return (perf_counter_ns() - start) / ITERATIONS / 1_000
+
+
+
+def main() -> None:
+    for with_dependencies in (False, True):
+        print(f"middleware {'with' if with_dependencies else 'without'} dependencies")
+        print(f"{'depth':>8} {'linked (us)':>13} {'frozen (us)':>13}")
+        latencies: dict[int, tuple[float, float]] = dict()
+        for middleware_depth in MIDDLEWARE_DEPTHS:
+            application: Chains = build_application(
+                middleware_depth=middleware_depth,
+                with_dependencies=with_dependencies
+            )
+            linked_latency: float = measure(application=application)
+            application.freeze()
+            frozen_latency: float = measure(application=application)
+            latencies[middleware_depth] = (linked_latency, frozen_latency)
+            print(f"{middleware_depth:>8} {linked_latency:>13.2f} {frozen_latency:>13.2f}")
+        deepest: int = MIDDLEWARE_DEPTHS[-1]
+        linked_per_layer: float = (latencies[deepest][0] - latencies[0][0]) / deepest
+        frozen_per_layer: float = (latencies[deepest][1] - latencies[0][1]) / deepest
+        print(f"{'per layer':>8} {linked_per_layer:>13.3f} {frozen_per_layer:>13.3f}\n")
+
+
+
+if __name__ == "__main__":
+    main()
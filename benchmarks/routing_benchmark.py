@@ -0,0 +1,77 @@
+# Measures the dispatch latency of the recursive RouteTable walk against the
+# frozen, precompiled router (with and without the route resolution cache)
+# for applications with 10, 1k and 10k routes.
+#
+# The repository is expected to be cloned as a directory named 'chains' (see
+# the README), run this script with: python chains/benchmarks/routing_benchmark.py
+import sys
+from pathlib import Path
+from time import perf_counter_ns
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from chains import Chains, Branch, Request, Response
+
+
+
+ROUTE_COUNTS: tuple[int, ...] = (10, 1_000, 10_000)
+BRANCH_COUNT: int = 10
+ROUTE_CACHE_SIZE: int = 512
+ITERATIONS: int = 20_000
+
+
+
+def route_function(request: Request) -> Response:
+    return Response(status_code=200, status_text="OK")
+
+def build_application(route_count: int) -> tuple[Chains, list[str]]:
+    application: Chains = Chains()
+    branches: list[Branch] = [Branch() for _ in range(BRANCH_COUNT)]
+    sample_paths: list[str] = list()
+    for i in range(route_count):
+        branch_number: int = i % BRANCH_COUNT
+        if i % 4 == 0:
+            route_path: str = f"/resource{i}/items/<>"
+            request_path: str = f"/branch{branch_number}/resource{i}/items/{i}"
+        else:
+            route_path: str = f"/resource{i}/items"
+            request_path: str = f"/branch{branch_number}/resource{i}/items"
+        branches[branch_number].route(path=route_path, method="GET")(route_function)
+        sample_paths.append(request_path)
+    for branch_number, branch in enumerate(branches):
+        application.add_branch(path=f"/branch{branch_number}", branch=branch)
+    step: int = max(1, route_count // 100)
+    return application, sample_paths[::step]
+
+def measure(application: Chains, sample_paths: list[str]) -> float:
+    requests: list[Request] = [
+        Request(method="GET", path=sample_paths[i % len(sample_paths)])
+        for i in range(ITERATIONS)
+    ]
+    handle_request = application.handle_request
+    start: int = perf_counter_ns()
+    for request in requests:
+        handle_request(request)
+    return (perf_counter_ns() - start) / ITERATIONS / 1_000
+
+
+
+def main() -> None:
+    print(f"{'routes':>8} {'recursive (us)':>16} {'frozen (us)':>14} {'cached (us)':>14} {'speedup':>9}")
+    for route_count in ROUTE_COUNTS:
+        application, sample_paths = build_application(route_count=route_count)
+        recursive_latency: float = measure(application=application, sample_paths=sample_paths)
+        application.freeze()
+        frozen_latency: float = measure(application=application, sample_paths=sample_paths)
+        cached_application, sample_paths = build_application(route_count=route_count)
+        cached_application.freeze(route_cache_size=ROUTE_CACHE_SIZE)
+        cached_latency: float = measure(application=cached_application, sample_paths=sample_paths)
+        print(
+            f"{route_count:>8} {recursive_latency:>16.2f} {frozen_latency:>14.2f} {cached_latency:>14.2f} "
+            f"{recursive_latency / frozen_latency:>8.2f}x"
+        )
+
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+# Measures how long a fresh process takes to get an application with 1k routes
+# to its first response, in phases:
+#   - import: importing the package and the names the application uses
+#   - register: adding the routes
+#   - freeze: freezing the application
+#   - first_response: serving the first request through the WSGI callable
+#   - process: the wall time of the whole process, interpreter startup included
+#
+# Every run is a new interpreter, the medians of the runs are reported. The
+# modules that take the longest to import, according to 'python -X importtime',
+# are listed as well.
+#
+# The repository is expected to be cloned as a directory named 'chains' (see
+# the README), run this script with:
+#   python chains/benchmarks/startup_benchmark.py --output results.json
+#   python chains/benchmarks/startup_benchmark.py --routes 10000
+import json
+import os
+import subprocess
+import sys
+from argparse import SUPPRESS, ArgumentParser, Namespace
+from pathlib import Path
+from statistics import median
+from time import perf_counter_ns
+from typing import Any
+
+ROOT: str = str(Path(__file__).resolve().parents[2])
+
+
+
+def measure_child(routes: int) -> None:
+    # Runs in the fresh interpreter, prints the duration of every phase in nanoseconds
+    timings: dict[str, int] = dict()
+    start: int = perf_counter_ns()
+    from chains import Chains, Request, Response
+    timings["import"] = perf_counter_ns() - start
+
+    start = perf_counter_ns()
+    application: Chains = Chains()
+    def get_item(request: Request) -> Response:
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = b"item"
+        return response
+    for i in range(routes):
+        application.route(path=f"/resource{i}/items/<int:item_id>", method="GET")(get_item)
+        if i % 4 == 0:
+            application.route(path=f"/resource{i}", method="GET")(get_item)
+    timings["register"] = perf_counter_ns() - start
+
+    start = perf_counter_ns()
+    application.freeze()
+    timings["freeze"] = perf_counter_ns() - start
+
+    # Imported after the package so its import isn't counted
+    from chains.benchmarks.harness import call, make_environ
+    environ: dict[str, Any] = make_environ(path=f"/resource{routes - 1}/items/7")
+    start = perf_counter_ns()
+    call(application, environ)
+    timings["first_response"] = perf_counter_ns() - start
+    print(json.dumps(timings))
+    return None
+
+def child_environment() -> dict[str, str]:
+    environment: dict[str, str] = dict(os.environ)
+    environment["PYTHONPATH"] = os.pathsep.join(
+        path for path in (ROOT, environment.get("PYTHONPATH")) if path
+    )
+    return environment
+
+def run_child(routes: int) -> dict[str, int]:
+    start: int = perf_counter_ns()
+    completed: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, __file__, "--child", "--routes", str(routes)],
+        env=child_environment(),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    elapsed: int = perf_counter_ns() - start
+    timings: dict[str, int] = json.loads(completed.stdout)
+    timings["process"] = elapsed
+    return timings
+
+def import_times(top: int) -> tuple[int, list[tuple[str, int]]]:
+    # Returns the cumulative import time of the package and the modules with the
+    # highest self time, in microseconds
+    completed: subprocess.CompletedProcess = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import chains"],
+        env=child_environment(),
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    total: int = 0
+    modules: list[tuple[str, int]] = list()
+    for line in completed.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_time, cumulative, name = (field.strip() for field in line[len("import time:"):].split("|"))
+        if not self_time.isdigit():
+            continue
+        modules.append((name, int(self_time)))
+        if name == "chains":
+            total = int(cumulative)
+    modules.sort(key=lambda module: module[1], reverse=True)
+    return total, modules[:top]
+
+
+
+def parse_arguments() -> Namespace:
+    parser: ArgumentParser = ArgumentParser(description="Benchmarks the startup of a Chains application")
+    parser.add_argument("--routes", type=int, default=1_000, help="routes of the application")
+    parser.add_argument("--runs", type=int, default=20, help="fresh processes to measure")
+    parser.add_argument("--top", type=int, default=10, help="slowest imported modules to list")
+    parser.add_argument("--output", default=None, help="save the results to this JSON file")
+    parser.add_argument("--child", action="store_true", help=SUPPRESS)
+    return parser.parse_args()
+
+def main() -> int:
+    arguments: Namespace = parse_arguments()
+    if arguments.child:
+        measure_child(arguments.routes)
+        return 0
+    runs: list[dict[str, int]] = [run_child(arguments.routes) for _ in range(arguments.runs)]
+    results: dict[str, dict[str, float]] = dict()
+    print(f"{'phase':>16} {'median (ms)':>12} {'min (ms)':>10}")
+    for phase in ("import", "register", "freeze", "first_response", "process"):
+        durations: list[int] = [run[phase] for run in runs]
+        results[phase] = {
+            "median_ms": median(durations) / 1_000_000,
+            "min_ms": min(durations) / 1_000_000
+        }
+        print(f"{phase:>16} {results[phase]['median_ms']:>12.2f} {results[phase]['min_ms']:>10.2f}")
+    total, modules = import_times(arguments.top)
+    results["importtime"] = {"chains_ms": total / 1_000}
+    print(f"\n'import chains' takes {total / 1_000:.2f} ms according to -X importtime, the slowest modules were:")
+    for name, self_time in modules:
+        print(f"{name:>48} {self_time / 1_000:>8.2f} ms")
+    if arguments.output is not None:
+        sys.path.insert(0, ROOT)
+        from chains.benchmarks.harness import save
+        save(results=results, path=arguments.output)
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit(main())
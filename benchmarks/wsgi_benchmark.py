@@ -0,0 +1,175 @@
+# Drives the WSGI callable directly with synthetic environs and reports the
+# throughput (ops/sec) and the p50/p99 latency of every scenario:
+#   - route_table_size: 10, 1k and 10k routes
+#   - path_depth: routes that are 1, 4 and 8 segments deep
+#   - wildcard_density: 0%, 50% and 100% of the path segments being wildcards
+#   - middleware_depth: 0, 5 and 10 middleware
+#   - header_count: 5, 20 and 100 request and response headers
+#   - body_size: request bodies of 0 bytes, 1KB, 64KB and 1MB echoed back
+#
+# Results can be saved as JSON and compared against a stored baseline, the
+# script exits with a non zero status when a scenario regresses by more than
+# the threshold.
+#
+# The repository is expected to be cloned as a directory named 'chains' (see
+# the README), run this script with:
+#   python chains/benchmarks/wsgi_benchmark.py --output results.json
+#   python chains/benchmarks/wsgi_benchmark.py --baseline results.json --threshold 0.1
+import sys
+from argparse import ArgumentParser, Namespace
+from pathlib import Path
+from typing import Any, Callable
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from chains import Chains, Branch, Request, Response, RequestHandler
+from chains.benchmarks.harness import make_environ, run, save, load, compare
+
+
+
+Scenario = tuple[Chains, Callable[[], dict[str, Any]]]
+
+
+
+def ok(request: Request) -> Response:
+    response: Response = Response(status_code=200, status_text="OK")
+    response.body = b"OK"
+    response.headers.set_single_value_header(
+        name="Content-Length", value=2
+    )
+    return response
+
+def passthrough_middleware(request: Request, next: RequestHandler) -> Response:
+    return next(request)
+
+def route_table_size(route_count: int) -> Scenario:
+    application: Chains = Chains()
+    branch_count: int = 10
+    branches: list[Branch] = [Branch() for _ in range(branch_count)]
+    for i in range(route_count):
+        branches[i % branch_count].route(path=f"/resource{i}/items", method="GET")(ok)
+    for branch_number, branch in enumerate(branches):
+        application.add_branch(path=f"/branch{branch_number}", branch=branch)
+    paths: list[str] = [f"/branch{i % branch_count}/resource{i}/items" for i in range(0, route_count, max(1, route_count // 100))]
+    counter: list[int] = [0]
+
+    def environs() -> dict[str, Any]:
+        counter[0] += 1
+        return make_environ(path=paths[counter[0] % len(paths)])
+    return application, environs
+
+def path_depth(depth: int) -> Scenario:
+    application: Chains = Chains()
+    segments: list[str] = [f"segment{i}" for i in range(depth)]
+    application.route(path="/" + "/".join(segments), method="GET")(ok)
+    # Sibling routes so that every level has more than one way to go
+    for i in range(depth):
+        application.route(path="/" + "/".join(segments[:i] + ["sibling"]), method="GET")(ok)
+    path: str = "/" + "/".join(segments)
+    return application, lambda: make_environ(path=path)
+
+def wildcard_density(percentage: int) -> Scenario:
+    application: Chains = Chains()
+    depth: int = 4
+    wildcard_count: int = depth * percentage // 100
+    route_segments: list[str] = ["<>" if i < wildcard_count else f"segment{i}" for i in range(depth)]
+    application.route(path="/" + "/".join(route_segments), method="GET")(ok)
+    path: str = "/" + "/".join(f"value{i}" if i < wildcard_count else f"segment{i}" for i in range(depth))
+    return application, lambda: make_environ(path=path)
+
+def middleware_depth(depth: int) -> Scenario:
+    application: Chains = Chains()
+    branch: Branch = Branch()
+    branch.route(path="/resource", method="GET")(ok)
+    for i in range(depth):
+        target: Branch = application if i % 2 == 0 else branch
+        target.middleware()(passthrough_middleware)
+    application.add_branch(path="/branch", branch=branch)
+    return application, lambda: make_environ(path="/branch/resource")
+
+def header_count(count: int) -> Scenario:
+    application: Chains = Chains()
+    names: list[str] = [f"X-Header-{i}" for i in range(count)]
+
+    @application.route(path="/headers", method="GET")
+    def headers(request: Request) -> Response:
+        response: Response = Response(status_code=200, status_text="OK")
+        for name in names:
+            value: str|None = request.headers.get_single_value_header(name=name)
+            response.headers.set_single_value_header(name=name, value=value)
+        return response
+    request_headers: dict[str, str] = {name: "value" for name in names}
+    return application, lambda: make_environ(path="/headers", headers=request_headers)
+
+def body_size(size: int) -> Scenario:
+    application: Chains = Chains()
+
+    @application.route(path="/echo", method="POST")
+    def echo(request: Request) -> Response:
+        response: Response = Response(status_code=200, status_text="OK")
+        body: bytes|None = request.body
+        if body:
+            response.body = body
+            response.headers.set_single_value_header(
+                name="Content-Length", value=len(body)
+            )
+        return response
+    body: bytes = b"x" * size
+    return application, lambda: make_environ(path="/echo", method="POST", body=body)
+
+SCENARIOS: dict[str, tuple[Callable[[int], Scenario], tuple[int, ...]]] = {
+    "route_table_size": (route_table_size, (10, 1_000, 10_000)),
+    "path_depth": (path_depth, (1, 4, 8)),
+    "wildcard_density": (wildcard_density, (0, 50, 100)),
+    "middleware_depth": (middleware_depth, (0, 5, 10)),
+    "header_count": (header_count, (5, 20, 100)),
+    "body_size": (body_size, (0, 1_024, 64*1_024, 1_024*1_024))
+}
+
+
+
+def parse_arguments() -> Namespace:
+    parser: ArgumentParser = ArgumentParser(description="Benchmarks the Chains WSGI callable")
+    parser.add_argument("--iterations", type=int, default=5_000, help="requests per benchmark")
+    parser.add_argument("--only", action="append", default=None, choices=list(SCENARIOS), help="run only these scenarios")
+    parser.add_argument("--no-freeze", action="store_true", help="benchmark the applications without freezing them")
+    parser.add_argument("--output", default=None, help="save the results to this JSON file")
+    parser.add_argument("--baseline", default=None, help="compare the results against this JSON file")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed regression as a fraction, 0.1 is 10%%")
+    return parser.parse_args()
+
+def main() -> int:
+    arguments: Namespace = parse_arguments()
+    results: dict[str, dict[str, float]] = dict()
+    print(f"{'benchmark':>28} {'ops/sec':>12} {'p50 (us)':>10} {'p99 (us)':>10}")
+    for scenario_name, (build_scenario, parameters) in SCENARIOS.items():
+        if arguments.only is not None and scenario_name not in arguments.only:
+            continue
+        for parameter in parameters:
+            application, environs = build_scenario(parameter)
+            if not arguments.no_freeze:
+                application.freeze()
+            iterations: int = arguments.iterations if parameter < 64*1_024 or scenario_name != "body_size" else max(arguments.iterations // 20, 100)
+            name: str = f"{scenario_name}[{parameter}]"
+            results[name] = run(application=application, environs=environs, iterations=iterations)
+            print(f"{name:>28} {results[name]['ops_per_sec']:>12.0f} {results[name]['p50_us']:>10.2f} {results[name]['p99_us']:>10.2f}")
+    if arguments.output is not None:
+        save(results=results, path=arguments.output)
+    if arguments.baseline is not None:
+        regressions: list[str] = compare(
+            results=results,
+            baseline=load(path=arguments.baseline),
+            threshold=arguments.threshold
+        )
+        if len(regressions) > 0:
+            print(f"\n{len(regressions)} regression(s) over {arguments.threshold:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\nNo regressions over {arguments.threshold:.0%}")
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit(main())
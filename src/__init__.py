@@ -1,2 +1,45 @@
-from chains.src.public_interface import Chains, Branch, Request, Response
-from chains.src.type_helpers import RequestHandler
+from __future__ import annotations
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from chains.src.public_interface import Chains, ChainsASGI, Branch, Request, Response
+    from chains.src.static import StaticBranch
+    from chains.src.metrics import Metrics
+    from chains.src.prometheus import PrometheusBranch
+    from chains.src.profiling import Profiler
+    from chains.src.background import BackgroundTasks
+    from chains.src.type_helpers import RequestHandler
+
+
+
+# The modules are only imported when one of their names is first used (PEP 562) so that an
+# application doesn't pay for the subsystems it doesn't use
+_exports: dict[str, str] = {
+    "Chains": "chains.src.public_interface",
+    "ChainsASGI": "chains.src.public_interface",
+    "Branch": "chains.src.public_interface",
+    "Request": "chains.src.public_interface",
+    "Response": "chains.src.public_interface",
+    "StaticBranch": "chains.src.static",
+    "Metrics": "chains.src.metrics",
+    "PrometheusBranch": "chains.src.prometheus",
+    "Profiler": "chains.src.profiling",
+    "BackgroundTasks": "chains.src.background",
+    "RequestHandler": "chains.src.type_helpers"
+}
+
+__all__ = list(_exports)
+
+def __getattr__(name: str) -> Any:
+    module_name: str|None = _exports.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value: Any = getattr(import_module(module_name), name)
+    # Later lookups find the name in the module's namespace and don't come back here
+    globals()[name] = value
+    return value
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(__all__))
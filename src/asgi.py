@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+from functools import partial
+
+from chains.src.request import IRequest
+from chains.src.response import IResponse
+
+# asyncio is only imported once an application runs asynchronous code, it's one of the slowest modules
+# of the standard library to import
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+
+
+AsyncRequestHandler = Callable[[IRequest], Awaitable[IResponse]]
+
+
+
+# The flag inspect.iscoroutinefunction checks, inspect itself is slow to import
+CO_COROUTINE: int = 0x0080
+
+def _is_coroutine_function(function: Any) -> bool:
+    function = getattr(function, "__func__", function)
+    code: Any = getattr(function, "__code__", None)
+    return code is not None and code.co_flags & CO_COROUTINE != 0
+
+def is_async_function(function: Callable) -> bool:
+    while isinstance(function, partial):
+        function = function.func
+    return _is_coroutine_function(function) or _is_coroutine_function(getattr(function, "__call__", None))
+
+def run_async_route_function(route_function: Callable[[IRequest], Awaitable[IResponse]], request: IRequest) -> IResponse:
+    from asyncio import run
+    return run(route_function(request))
+
+def run_async_middleware_function(
+    middleware_function: Callable[..., Awaitable[IResponse]],
+    request: IRequest,
+    next: Callable[[IRequest], IResponse],
+    args: tuple[Any, ...],
+    kwargs: dict[str, Any]
+) -> IResponse:
+    from asyncio import run, to_thread
+    # The downstream handlers are synchronous here, they're run on a separate
+    # thread so that they can start event loops of their own if they need to
+    async def async_next(request: IRequest) -> IResponse:
+        return await to_thread(next, request)
+    return run(middleware_function(request, async_next, *args, **kwargs))
+
+
+
+class ComposedHandler:
+
+    def __init__(self, async_handler: AsyncRequestHandler, sync_handler: Callable[[IRequest], IResponse]|None = None) -> None:
+        self.async_handler: AsyncRequestHandler = async_handler
+        # Only set when every handler downstream of this one is synchronous
+        self.sync_handler: Callable[[IRequest], IResponse]|None = sync_handler
+
+class AsyncComposerV1_1:
+
+    def __init__(self, executor: Executor, bridge_executor_factory: Callable[[], Executor], async_equivalents: dict[Callable, Callable]|None = None) -> None:
+        self._executor: Executor = executor
+        self._bridge_executor_factory: Callable[[], Executor] = bridge_executor_factory
+        # Kept so that they can be shut down along with the application
+        self._bridge_executors: list[Executor] = list()
+        self._async_equivalents: dict[Callable, Callable] = async_equivalents if async_equivalents is not None else dict()
+
+    @property
+    def bridge_executors(self) -> tuple[Executor, ...]:
+        return tuple(self._bridge_executors)
+
+    def compose_terminal(self, function: Callable[[IRequest], IResponse|Awaitable[IResponse]]) -> ComposedHandler:
+        if is_async_function(function):
+            return ComposedHandler(
+                async_handler=function
+            )
+        from asyncio import get_running_loop
+        executor: Executor = self._executor
+
+        async def run_in_executor(request: IRequest) -> IResponse:
+            return await get_running_loop().run_in_executor(executor, function, request)
+        return ComposedHandler(
+            async_handler=run_in_executor,
+            sync_handler=function
+        )
+
+    def compose_middleware(
+        self,
+        middleware_function: Callable,
+        pos_dependencies: tuple[Any, ...],
+        kw_dependencies: dict[str, Any],
+        downstream: ComposedHandler
+    ) -> ComposedHandler:
+        from asyncio import get_running_loop, run_coroutine_threadsafe
+        middleware_function = self._async_equivalents.get(middleware_function, middleware_function)
+        async_downstream: AsyncRequestHandler = downstream.async_handler
+        if is_async_function(middleware_function):
+            async def composed_async(request: IRequest) -> IResponse:
+                return await middleware_function(request, async_downstream, *pos_dependencies, **kw_dependencies)
+            return ComposedHandler(
+                async_handler=composed_async
+            )
+        executor: Executor = self._executor
+        sync_downstream: Callable[[IRequest], IResponse]|None = downstream.sync_handler
+        if sync_downstream is not None:
+            # The whole chain below this middleware runs on the same worker thread
+            def composed_sync(request: IRequest) -> IResponse:
+                return middleware_function(request, sync_downstream, *pos_dependencies, **kw_dependencies)
+
+            async def run_in_executor(request: IRequest) -> IResponse:
+                return await get_running_loop().run_in_executor(executor, composed_sync, request)
+            return ComposedHandler(
+                async_handler=run_in_executor,
+                sync_handler=composed_sync
+            )
+
+        # A synchronous middleware with asynchronous code downstream blocks its thread until the
+        # downstream code is done, which can need the thread pool itself. Each of them is run on a
+        # bounded pool of its own, so that it can't take up the threads the code downstream of it,
+        # including other middleware like it, is waiting for
+        bridge_executor: Executor = self._bridge_executor_factory()
+        self._bridge_executors.append(bridge_executor)
+
+        async def bridged(request: IRequest) -> IResponse:
+            loop = get_running_loop()
+
+            def sync_next(request: IRequest) -> IResponse:
+                return run_coroutine_threadsafe(async_downstream(request), loop).result()
+            return await loop.run_in_executor(
+                bridge_executor,
+                partial(middleware_function, request, sync_next, *pos_dependencies, **kw_dependencies)
+            )
+        return ComposedHandler(
+            async_handler=bridged
+        )
+
+    def compose_preprocessor(self, preprocessor: Callable[[IRequest], None], downstream: ComposedHandler) -> ComposedHandler:
+        async_downstream: AsyncRequestHandler = downstream.async_handler
+        sync_downstream: Callable[[IRequest], IResponse]|None = downstream.sync_handler
+
+        async def composed_async(request: IRequest) -> IResponse:
+            preprocessor(request)
+            return await async_downstream(request)
+        if sync_downstream is None:
+            return ComposedHandler(
+                async_handler=composed_async
+            )
+
+        def composed_sync(request: IRequest) -> IResponse:
+            preprocessor(request)
+            return sync_downstream(request)
+        return ComposedHandler(
+            async_handler=composed_async,
+            sync_handler=composed_sync
+        )
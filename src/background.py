@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Iterable
+from os import getpid
+from queue import Queue, Full
+from sys import stderr
+from threading import Lock, Thread
+from time import perf_counter_ns
+
+from chains.src.request import BackgroundTask
+from chains.src.metrics import MetricsV1_1, LatencyHistogram
+from chains.src.asgi import is_async_function
+from chains.src.exceptions import InvalidSettingsException
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+
+class BackgroundTasksV1_1:
+
+    # What happens to tasks that arrive while the queue is full
+    DROP: str = "drop"
+    BLOCK: str = "block"
+
+    def __init__(
+        self,
+        max_workers: int = 0,
+        max_queue_size: int = 1024,
+        policy: str = DROP,
+        block_timeout: float|None = None,
+        metrics: MetricsV1_1|None = None
+    ) -> None:
+        if max_workers < 0 or max_queue_size < 1:
+            raise InvalidSettingsException("The number of workers can't be negative and the queue has to hold at least one task")
+        if policy not in (self.DROP, self.BLOCK):
+            raise InvalidSettingsException(f"The policy has to be '{self.DROP}' or '{self.BLOCK}'")
+        self._max_workers: int = max_workers
+        self._policy: str = policy
+        self._block_timeout: float|None = block_timeout
+        # Holds the time each task was queued at along with the task, None tells a worker to stop
+        self._max_queue_size: int = max_queue_size
+        self._queue: Queue[tuple[int, BackgroundTask]|None] = Queue(maxsize=max_queue_size)
+        self._workers: list[Thread] = list()
+        # The process the workers were started in, threads don't survive a fork
+        self._workers_pid: int|None = None
+        self._histogram: LatencyHistogram|None = None
+        self._wait_histogram: LatencyHistogram|None = None
+        if metrics is not None:
+            self._histogram = metrics.background_task_histogram
+            self._wait_histogram = metrics.background_task_wait_histogram
+            metrics.track_background_tasks(self)
+        self._completed: int = 0
+        self._failed: int = 0
+        self._dropped: int = 0
+        self._lock: Lock = Lock()
+
+    @property
+    def max_workers(self) -> int:
+        return self._max_workers
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def completed(self) -> int:
+        return self._completed
+
+    @property
+    def failed(self) -> int:
+        return self._failed
+
+    @property
+    def dropped(self) -> int:
+        return self._dropped
+
+    def __start_workers(self) -> None:
+        # Workers are started with the first task, so that forking servers start them in each worker process
+        with self._lock:
+            if self._workers_pid == getpid():
+                return None
+            if self._workers_pid is not None:
+                # Forked after the workers were started, the queue is left to the parent
+                self._queue = Queue(maxsize=self._max_queue_size)
+                self._workers = list()
+            self._workers_pid = getpid()
+            for i in range(self._max_workers):
+                worker: Thread = Thread(
+                    target=self.__work,
+                    name=f"chains-background-{i}",
+                    daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+        return None
+
+    def __work(self) -> None:
+        while True:
+            item: tuple[int, BackgroundTask]|None = self._queue.get()
+            if item is None:
+                return None
+            queued_at, task = item
+            if self._wait_histogram is not None:
+                self._wait_histogram.observe(perf_counter_ns() - queued_at)
+            self.__run_task(task)
+
+    def __run_task(self, task: BackgroundTask) -> None:
+        function, args, kwargs = task
+        start: int = perf_counter_ns()
+        try:
+            if is_async_function(function):
+                from asyncio import run
+                run(function(*args, **kwargs))
+            else:
+                function(*args, **kwargs)
+        except Exception:
+            # Nobody is waiting for the task, so the error is reported and the next task is run
+            with self._lock:
+                self._failed += 1
+            from traceback import print_exc
+            print_exc(file=stderr)
+        else:
+            with self._lock:
+                self._completed += 1
+        if self._histogram is not None:
+            self._histogram.observe(perf_counter_ns() - start)
+        return None
+
+    def run(self, tasks: Iterable[BackgroundTask]) -> None:
+        # Runs the tasks on the calling thread, one after the other
+        for task in tasks:
+            self.__run_task(task)
+        return None
+
+    def schedule(self, tasks: Iterable[BackgroundTask]) -> None:
+        if self._max_workers < 1:
+            return self.run(tasks)
+        if self._workers_pid != getpid():
+            self.__start_workers()
+        for task in tasks:
+            try:
+                if self._policy == self.BLOCK:
+                    self._queue.put((perf_counter_ns(), task), block=True, timeout=self._block_timeout)
+                else:
+                    self._queue.put_nowait((perf_counter_ns(), task))
+            except Full:
+                with self._lock:
+                    self._dropped += 1
+        return None
+
+    def shutdown(self, wait: bool = True) -> Self:
+        # Tasks that were queued before this are still run
+        with self._lock:
+            workers: list[Thread] = self._workers
+            self._workers = list()
+            self._workers_pid = None
+        for _ in workers:
+            self._queue.put(None)
+        if wait:
+            for worker in workers:
+                worker.join()
+        return self
+
+    def __str__(self) -> str:
+        return f"BackgroundTasksV1_1(max_workers={self._max_workers}, queue_depth={self.queue_depth}, completed={self._completed}, failed={self._failed}, dropped={self._dropped})"
+
+
+
+BackgroundTasks = BackgroundTasksV1_1
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, IO, Any, Awaitable, Callable, Iterable, Iterator
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Lock
+from zlib import compressobj, DEFLATED, MAX_WBITS
+
+from chains.src.request import IRequest
+from chains.src.response import IResponse, ResponseBody, ImmutableResponseV1_1
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+
+class CompressedIterableV1_1:
+
+    def __init__(self, body: Iterable[bytes]|IO[bytes], encoding: str, level: int, chunk_size: int) -> None:
+        self._body: Iterable[bytes]|IO[bytes] = body
+        self._encoding: str = encoding
+        self._level: int = level
+        self._chunk_size: int = chunk_size
+
+    def __chunks(self) -> Iterator[bytes]:
+        if hasattr(self._body, "read"):
+            while True:
+                chunk: bytes = self._body.read(self._chunk_size)
+                if len(chunk) < 1:
+                    return None
+                yield chunk
+        yield from self._body
+        return None
+
+    def __iter__(self) -> Iterator[bytes]:
+        compressor = CompressionV1_1.compressor(encoding=self._encoding, level=self._level)
+        for chunk in self.__chunks():
+            compressed_chunk: bytes = compressor.compress(chunk)
+            # Empty chunks aren't yielded since servers may take them as the end of the body
+            if len(compressed_chunk) > 0:
+                yield compressed_chunk
+        yield compressor.flush()
+        return None
+
+    def close(self) -> None:
+        if hasattr(self._body, "close"):
+            self._body.close()
+        return None
+
+class CompressionV1_1:
+
+    __WBITS: dict[str, int] = {"gzip": 16 + MAX_WBITS, "deflate": MAX_WBITS}
+    __SKIPPED_CONTENT_TYPES: tuple[str, ...] = (
+        "image/", "audio/", "video/", "font/woff", "application/zip", "application/gzip", "application/x-gzip",
+        "application/x-bzip2", "application/x-xz", "application/zstd", "application/x-7z-compressed",
+        "application/x-rar-compressed", "application/pdf", "application/octet-stream"
+    )
+
+    def __init__(
+        self,
+        minimum_size: int = 500,
+        level: int = 6,
+        encodings: Iterable[str] = ("gzip", "deflate"),
+        skipped_content_types: Iterable[str]|None = None,
+        chunk_size: int = 64*1024,
+        cache_max_bytes: int = 4*1024*1024,
+        cache_max_entry_bytes: int = 256*1024
+    ) -> None:
+        self._minimum_size: int = minimum_size
+        self._level: int = level
+        # In the order of preference
+        self._encodings: tuple[str, ...] = tuple(encoding for encoding in encodings if encoding in self.__WBITS)
+        self._skipped_content_types: tuple[str, ...] = tuple(skipped_content_types) if skipped_content_types is not None else self.__SKIPPED_CONTENT_TYPES
+        self._chunk_size: int = chunk_size
+        self._cache_max_bytes: int = cache_max_bytes
+        self._cache_max_entry_bytes: int = cache_max_entry_bytes
+        # Maps an encoding and the digest and length of a body to the compressed body, keeping the
+        # body itself in the key would hold on to it as long as the entry is cached
+        self._cache: OrderedDict[tuple[str, bytes, int], bytes] = OrderedDict()
+        self._cache_bytes: int = 0
+        self._lock: Lock = Lock()
+        self._hits: int = 0
+        self._misses: int = 0
+
+    @staticmethod
+    def compressor(encoding: str, level: int) -> Any:
+        return compressobj(level, DEFLATED, CompressionV1_1.__WBITS[encoding])
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def cache_bytes(self) -> int:
+        return self._cache_bytes
+
+    def clear(self) -> Self:
+        with self._lock:
+            self._cache.clear()
+            self._cache_bytes = 0
+            self._hits = 0
+            self._misses = 0
+        return self
+
+    def negotiate(self, request: IRequest) -> str|None:
+        accept_encoding: str|None = request.headers.get_single_value_header(name="Accept-Encoding")
+        if accept_encoding is None:
+            return None
+        qualities: dict[str, float] = dict()
+        for coding in accept_encoding.lower().split(","):
+            name, _, parameters = coding.partition(";")
+            quality: float = 1.0
+            parameter_name, _, value = parameters.strip().partition("=")
+            if parameter_name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+            qualities[name.strip()] = quality
+        best_encoding: str|None = None
+        best_quality: float = 0.0
+        for encoding in self._encodings:
+            quality: float = qualities.get(encoding, qualities.get("*", 0.0))
+            if quality > best_quality:
+                best_encoding, best_quality = encoding, quality
+        return best_encoding
+
+    def __compressible(self, response: IResponse) -> bool:
+        if response.status_code < 200 or response.status_code in (204, 206, 304):
+            return False
+        body: ResponseBody|None = response.body
+        if body is None or hasattr(body, "__aiter__"):
+            return False
+        if isinstance(body, (bytes, bytearray, memoryview)) and len(body) < self._minimum_size:
+            return False
+        if response.headers.get_single_value_header(name="Content-Encoding") is not None:
+            return False
+        cache_control: str|None = response.headers.get_single_value_header(name="Cache-Control")
+        if cache_control is not None and "no-transform" in cache_control.lower():
+            return False
+        content_type: str|None = response.headers.get_single_value_header(name="Content-Type")
+        if content_type is not None and content_type.lower().startswith(self._skipped_content_types):
+            return False
+        content_length: str|None = response.headers.get_single_value_header(name="Content-Length")
+        if content_length is not None and str(content_length).isascii() and str(content_length).isdigit() and int(content_length) < self._minimum_size:
+            return False
+        return True
+
+    def __compress_bytes(self, encoding: str, body: bytes) -> bytes:
+        cacheable: bool = len(body) <= self._cache_max_entry_bytes
+        if cacheable:
+            key: tuple[str, bytes, int] = (encoding, blake2b(body, digest_size=16).digest(), len(body))
+            with self._lock:
+                compressed_body: bytes|None = self._cache.get(key)
+                if compressed_body is not None:
+                    self._cache.move_to_end(key)
+                    self._hits += 1
+                    return compressed_body
+                self._misses += 1
+        compressor = self.compressor(encoding=encoding, level=self._level)
+        compressed_body: bytes = compressor.compress(body) + compressor.flush()
+        if cacheable:
+            with self._lock:
+                if key not in self._cache:
+                    self._cache[key] = compressed_body
+                    self._cache_bytes += len(compressed_body)
+                while self._cache_bytes > self._cache_max_bytes:
+                    _, evicted_compressed_body = self._cache.popitem(last=False)
+                    self._cache_bytes -= len(evicted_compressed_body)
+        return compressed_body
+
+    def __add_vary(self, response: IResponse) -> None:
+        vary: str|None = response.headers.get_single_value_header(name="Vary")
+        if vary is None:
+            response.headers.set_single_value_header(
+                name="Vary", value="Accept-Encoding"
+            )
+        elif "accept-encoding" not in vary.lower() and vary.strip() != "*":
+            response.headers.set_single_value_header(
+                name="Vary", value=f"{vary}, Accept-Encoding"
+            )
+        return None
+
+    def compress(self, request: IRequest, response: IResponse) -> IResponse:
+        if not self.__compressible(response):
+            return response
+        if isinstance(response, ImmutableResponseV1_1):
+            response = response.copy()
+        # The response depends on Accept-Encoding even when it isn't compressed
+        self.__add_vary(response)
+        encoding: str|None = self.negotiate(request)
+        if encoding is None:
+            return response
+        body: ResponseBody = response.body
+        if isinstance(body, (bytes, bytearray, memoryview)):
+            compressed_body: bytes = self.__compress_bytes(encoding=encoding, body=bytes(body))
+            if len(compressed_body) >= len(body):
+                return response
+            response.body = compressed_body
+            response.headers.set_single_value_header(
+                name="Content-Length", value=len(compressed_body)
+            )
+        else:
+            response.body = CompressedIterableV1_1(
+                body=body,
+                encoding=encoding,
+                level=self._level,
+                chunk_size=self._chunk_size
+            )
+            response.headers.delete_single_value_header(
+                name="Content-Length"
+            )
+        response.headers.set_single_value_header(
+            name="Content-Encoding", value=encoding
+        )
+        etag: str|None = response.headers.get_single_value_header(name="ETag")
+        if etag is not None and not etag.startswith("W/"):
+            # The compressed body isn't byte for byte the same as the one the ETag was made for
+            response.headers.set_single_value_header(
+                name="ETag", value=f"W/{etag}"
+            )
+        return response
+
+
+
+def compressionv1_1(request: IRequest, next: Callable[[IRequest], IResponse], compression: CompressionV1_1) -> IResponse:
+    return compression.compress(request, next(request))
+
+async def async_compressionv1_1(request: IRequest, next: Callable[[IRequest], Awaitable[IResponse]], compression: CompressionV1_1) -> IResponse:
+    return compression.compress(request, await next(request))
+
+
+
+async_equivalents: dict[Callable, Callable] = {
+    compressionv1_1: async_compressionv1_1
+}
@@ -1,18 +1,23 @@
-from traceback import format_exc
-from typing import Callable
+from typing import Awaitable, Callable
 
 from chains.src.request import IRequest
 from chains.src.response import IResponse, ResponseV1_1
-from chains.src.exceptions import NotFoundException, MethodNotAllowedException
+from chains.src.exceptions import NotFoundException, MethodNotAllowedException, PayloadTooLargeException, BadRequestException
+from chains.src.error_responses import NOT_FOUND_RESPONSE, method_not_allowed_response, bad_request_response
 
 
-def root_error_handlerv1_1(request: IRequest, next: Callable[[IRequest], IResponse]) -> IResponse:
-    try:
-        response: IResponse = next(request)
-    except NotFoundException as e:
+
+def _root_error_response(e: Exception, include_traceback: bool) -> IResponse:
+    if isinstance(e, NotFoundException):
+        return NOT_FOUND_RESPONSE.copy_on_write()
+    if isinstance(e, MethodNotAllowedException):
+        return method_not_allowed_response(
+            allowed_methods=e.allowed_methods
+        ).copy_on_write()
+    if isinstance(e, PayloadTooLargeException):
         response: ResponseV1_1 = ResponseV1_1(
-            status_code=404,
-            status_text="NOT FOUND"
+            status_code=413,
+            status_text="PAYLOAD TOO LARGE"
         )
         response.body = str(e).encode()
         response.headers.set_single_value_header(
@@ -20,46 +25,82 @@ def root_error_handlerv1_1(request: IRequest, next: Callable[[IRequest], IRespon
         ).set_single_value_header(
             name="Content-Length", value=len(response.body)
         )
-    except MethodNotAllowedException as e:
-        response: ResponseV1_1 = ResponseV1_1(
-            status_code=405,
-            status_text="METHOD NOT ALLOWED"
-        )
-        response.body = str(e).encode
-        response.headers.set_single_value_header(
-            name="Content-Type", value="text/plain"
-        ).set_single_value_header(
-            name="Content-Length", value=len(response.body)
-        ).set_single_value_header(
-            name="Allow", value=", ".join(e.allowed_methods)
-        )
-    except Exception as e:
-        response: ResponseV1_1 = ResponseV1_1(
-            status_code=500,
-            status_text="INTERNAL SERVER ERROR"
-        )
+        return response
+    if isinstance(e, BadRequestException):
+        return bad_request_response(
+            exception=e
+        ).copy_on_write()
+    response: ResponseV1_1 = ResponseV1_1(
+        status_code=500,
+        status_text="INTERNAL SERVER ERROR"
+    )
+    if include_traceback is True:
+        from traceback import format_exc
         response.body = f"An unexpected error occurred: {str(e)}\nError Traceback: {format_exc()}\n".encode()
-        response.headers.set_single_value_header(
-            name="Content-Type", value="text/plain"
-        ).set_single_value_header(
-            name="Content-Length", value=len(response.body)
-        )
+    else:
+        response.body = f"An unexpected error occurred: {str(e)}\n".encode()
+    response.headers.set_single_value_header(
+        name="Content-Type", value="text/plain"
+    ).set_single_value_header(
+        name="Content-Length", value=len(response.body)
+    )
+    return response
+
+def _catchall_error_response(e: Exception, include_traceback: bool) -> ResponseV1_1:
+    response: ResponseV1_1 = ResponseV1_1(
+        status_code=500,
+        status_text="INTERNAL SERVER ERROR"
+    )
+    if include_traceback is True:
+        from traceback import format_exc
+        response.body = f"INTERNAL SERVER ERROR\n{str(e)}\nTraceback\n{format_exc()}".encode()
+    else:
+        response.body = f"INTERNAL SERVER ERROR\n{str(e)}\n".encode()
+    response.headers.set_single_value_header(
+        name="Content-Type", value="text/plain"
+    ).set_single_value_header(
+        name="Content-Length", value=len(response.body)
+    )
     return response
 
 
 
-def catchall_error_handlerv1_1(request: IRequest, next: Callable[[IRequest], IResponse]) -> IResponse:
+# Rendering tracebacks is expensive when a lot of requests fail at once, so
+# they're only added to the response when the application asks for them
+
+def root_error_handlerv1_1(request: IRequest, next: Callable[[IRequest], IResponse], include_traceback: bool = False) -> IResponse:
     try:
         response: IResponse = next(request)
     except Exception as e:
-        response: ResponseV1_1 = ResponseV1_1(
-            status_code=500,
-            status_text="INTERNAL SERVER ERROR"
-        )
-        response.body = f"INTERNAL SERVER ERROR\n{str(e)}\nTraceback\n{format_exc()}".encode()
-        response.headers.set_single_value_header(
-            name="Content-Type", value="text/plain"
-        ).set_single_value_header(
-            name="Content-Length", value=len(response.body)
-        )
+        response: IResponse = _root_error_response(e, include_traceback)
+    return response
+
+async def async_root_error_handlerv1_1(request: IRequest, next: Callable[[IRequest], Awaitable[IResponse]], include_traceback: bool = False) -> IResponse:
+    try:
+        response: IResponse = await next(request)
+    except Exception as e:
+        response: IResponse = _root_error_response(e, include_traceback)
+    return response
+
+
+
+def catchall_error_handlerv1_1(request: IRequest, next: Callable[[IRequest], IResponse], include_traceback: bool = False) -> IResponse:
+    try:
+        response: IResponse = next(request)
+    except Exception as e:
+        response: ResponseV1_1 = _catchall_error_response(e, include_traceback)
+    return response
+
+async def async_catchall_error_handlerv1_1(request: IRequest, next: Callable[[IRequest], Awaitable[IResponse]], include_traceback: bool = False) -> IResponse:
+    try:
+        response: IResponse = await next(request)
+    except Exception as e:
+        response: ResponseV1_1 = _catchall_error_response(e, include_traceback)
     return response
+
+
+
+async_equivalents: dict[Callable, Callable] = {
+    root_error_handlerv1_1: async_root_error_handlerv1_1,
+    catchall_error_handlerv1_1: async_catchall_error_handlerv1_1
+}
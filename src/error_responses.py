@@ -0,0 +1,70 @@
+from typing import Iterable
+from functools import lru_cache
+
+from chains.src.response import ImmutableResponseV1_1
+from chains.src.exceptions import NotFoundException, MethodNotAllowedException, TooManyRequestsException, BadRequestException
+
+
+
+# These responses are shared between requests, they're built once and can't be
+# changed by middleware, use their copy() method to get a response that can be
+
+def _text_response(status_code: int, status_text: str, message: str, headers: Iterable[tuple[str, str]] = ()) -> ImmutableResponseV1_1:
+    body: bytes = message.encode()
+    return ImmutableResponseV1_1(
+        status_code=status_code,
+        status_text=status_text,
+        headers=(
+            ("Content-Type", "text/plain"),
+            ("Content-Length", len(body)),
+            *headers
+        ),
+        body=body
+    )
+
+NOT_FOUND_RESPONSE: ImmutableResponseV1_1 = _text_response(
+    status_code=404,
+    status_text="NOT FOUND",
+    message=str(NotFoundException())
+)
+
+def method_not_allowed_response(allowed_methods: list[str]) -> ImmutableResponseV1_1:
+    return _method_not_allowed_response(tuple(allowed_methods))
+
+@lru_cache(maxsize=128)
+def _method_not_allowed_response(allowed_methods: tuple[str, ...]) -> ImmutableResponseV1_1:
+    # Routes that allow the same methods share a response
+    return _text_response(
+        status_code=405,
+        status_text="METHOD NOT ALLOWED",
+        message=str(MethodNotAllowedException(allowed_methods=list(allowed_methods))),
+        headers=(
+            ("Allow", ", ".join(allowed_methods)),
+        )
+    )
+
+@lru_cache(maxsize=128)
+def too_many_requests_response(retry_after: int) -> ImmutableResponseV1_1:
+    return _text_response(
+        status_code=429,
+        status_text="TOO MANY REQUESTS",
+        message=str(TooManyRequestsException(retry_after=retry_after)),
+        headers=(
+            ("Retry-After", retry_after),
+        )
+    )
+
+def bad_request_response(exception: BadRequestException) -> ImmutableResponseV1_1:
+    return _bad_request_response(
+        status_code=exception.status_code,
+        status_text=exception.status_text,
+        message=str(exception)
+    )
+
+@lru_cache(maxsize=128)
+def _bad_request_response(status_code: int, status_text: str, message: str) -> ImmutableResponseV1_1:
+    return _text_response(
+        status_code=status_code,
+        status_text=status_text,
+        message=message
+    )
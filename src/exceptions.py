@@ -6,6 +6,52 @@ class ChainsBaseException(Exception, ABC):
     pass
 
 
+# The exceptions below also derive from the matching built in exception, so that code catching
+# ValueError and the like keeps working
+
+class FrozenApplicationException(ChainsBaseException, ValueError):
+    pass
+
+class InvalidSettingsException(ChainsBaseException, ValueError):
+    pass
+
+class UnsupportedPlatformException(ChainsBaseException, RuntimeError):
+    pass
+
+class MalformedRoutePathException(ChainsBaseException, ValueError):
+    pass
+
+class DuplicateRouteException(ChainsBaseException, ValueError):
+    pass
+
+class HandlerChainException(ChainsBaseException, ValueError):
+    pass
+
+class HeaderClashException(ChainsBaseException, ValueError):
+    pass
+
+class MalformedHeaderException(ChainsBaseException, ValueError):
+    pass
+
+class ImmutableResponseException(ChainsBaseException, TypeError):
+    pass
+
+class BodyNotSetException(ChainsBaseException, ValueError):
+    pass
+
+class EmptyBodyException(ChainsBaseException, ValueError):
+    pass
+
+class StreamNotRewindableException(ChainsBaseException, ValueError):
+    pass
+
+class FormAlreadyParsedException(ChainsBaseException, ValueError):
+    pass
+
+class UnsupportedScopeException(ChainsBaseException, ValueError):
+    pass
+
+
 class ChainsHTTPException(ChainsBaseException, ABC):
     pass
 
@@ -22,3 +68,26 @@ class MethodNotAllowedException(ChainsHTTPException):
             "The resource was found but it does not support the specified method. "
             "Check the 'Allow' header for a list of supported methods."
         )
+
+class PayloadTooLargeException(ChainsHTTPException):
+
+    def __init__(self, max_body_size: int) -> None:
+        self.max_body_size: int = max_body_size
+        super().__init__(
+            f"The request body exceeds the maximum allowed size of {max_body_size} bytes"
+        )
+
+class TooManyRequestsException(ChainsHTTPException):
+
+    def __init__(self, retry_after: int) -> None:
+        self.retry_after: int = retry_after
+        super().__init__(
+            f"Too many requests, retry after {retry_after} seconds"
+        )
+
+class BadRequestException(ChainsHTTPException):
+
+    def __init__(self, reason: str, status_code: int = 400, status_text: str = "BAD REQUEST") -> None:
+        self.status_code: int = status_code
+        self.status_text: str = status_text
+        super().__init__(reason)
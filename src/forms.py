@@ -0,0 +1,387 @@
+from __future__ import annotations
+
+from io import BytesIO
+from typing import TYPE_CHECKING, IO, Generator
+
+from chains.src.exceptions import BadRequestException, FormAlreadyParsedException
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+    from chains.src.streams import IRequestStream
+
+
+
+# The parser holds at most a chunk, the part headers and the spool threshold of all
+# the parts together in memory, whatever the size of the body
+MAX_FORM_PARTS: int = 1000
+MAX_FORM_FIELD_SIZE: int = 1024*1024
+MAX_FORM_PART_HEADER_SIZE: int = 16*1024
+FORM_SPOOL_THRESHOLD: int = 1024*1024
+
+MULTIPART_CONTENT_TYPE: str = "multipart/form-data"
+URLENCODED_CONTENT_TYPE: str = "application/x-www-form-urlencoded"
+
+
+
+def parse_header_parameters(value: str) -> tuple[str, dict[str, str]]:
+    # Splits 'type; name="value"; ...' into the lowercased type and its parameters,
+    # quoted values can hold semicolons and backslash escapes
+    main_value, _, rest = value.partition(";")
+    parameters: dict[str, str] = dict()
+    index: int = 0
+    while index < len(rest):
+        end: int = rest.find("=", index)
+        if end < 0:
+            break
+        name: str = rest[index:end].strip(" \t;").lower()
+        index = end + 1
+        if index < len(rest) and rest[index] == '"':
+            characters: list[str] = list()
+            index += 1
+            while index < len(rest) and rest[index] != '"':
+                if rest[index] == "\\" and index + 1 < len(rest):
+                    index += 1
+                characters.append(rest[index])
+                index += 1
+            parameter_value: str = "".join(characters)
+            separator: int = rest.find(";", index)
+            index = len(rest) if separator < 0 else separator + 1
+        else:
+            separator: int = rest.find(";", index)
+            parameter_value: str = rest[index:len(rest) if separator < 0 else separator].strip()
+            index = len(rest) if separator < 0 else separator + 1
+        if name.endswith("*"):
+            # RFC 5987 values, charset'language'percent-encoded-value
+            charset, _, encoded = parameter_value.partition("'")
+            from urllib.parse import unquote
+            try:
+                parameter_value = unquote(encoded.partition("'")[2], encoding=charset or "utf-8", errors="replace")
+            except LookupError:
+                # Charsets that aren't known text encodings are decoded as UTF-8
+                parameter_value = unquote(encoded.partition("'")[2], encoding="utf-8", errors="replace")
+            name = name[:-1]
+        parameters[name] = parameter_value
+    return main_value.strip().lower(), parameters
+
+def _too_large(reason: str) -> BadRequestException:
+    return BadRequestException(
+        reason=reason,
+        status_code=413,
+        status_text="PAYLOAD TOO LARGE"
+    )
+
+
+
+class FormPartV1_1:
+
+    __slots__ = ("_name", "_filename", "_content_type", "_headers", "_size", "_buffer", "_file", "_spool_threshold")
+
+    def __init__(self, name: str, filename: str|None = None, content_type: str|None = None, headers: dict[str, str]|None = None, spool_threshold: int = FORM_SPOOL_THRESHOLD) -> None:
+        self._name: str = name
+        # Only set for file uploads, the part of a plain field has no filename
+        self._filename: str|None = filename
+        self._content_type: str|None = content_type
+        self._headers: dict[str, str] = headers if headers is not None else dict()
+        self._size: int = 0
+        # Small parts are kept in memory, larger ones are moved to a temporary file
+        self._buffer: bytearray|None = bytearray()
+        self._file: IO[bytes]|None = None
+        self._spool_threshold: int = spool_threshold
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def filename(self) -> str|None:
+        return self._filename
+
+    @property
+    def is_file(self) -> bool:
+        return self._filename is not None
+
+    @property
+    def content_type(self) -> str|None:
+        return self._content_type
+
+    @property
+    def headers(self) -> dict[str, str]:
+        # Lowercased names
+        return self._headers
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    @property
+    def spilled(self) -> bool:
+        return self._file is not None
+
+    @property
+    def file(self) -> IO[bytes]:
+        # Rewound to the start, parts that are still in memory are wrapped in a BytesIO
+        if self._file is None:
+            return BytesIO(self._buffer)
+        self._file.seek(0)
+        return self._file
+
+    @property
+    def value(self) -> str:
+        return self.read().decode("utf-8", errors="replace")
+
+    def read(self) -> bytes:
+        if self._file is None:
+            return bytes(self._buffer)
+        self._file.seek(0)
+        return self._file.read()
+
+    def spill(self) -> Self:
+        # Moves the part to a temporary file, if it isn't in one already
+        if self._file is None:
+            from tempfile import TemporaryFile
+            self._file = TemporaryFile()
+            self._file.write(self._buffer)
+            self._buffer = None
+        return self
+
+    def write(self, data: bytes|bytearray|memoryview) -> Self:
+        self._size += len(data)
+        if self._file is None and self._size > self._spool_threshold:
+            self.spill()
+        if self._file is not None:
+            self._file.write(data)
+        else:
+            self._buffer += data
+        return self
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        return None
+
+    def __str__(self) -> str:
+        return f"FormPartV1_1(name={self._name!r}, filename={self._filename!r}, size={self._size}, spilled={self.spilled})"
+
+
+
+class FormParserV1_1:
+
+    def __init__(
+        self,
+        stream: IRequestStream,
+        content_type: str,
+        max_parts: int = MAX_FORM_PARTS,
+        max_part_size: int|None = None,
+        max_field_size: int = MAX_FORM_FIELD_SIZE,
+        max_size: int|None = None,
+        max_header_size: int = MAX_FORM_PART_HEADER_SIZE,
+        spool_threshold: int = FORM_SPOOL_THRESHOLD,
+        chunk_size: int = 64*1024
+    ) -> None:
+        media_type, parameters = parse_header_parameters(content_type)
+        if media_type == MULTIPART_CONTENT_TYPE:
+            boundary: str = parameters.get("boundary", "")
+            if not 0 < len(boundary) <= 70:
+                raise BadRequestException(
+                    reason="The multipart body has no valid boundary"
+                )
+            # The first boundary is found the same way as the others by starting the body with a line break
+            self._delimiter: bytes = b"\r\n--" + boundary.encode("latin-1")
+        elif media_type != URLENCODED_CONTENT_TYPE:
+            raise BadRequestException(
+                reason=f"Forms can't be parsed from a {media_type or 'missing'} content type",
+                status_code=415,
+                status_text="UNSUPPORTED MEDIA TYPE"
+            )
+        self._stream: IRequestStream = stream
+        self._multipart: bool = media_type == MULTIPART_CONTENT_TYPE
+        self._max_parts: int = max_parts
+        self._max_part_size: int|None = max_part_size
+        self._max_field_size: int = max_field_size
+        self._max_size: int|None = max_size
+        self._max_header_size: int = max_header_size
+        self._spool_threshold: int = spool_threshold
+        self._chunk_size: int = chunk_size
+        self._bytes_read: int = 0
+        # The bytes of all the parts that are still in memory, kept under the spool threshold
+        self._bytes_in_memory: int = 0
+        self._parts: list[FormPartV1_1] = list()
+        self._started: bool = False
+
+    @property
+    def parts(self) -> tuple[FormPartV1_1, ...]:
+        # The parts that have been parsed so far
+        return tuple(self._parts)
+
+    @property
+    def bytes_read(self) -> int:
+        return self._bytes_read
+
+    @property
+    def bytes_in_memory(self) -> int:
+        return self._bytes_in_memory
+
+    def __iter__(self) -> Generator[FormPartV1_1, None, None]:
+        if self._started is True:
+            raise FormAlreadyParsedException("The form has already been parsed, its parts are found in parts")
+        self._started = True
+        if self._multipart is True:
+            return self.__parse_multipart()
+        return self.__parse_urlencoded()
+
+    def close(self) -> None:
+        # Deletes the temporary files of the parts that were spilled to disk
+        for part in self._parts:
+            part.close()
+        return None
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+        return None
+
+    def __read(self) -> bytes:
+        chunk: bytes = self._stream.read(self._chunk_size)
+        self._bytes_read += len(chunk)
+        if self._max_size is not None and self._bytes_read > self._max_size:
+            raise _too_large(f"The form exceeds the maximum allowed size of {self._max_size} bytes")
+        return chunk
+
+    def __new_part(self, name: str, filename: str|None = None, content_type: str|None = None, headers: dict[str, str]|None = None) -> FormPartV1_1:
+        if len(self._parts) >= self._max_parts:
+            raise _too_large(f"The form has more than the maximum allowed {self._max_parts} parts")
+        part: FormPartV1_1 = FormPartV1_1(
+            name=name,
+            filename=filename,
+            content_type=content_type,
+            headers=headers,
+            spool_threshold=self._spool_threshold
+        )
+        self._parts.append(part)
+        return part
+
+    def __write(self, part: FormPartV1_1, data: bytes|bytearray|memoryview) -> None:
+        if len(data) < 1:
+            return None
+        if part.spilled is False:
+            if self._bytes_in_memory + len(data) > self._spool_threshold:
+                # The threshold applies to the whole form, the part that's growing is moved to disk
+                self._bytes_in_memory -= part.size
+                part.spill()
+            else:
+                self._bytes_in_memory += len(data)
+        part.write(data)
+        if part.is_file is False and part.size > self._max_field_size:
+            raise _too_large(f"The form field '{part.name}' exceeds the maximum allowed size of {self._max_field_size} bytes")
+        if self._max_part_size is not None and part.size > self._max_part_size:
+            raise _too_large(f"The form part '{part.name}' exceeds the maximum allowed size of {self._max_part_size} bytes")
+        return None
+
+    def __parse_urlencoded(self) -> Generator[FormPartV1_1, None, None]:
+        from urllib.parse import unquote_to_bytes
+        buffer: bytearray = bytearray()
+        while True:
+            chunk: bytes = self.__read()
+            buffer += chunk
+            fields: list[bytearray] = buffer.split(b"&")
+            # The last field is only complete at the end of the body
+            buffer = fields.pop() if len(chunk) > 0 else bytearray()
+            if len(buffer) > self._max_field_size:
+                raise _too_large(f"A form field exceeds the maximum allowed size of {self._max_field_size} bytes")
+            for field in fields:
+                if len(field) < 1:
+                    continue
+                name, _, value = bytes(field).replace(b"+", b" ").partition(b"=")
+                part: FormPartV1_1 = self.__new_part(
+                    name=unquote_to_bytes(name).decode("utf-8", errors="replace")
+                )
+                self.__write(part, unquote_to_bytes(value))
+                yield part
+            if len(chunk) < 1:
+                return None
+
+    def __fill(self, buffer: bytearray) -> bool:
+        # Returns whether the end of the body was reached
+        chunk: bytes = self.__read()
+        buffer += chunk
+        return len(chunk) < 1
+
+    def __parse_multipart(self) -> Generator[FormPartV1_1, None, None]:
+        delimiter: bytes = self._delimiter
+        buffer: bytearray = bytearray(b"\r\n")
+        ended: bool = False
+        # None while the preamble before the first delimiter is skipped
+        part: FormPartV1_1|None = None
+        while True:
+            index: int = buffer.find(delimiter)
+            while index < 0:
+                if ended:
+                    raise BadRequestException(reason="The multipart body ended before its closing boundary")
+                # Whatever can't be the start of a delimiter belongs to the part
+                safe: int = max(len(buffer) - len(delimiter) + 1, 0)
+                if part is not None:
+                    self.__write(part, memoryview(buffer)[:safe])
+                del buffer[:safe]
+                ended = self.__fill(buffer)
+                index = buffer.find(delimiter)
+            if part is not None:
+                self.__write(part, memoryview(buffer)[:index])
+                yield part
+                part = None
+            del buffer[:index + len(delimiter)]
+            # The last delimiter is followed by '--', the others by a line break
+            line_end: int = buffer.find(b"\r\n")
+            while line_end < 0 and not buffer.startswith(b"--"):
+                if ended or len(buffer) > 256:
+                    raise BadRequestException(reason="Malformed multipart boundary")
+                ended = self.__fill(buffer)
+                line_end = buffer.find(b"\r\n")
+            if buffer.startswith(b"--"):
+                # The epilogue is read and ignored
+                while not ended:
+                    del buffer[:]
+                    ended = self.__fill(buffer)
+                return None
+            if len(buffer[:line_end].strip(b" \t")) > 0:
+                raise BadRequestException(reason="Malformed multipart boundary")
+            del buffer[:line_end + 2]
+            while True:
+                if buffer.startswith(b"\r\n"):
+                    head: bytes = b""
+                    del buffer[:2]
+                    break
+                head_end: int = buffer.find(b"\r\n\r\n")
+                if 0 <= head_end <= self._max_header_size:
+                    head: bytes = bytes(buffer[:head_end])
+                    del buffer[:head_end + 4]
+                    break
+                if len(buffer) > self._max_header_size:
+                    raise _too_large(f"The headers of a form part exceed the maximum allowed size of {self._max_header_size} bytes")
+                if ended:
+                    raise BadRequestException(reason="The multipart body ended in the headers of a part")
+                ended = self.__fill(buffer)
+            part = self.__part_from_head(head)
+
+    def __part_from_head(self, head: bytes) -> FormPartV1_1:
+        headers: dict[str, str] = dict()
+        for line in head.decode("utf-8", errors="replace").split("\r\n"):
+            name, separator, value = line.partition(":")
+            if len(separator) < 1:
+                raise BadRequestException(reason="Malformed header in a form part")
+            headers[name.strip().lower()] = value.strip()
+        disposition, parameters = parse_header_parameters(headers.get("content-disposition", ""))
+        if disposition != "form-data" or "name" not in parameters:
+            raise BadRequestException(reason="A form part has no form-data content disposition with a name")
+        return self.__new_part(
+            name=parameters["name"],
+            filename=parameters.get("filename"),
+            content_type=headers.get("content-type"),
+            headers=headers
+        )
+
+
+
+FormPart = FormPartV1_1
+FormParser = FormParserV1_1
@@ -1,13 +1,22 @@
 from __future__ import annotations
 
-from typing import Callable, Any
-from typing_extensions import Self
+from typing import TYPE_CHECKING, Callable, Any, Hashable, Mapping
 from abc import ABC, abstractmethod
-from urllib.parse import urlparse
+from collections import OrderedDict
+from functools import partial
+from threading import Lock
+import gc
 
 from chains.src.request import IRequest
-from chains.src.response import IResponse
-from chains.src.exceptions import NotFoundException, MethodNotAllowedException
+from chains.src.response import IResponse, ImmutableResponseV1_1
+from chains.src.exceptions import NotFoundException, FrozenApplicationException, InvalidSettingsException, DuplicateRouteException, HandlerChainException
+from chains.src.error_responses import NOT_FOUND_RESPONSE, method_not_allowed_response
+from chains.src.path_params import PathParamName, PathParamSpec, EMPTY_PATH_PARAMS, parse_route_path, compile_path_params, no_path_params
+from chains.src.metrics import MetricsV1_1, LatencyHistogram, middleware_name, timed, async_timed, counted, async_counted, timed_middleware
+from chains.src.asgi import AsyncComposerV1_1, AsyncRequestHandler, ComposedHandler, is_async_function, run_async_route_function, run_async_middleware_function
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
 
 
 
@@ -36,6 +45,8 @@ class IMiddlewareHandler(IRequestHandler, ABC):
 class IIngressHandler(IRequestHandler, ABC):
 
     def add_middleware(self, middleware_function: Callable, *args, **kwargs) -> Self:
+        if self._frozen is True:
+            raise FrozenApplicationException("Middleware can not be added once the application has been frozen")
         middleware: MiddlewareHandlerV1_1 = MiddlewareHandlerV1_1(
             next=self._next,
             middleware_function=middleware_function,
@@ -45,6 +56,36 @@ class IIngressHandler(IRequestHandler, ABC):
         self._next = middleware
         return self
 
+    def freeze(self) -> Self:
+        self._frozen = True
+        return self
+
+    def middleware_handlers(self) -> list[MiddlewareHandlerV1_1]:
+        middleware_handlers: list[MiddlewareHandlerV1_1] = list()
+        handler: IRequestHandler = self._next
+        while isinstance(handler, MiddlewareHandlerV1_1):
+            middleware_handlers.append(handler)
+            handler = handler.next
+        return middleware_handlers
+
+    def compose_middleware(self, downstream: Callable[[IRequest], IResponse], metrics: MetricsV1_1|None = None) -> Callable[[IRequest], IResponse]:
+        composed: Callable[[IRequest], IResponse] = downstream
+        for middleware_handler in reversed(self.middleware_handlers()):
+            composed = middleware_handler.compose(
+                downstream=composed,
+                metrics=metrics
+            )
+        return composed
+
+    def compose_middleware_async(self, downstream: ComposedHandler, composer: AsyncComposerV1_1) -> ComposedHandler:
+        composed: ComposedHandler = downstream
+        for middleware_handler in reversed(self.middleware_handlers()):
+            composed = middleware_handler.compose_async(
+                downstream=composed,
+                composer=composer
+            )
+        return composed
+
 class IRootIngressHandler(IIngressHandler, ABC):
 
     @property
@@ -89,6 +130,14 @@ class IBranchHandler(IRequestHandler, ABC):
     def add_route(self, path: str, method: str, route_function: Callable[[IRequest], IResponse]) -> Self:
         pass
 
+    @abstractmethod
+    def mount(self, route_handler: IRouteHandler) -> Self:
+        pass
+
+    @abstractmethod
+    def freeze(self) -> Self:
+        pass
+
 
 
 class RootIngressHandlerV1_1(IRootIngressHandler):
@@ -96,6 +145,7 @@ class RootIngressHandlerV1_1(IRootIngressHandler):
     def __init__(self, primary_branch_ingress_handler: IBranchIngressHandler) -> None:
         self._primary_branch_ingress_handler: IBranchIngressHandler = primary_branch_ingress_handler
         self._next: IMiddlewareHandler|IBranchIngressHandler = self._primary_branch_ingress_handler
+        self._frozen: bool = False
 
     @property
     def primary_branch_ingress_handler(self) -> IBranchIngressHandler:
@@ -106,15 +156,14 @@ class RootIngressHandlerV1_1(IRootIngressHandler):
         return self._next
 
     def handle(self, request: IRequest) -> IResponse:
-        return self._next.handle(
-            request=request
-        )
+        return self._next.handle(request)
 
 class BranchIngressHandlerV1_1(IBranchIngressHandler):
 
     def __init__(self) -> None:
         self._branch_handler: BranchHandlerV1_1 = BranchHandlerV1_1()
         self._next: BranchHandlerV1_1|IMiddlewareHandler = self._branch_handler
+        self._frozen: bool = False
 
     @property
     def next(self) -> BranchHandlerV1_1|IMiddlewareHandler:
@@ -125,9 +174,48 @@ class BranchIngressHandlerV1_1(IBranchIngressHandler):
         return self._branch_handler
 
     def handle(self, request: IRequest) -> IResponse:
-        return self._next.handle(
-            request=request
+        return self._next.handle(request)
+
+    def freeze(self, route_cache_size: int|None = None, metrics: MetricsV1_1|None = None) -> Self:
+        self._frozen = True
+        self._branch_handler.freeze(
+            route_cache_size=route_cache_size,
+            metrics=metrics
         )
+        return self
+
+    def compose(self, downstream: Callable[[IRequest], IResponse], metrics: MetricsV1_1|None = None) -> Callable[[IRequest], IResponse]:
+        composed: Callable[[IRequest], IResponse] = self.compose_middleware(
+            downstream=downstream,
+            metrics=metrics
+        )
+        remove_path_prefix: Callable[[str], str] = self.__remove_path_prefix
+
+        def enter_branch(request: IRequest) -> IResponse:
+            request.path = remove_path_prefix(request.path)
+            return composed(request)
+        return enter_branch
+
+    def compose_async(self, downstream: ComposedHandler, composer: AsyncComposerV1_1) -> ComposedHandler:
+        remove_path_prefix: Callable[[str], str] = self.__remove_path_prefix
+
+        def enter_branch(request: IRequest) -> None:
+            request.path = remove_path_prefix(request.path)
+            return None
+        return composer.compose_preprocessor(
+            preprocessor=enter_branch,
+            downstream=self.compose_middleware_async(
+                downstream=downstream,
+                composer=composer
+            )
+        )
+
+    def __remove_path_prefix(self, path: str) -> str:
+        preprocessed_path: str = path.lstrip().strip("/")
+        separator_index: int = preprocessed_path.find("/")
+        if separator_index < 0:
+            return ""
+        return preprocessed_path[separator_index:]
 
     def __str__(self) -> str:
         return self._str_helper_()
@@ -151,50 +239,144 @@ class MiddlewareHandlerV1_1(IMiddlewareHandler):
         self._middleware_function: Callable[[IRequest, Callable[[IRequest], IResponse]], IResponse] = middleware_function
         self._pos_dependencies: tuple[Any, ...] = args
         self._kw_dependencies: dict[str, Any] = kwargs
-
-        def wrapped_next(request: IRequest) -> IResponse:
-            return self._next.handle(
-                request=request
-            )
-        self._wrapped_next: Callable[[IRequest], IResponse] = wrapped_next
+        self._is_async: bool = is_async_function(middleware_function)
+        self._wrapped_next: Callable[[IRequest], IResponse] = next.handle
 
     @property
     def next(self) -> IMiddlewareHandler|IBranchHandler|IBranchIngressHandler:
         if self._next is None:
-            #TODO: Raise a proper error here
-            raise ValueError("The downstream handler for this middleware hasn't been set")
+            raise HandlerChainException("The downstream handler for this middleware hasn't been set")
         return self._next
 
     @next.setter
     def next(self, next: IMiddlewareHandler|IBranchHandler|IBranchIngressHandler) -> Self:
         self._next = next
-        def wrapped_next(request: IRequest) -> IResponse:
-            return self._next.handle(
-                request=request
-            )
-        self._wrapped_next = wrapped_next
+        self._wrapped_next = next.handle
         return self
 
     def handle(self, request: IRequest) -> IResponse:
+        if self._is_async is True:
+            return run_async_middleware_function(
+                self._middleware_function, request, self._wrapped_next, self._pos_dependencies, self._kw_dependencies
+            )
         return self._middleware_function(request, self._wrapped_next, *self._pos_dependencies, **self._kw_dependencies)
 
+    def compose(self, downstream: Callable[[IRequest], IResponse], metrics: MetricsV1_1|None = None) -> Callable[[IRequest], IResponse]:
+        if metrics is not None:
+            return self.__compose_instrumented(
+                downstream=downstream,
+                metrics=metrics
+            )
+        if self._is_async is True:
+            middleware_function: Callable = self._middleware_function
+            pos_dependencies: tuple[Any, ...] = self._pos_dependencies
+            kw_dependencies: dict[str, Any] = self._kw_dependencies
+
+            def composed_async_middleware(request: IRequest) -> IResponse:
+                return run_async_middleware_function(
+                    middleware_function, request, downstream, pos_dependencies, kw_dependencies
+                )
+            return composed_async_middleware
+        if len(self._pos_dependencies) > 0:
+            middleware_function: Callable = self._middleware_function
+            pos_dependencies: tuple[Any, ...] = self._pos_dependencies
+            kw_dependencies: dict[str, Any] = self._kw_dependencies
+
+            def composed_with_dependencies(request: IRequest) -> IResponse:
+                return middleware_function(request, downstream, *pos_dependencies, **kw_dependencies)
+            return composed_with_dependencies
+        if len(self._kw_dependencies) > 0:
+            bound_middleware_function: Callable = partial(self._middleware_function, **self._kw_dependencies)
+        else:
+            bound_middleware_function: Callable = self._middleware_function
+
+        def composed(request: IRequest) -> IResponse:
+            return bound_middleware_function(request, downstream)
+        return composed
+
+    def __compose_instrumented(self, downstream: Callable[[IRequest], IResponse], metrics: MetricsV1_1) -> Callable[[IRequest], IResponse]:
+        middleware_function: Callable = self._middleware_function
+        pos_dependencies: tuple[Any, ...] = self._pos_dependencies
+        kw_dependencies: dict[str, Any] = self._kw_dependencies
+        if self._is_async is True:
+            def call_middleware(request: IRequest, next: Callable[[IRequest], IResponse]) -> IResponse:
+                return run_async_middleware_function(
+                    middleware_function, request, next, pos_dependencies, kw_dependencies
+                )
+        else:
+            def call_middleware(request: IRequest, next: Callable[[IRequest], IResponse]) -> IResponse:
+                return middleware_function(request, next, *pos_dependencies, **kw_dependencies)
+        return timed_middleware(
+            call_middleware=call_middleware,
+            downstream=downstream,
+            histogram=metrics.middleware_histogram(
+                name=middleware_name(middleware_function)
+            )
+        )
+
+    def compose_async(self, downstream: ComposedHandler, composer: AsyncComposerV1_1) -> ComposedHandler:
+        return composer.compose_middleware(
+            middleware_function=self._middleware_function,
+            pos_dependencies=self._pos_dependencies,
+            kw_dependencies=self._kw_dependencies,
+            downstream=downstream
+        )
+
 
 
 class RouteHandlerV1_1(IRouteHandler):
 
-    def __init__(self, route_function: Callable[[IRequest], IResponse]) -> None:
+    def __init__(self, route_function: Callable[[IRequest], IResponse], path_param_spec: PathParamSpec = tuple()) -> None:
         self._route_function: Callable[[IRequest], IResponse] = route_function
+        self._is_async: bool = is_async_function(route_function)
+        self._path_param_spec: PathParamSpec = path_param_spec
+        self._path_params: Callable[[list[str]], Mapping[PathParamName, Any]|None] = compile_path_params(path_param_spec)
 
     @property
     def route_function(self) -> Callable[[IRequest], IResponse]:
         return self._route_function
 
+    @property
+    def path_param_spec(self) -> PathParamSpec:
+        return self._path_param_spec
+
+    def path_params(self, captured: list[str]) -> Mapping[PathParamName, Any]|None:
+        return self._path_params(captured)
+
     def handle(self, request: IRequest) -> IResponse:
+        if self._is_async is True:
+            return run_async_route_function(self._route_function, request)
         return self._route_function(request)
 
     def __str__(self) -> str:
         return f"{self._route_function.__name__}()"
 
+class PrebuiltResponseRouteHandlerV1_1(IRouteHandler):
+
+    # Returned by the route table in place of raising an exception when a path
+    # doesn't exist or doesn't support a method
+    def __init__(self, response: ImmutableResponseV1_1) -> None:
+        self._response: ImmutableResponseV1_1 = response
+
+    @property
+    def response(self) -> ImmutableResponseV1_1:
+        return self._response
+
+    @property
+    def route_function(self) -> Callable[[IRequest], IResponse]:
+        return self.handle
+
+    def handle(self, request: IRequest) -> IResponse:
+        # Middleware can change the response it gets without changing the shared one
+        return self._response.copy_on_write()
+
+    def __str__(self) -> str:
+        return f"{self._response.status_code} {self._response.status_text}"
+
+NOT_FOUND_ROUTE_HANDLER: PrebuiltResponseRouteHandlerV1_1 = PrebuiltResponseRouteHandlerV1_1(
+    response=NOT_FOUND_RESPONSE
+)
+
 
 
 class RouteTableEntry:
@@ -202,6 +384,9 @@ class RouteTableEntry:
     def __init__(self) -> None:
         self._route_table: RouteTable|None = None
         self._route_handlers: dict[str, IRouteHandler] = dict()
+        # Built on the first request for a method the path doesn't support, so that
+        # registering a route doesn't have to build a response for it
+        self._method_not_allowed_handler: IRouteHandler|None = None
 
     @property
     def route_table(self) -> RouteTable:
@@ -209,26 +394,36 @@ class RouteTableEntry:
             raise NotFoundException()
         return self._route_table
 
+    @property
+    def has_route_table(self) -> bool:
+        return self._route_table is not None
+
     @route_table.setter
     def route_table(self, route_table: RouteTable) -> Self:
         if self._route_table is not None:
-            #TODO: Raise an appropriate error
-            raise ValueError("RouteTable has already been set")
+            raise HandlerChainException("RouteTable has already been set")
         self._route_table = route_table
         return self
 
     def get_route_handler_for_method(self, method: str) -> IRouteHandler:
-        if method not in self._route_handlers:
-            raise MethodNotAllowedException(
-                allowed_methods=list(self._route_handlers.keys())
+        route_handler: IRouteHandler|None = self._route_handlers.get(method)
+        if route_handler is not None:
+            return route_handler
+        if len(self._route_handlers) < 1:
+            return NOT_FOUND_ROUTE_HANDLER
+        if self._method_not_allowed_handler is None:
+            self._method_not_allowed_handler = PrebuiltResponseRouteHandlerV1_1(
+                response=method_not_allowed_response(
+                    allowed_methods=list(self._route_handlers.keys())
+                )
             )
-        return self._route_handlers[method]
+        return self._method_not_allowed_handler
 
     def add_route_handler_for_method(self, method: str, route_handler: IRouteHandler) -> Self:
         if method in self._route_handlers:
-            #TODO: Raise appropriate error
-            raise ValueError("That route has already been registered")
+            raise DuplicateRouteException("That route has already been registered")
         self._route_handlers[method] = route_handler
+        self._method_not_allowed_handler = None
         return self
 
 class RouteTable:
@@ -292,7 +487,8 @@ class RouteTable:
         path_remnant: str = preprocessed_path.lstrip(current_path)
         if current_path == "<>":
             if len(path_remnant) > 0:
-                self._wildcard.route_table = RouteTable()
+                if not self._wildcard.has_route_table:
+                    self._wildcard.route_table = RouteTable()
                 self._wildcard.route_table.add_path(
                     path=path_remnant,
                     method=method,
@@ -324,8 +520,9 @@ class RouteTable:
                     )
             else:
                 self._table[current_path] = RouteTableEntry()
-                self._table[current_path].route_table = RouteTable()
                 if len(path_remnant) > 0:
+                    # Paths that end here don't get a table, it's added if a longer path is registered later
+                    self._table[current_path].route_table = RouteTable()
                     self._table[current_path].route_table.add_path(
                         path=path_remnant,
                         method=method,
@@ -338,7 +535,7 @@ class RouteTable:
                     )
         return self
 
-    def get_route(self, path: str, method: str) -> IRouteHandler:
+    def get_route(self, path: str, method: str, captured: list[str]|None = None) -> IRouteHandler:
         preprocessed_path: str = self.__preprocess_path(
             path=path
         )
@@ -351,19 +548,27 @@ class RouteTable:
         path_remnant: str = preprocessed_path.lstrip(current_path)
         if current_path in self._table:
             if len(path_remnant) > 0:
+                if not self._table[current_path].has_route_table:
+                    return NOT_FOUND_ROUTE_HANDLER
                 return self._table[current_path].route_table.get_route(
                     path=path_remnant,
-                    method=method
+                    method=method,
+                    captured=captured
                 )
             else:
                 return self._table[current_path].get_route_handler_for_method(
                     method=method
                 )
         else:
+            if captured is not None:
+                captured.append(current_path)
             if len(path_remnant) > 0:
+                if not self._wildcard.has_route_table:
+                    return NOT_FOUND_ROUTE_HANDLER
                 return self._wildcard.route_table.get_route(
                     path=path_remnant,
-                    method=method
+                    method=method,
+                    captured=captured
                 )
             else:
                 if self._wildcard_ingress_allowed is True:
@@ -371,18 +576,380 @@ class RouteTable:
                         method=method
                     )
                 else:
-                    raise NotFoundException()
+                    return NOT_FOUND_ROUTE_HANDLER
+
+class RouteMatch:
+
+    def __init__(self, node: CompiledRouteNode, route_handler: IRouteHandler|None, dispatcher: Callable[[IRequest], IResponse], method: str|None = None, template: str|None = None) -> None:
+        self.node: CompiledRouteNode = node
+        self.route_handler: IRouteHandler|None = route_handler
+        self.dispatcher: Callable[[IRequest], IResponse] = dispatcher
+        self.async_dispatcher: AsyncRequestHandler|None = None
+        # Only set for the matches of route handlers registered for a method
+        self.method: str|None = method
+        # The route template that metrics and profiles are recorded under
+        self.template: str = template if template is not None else node.template
+        # Shared with the route handler, which compiled it when it was registered
+        self.path_params: Callable[[list[str]], Mapping[PathParamName, Any]|None] = (
+            route_handler._path_params if isinstance(route_handler, RouteHandlerV1_1) else no_path_params
+        )
+
+class CompiledRouteNode:
+
+    def __init__(self, template: str, branches: tuple[BranchIngressHandlerV1_1, ...]) -> None:
+        self.template: str = template
+        self.branches: tuple[BranchIngressHandlerV1_1, ...] = branches
+        self.static: dict[str, CompiledRouteNode] = dict()
+        self.wildcard: CompiledRouteNode|None = None
+        self.route_handlers: dict[str, IRouteHandler] = dict()
+        self.matches: dict[str, RouteMatch] = dict()
+        self.not_found: RouteMatch|None = None
+        self.fallback: RouteMatch|None = None
+        self.method_not_allowed_handler: PrebuiltResponseRouteHandlerV1_1|None = None
+        self.mount: IRouteHandler|None = None
+
+    def child(self, segment: str, branches: tuple[BranchIngressHandlerV1_1, ...]|None = None) -> CompiledRouteNode:
+        template: str = f"{self.template.rstrip('/')}/{segment}"
+        return CompiledRouteNode(
+            template=template,
+            branches=self.branches if branches is None else branches
+        )
+
+class CompiledRouter:
+
+    __UNMATCHED: str = "<unmatched>"
+    __OTHER_METHODS: str = "<other>"
+
+    def __init__(self, branch_handler: BranchHandlerV1_1, metrics: MetricsV1_1|None = None) -> None:
+        self._metrics: MetricsV1_1|None = metrics
+        self._root: CompiledRouteNode = CompiledRouteNode(template="/", branches=tuple())
+        self._static_routes: dict[str, CompiledRouteNode] = dict()
+        self._matches: list[RouteMatch] = list()
+        self._not_found_matches: dict[tuple[BranchIngressHandlerV1_1, ...], RouteMatch] = dict()
+        self.__compile_branch(
+            branch_handler=branch_handler,
+            node=self._root
+        )
+        self.__compile_matches(
+            node=self._root,
+            static_path=""
+        )
+
+    def __compile_branch(self, branch_handler: BranchHandlerV1_1, node: CompiledRouteNode) -> None:
+        if branch_handler._mount is not None:
+            node.mount = branch_handler._mount
+            return None
+        for branch_name, branch_ingress_handler in branch_handler._branches.items():
+            branch_ingress_handler._frozen = True
+            branch_ingress_handler.branch_handler._frozen = True
+            branch_node: CompiledRouteNode = node.child(
+                segment=branch_name,
+                branches=node.branches + (branch_ingress_handler,)
+            )
+            node.static[branch_name] = branch_node
+            self.__compile_branch(
+                branch_handler=branch_ingress_handler.branch_handler,
+                node=branch_node
+            )
+        self.__compile_route_table(
+            route_table=branch_handler._routes,
+            node=node
+        )
+
+    def __compile_route_table(self, route_table: RouteTable, node: CompiledRouteNode) -> None:
+        for path, route_table_entry in route_table._table.items():
+            if len(path) < 1:
+                entry_node: CompiledRouteNode = node
+            else:
+                if path not in node.static:
+                    node.static[path] = node.child(segment=path)
+                entry_node: CompiledRouteNode = node.static[path]
+            entry_node.route_handlers.update(route_table_entry._route_handlers)
+            if route_table_entry._route_table is not None:
+                self.__compile_route_table(
+                    route_table=route_table_entry._route_table,
+                    node=entry_node
+                )
+        wildcard: RouteTableEntry = route_table._wildcard
+        if len(wildcard._route_handlers) < 1 and wildcard._route_table is None:
+            return None
+        if node.wildcard is None:
+            node.wildcard = node.child(segment="<>")
+        node.wildcard.route_handlers.update(wildcard._route_handlers)
+        if wildcard._route_table is not None:
+            self.__compile_route_table(
+                route_table=wildcard._route_table,
+                node=node.wildcard
+            )
+        return None
+
+    def __compose(self, branches: tuple[BranchIngressHandlerV1_1, ...], terminal: Callable[[IRequest], IResponse]) -> Callable[[IRequest], IResponse]:
+        composed: Callable[[IRequest], IResponse] = terminal
+        for branch_ingress_handler in reversed(branches):
+            composed = branch_ingress_handler.compose(
+                downstream=composed,
+                metrics=self._metrics
+            )
+        return composed
+
+    def __compose_async(self, branches: tuple[BranchIngressHandlerV1_1, ...], terminal: ComposedHandler, composer: AsyncComposerV1_1) -> AsyncRequestHandler:
+        composed: ComposedHandler = terminal
+        for branch_ingress_handler in reversed(branches):
+            composed = branch_ingress_handler.compose_async(
+                downstream=composed,
+                composer=composer
+            )
+        return composed.async_handler
+
+    def __metric_labels(self, node: CompiledRouteNode, route_handler: IRouteHandler|None, method: str|None) -> tuple[str, str]:
+        if route_handler is None and len(node.route_handlers) < 1:
+            return (self.__UNMATCHED, self.__OTHER_METHODS)
+        return (node.template, method if method is not None else self.__OTHER_METHODS)
+
+    def __match(self, node: CompiledRouteNode, route_handler: IRouteHandler|None, terminal: Callable[[IRequest], IResponse], method: str|None = None) -> RouteMatch:
+        template, metric_method = self.__metric_labels(node, route_handler, method)
+        if self._metrics is not None:
+            if route_handler is not None:
+                terminal = timed(
+                    function=terminal,
+                    histogram=self._metrics.route_histogram(template=template, method=metric_method)
+                )
+            dispatcher: Callable[[IRequest], IResponse] = counted(
+                function=self.__compose(
+                    branches=node.branches,
+                    terminal=terminal
+                ),
+                metrics=self._metrics,
+                template=template,
+                method=metric_method
+            )
+        else:
+            dispatcher: Callable[[IRequest], IResponse] = self.__compose(
+                branches=node.branches,
+                terminal=terminal
+            )
+        match: RouteMatch = RouteMatch(
+            node=node,
+            route_handler=route_handler,
+            dispatcher=dispatcher,
+            method=method,
+            template=template
+        )
+        self._matches.append(match)
+        return match
+
+    def __compile_matches(self, node: CompiledRouteNode, static_path: str|None) -> None:
+        if node.mount is not None:
+            # Every path below a mounted handler resolves to the node itself, as it has no children
+            node.not_found = self.__match(
+                node=node,
+                route_handler=node.mount,
+                terminal=node.mount.handle
+            )
+            node.fallback = node.not_found
+            return None
+        if node.branches not in self._not_found_matches:
+            self._not_found_matches[node.branches] = self.__match(
+                node=node,
+                route_handler=None,
+                terminal=NOT_FOUND_ROUTE_HANDLER.handle
+            )
+        node.not_found = self._not_found_matches[node.branches]
+        for method, route_handler in node.route_handlers.items():
+            node.matches[method] = self.__match(
+                node=node,
+                route_handler=route_handler,
+                terminal=route_handler.handle,
+                method=method
+            )
+        if len(node.route_handlers) > 0:
+            node.method_not_allowed_handler = PrebuiltResponseRouteHandlerV1_1(
+                response=method_not_allowed_response(
+                    allowed_methods=list(node.route_handlers.keys())
+                )
+            )
+            node.fallback = self.__match(
+                node=node,
+                route_handler=None,
+                terminal=node.method_not_allowed_handler.handle
+            )
+            if static_path is not None:
+                self._static_routes[static_path] = node
+        else:
+            node.fallback = node.not_found
+        for segment, child in node.static.items():
+            self.__compile_matches(
+                node=child,
+                static_path=None if static_path is None else f"{static_path}/{segment}".lstrip("/")
+            )
+        if node.wildcard is not None:
+            self.__compile_matches(
+                node=node.wildcard,
+                static_path=None
+            )
+        return None
+
+    def compile_async(self, composer: AsyncComposerV1_1) -> Self:
+        for match in self._matches:
+            if match.route_handler is not None:
+                terminal: ComposedHandler = composer.compose_terminal(
+                    function=match.route_handler.route_function
+                )
+            elif match.node.method_not_allowed_handler is not None and match is match.node.fallback:
+                response: ImmutableResponseV1_1 = match.node.method_not_allowed_handler.response
+                async def method_not_allowed(request: IRequest, response: ImmutableResponseV1_1 = response) -> IResponse:
+                    return response.copy_on_write()
+                terminal: ComposedHandler = composer.compose_terminal(
+                    function=method_not_allowed
+                )
+            else:
+                async def not_found(request: IRequest) -> IResponse:
+                    return NOT_FOUND_RESPONSE.copy_on_write()
+                terminal: ComposedHandler = composer.compose_terminal(
+                    function=not_found
+                )
+            if self._metrics is None:
+                match.async_dispatcher = self.__compose_async(
+                    branches=match.node.branches,
+                    terminal=terminal,
+                    composer=composer
+                )
+                continue
+            template, metric_method = self.__metric_labels(match.node, match.route_handler, match.method)
+            if match.route_handler is not None:
+                histogram: LatencyHistogram = self._metrics.route_histogram(template=template, method=metric_method)
+                terminal = ComposedHandler(
+                    async_handler=async_timed(
+                        function=terminal.async_handler,
+                        histogram=histogram
+                    ),
+                    sync_handler=timed(
+                        function=terminal.sync_handler,
+                        histogram=histogram
+                    ) if terminal.sync_handler is not None else None
+                )
+            match.async_dispatcher = async_counted(
+                function=self.__compose_async(
+                    branches=match.node.branches,
+                    terminal=terminal,
+                    composer=composer
+                ),
+                metrics=self._metrics,
+                template=template,
+                method=metric_method
+            )
+        return self
+
+    def resolve(self, path: str, method: str) -> ResolvedRoute:
+        preprocessed_path: str = path.strip("/")
+        node: CompiledRouteNode|None = self._static_routes.get(preprocessed_path)
+        captured: list[str]|None = None
+        if node is None:
+            node = self._root
+            for segment in preprocessed_path.split("/"):
+                if len(segment) < 1:
+                    continue
+                child: CompiledRouteNode|None = node.static.get(segment)
+                if child is None:
+                    child = node.wildcard
+                    if child is None:
+                        return (node.not_found, EMPTY_PATH_PARAMS)
+                    if captured is None:
+                        captured = list()
+                    captured.append(segment)
+                node = child
+        match: RouteMatch|None = node.matches.get(method)
+        if match is None:
+            return (node.fallback, EMPTY_PATH_PARAMS)
+        if captured is None:
+            return (match, EMPTY_PATH_PARAMS)
+        # Captured values are converted here, only once per path when the route cache is used
+        path_params: Mapping[PathParamName, Any]|None = match.path_params(captured)
+        if path_params is None:
+            return (node.not_found, EMPTY_PATH_PARAMS)
+        return (match, path_params)
+
+ResolvedRoute = tuple[RouteMatch, Mapping[PathParamName, Any]]
+
+class RouteResolutionCache:
+
+    def __init__(self, max_size: int) -> None:
+        if max_size < 1:
+            raise InvalidSettingsException("The route resolution cache must be able to hold at least one entry")
+        self._max_size: int = max_size
+        self._entries: OrderedDict[Hashable, ResolvedRoute] = OrderedDict()
+        self._lock: Lock = Lock()
+        self._hits: int = 0
+        self._misses: int = 0
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def get(self, key: Hashable) -> ResolvedRoute|None:
+        # Reads don't take the lock, single operations on the dict are atomic under the GIL. The
+        # counters and the recency of the entries are best effort, and an entry that another
+        # thread evicts in between is simply not moved
+        resolved_route: ResolvedRoute|None = self._entries.get(key)
+        if resolved_route is None:
+            self._misses += 1
+            return None
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            pass
+        self._hits += 1
+        return resolved_route
+
+    def put(self, key: Hashable, resolved_route: ResolvedRoute) -> Self:
+        with self._lock:
+            self._entries[key] = resolved_route
+            self._entries.move_to_end(key)
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+        return self
+
+    def clear(self) -> Self:
+        with self._lock:
+            self._entries.clear()
+            self._hits = 0
+            self._misses = 0
+        return self
+
+    def __str__(self) -> str:
+        return f"RouteResolutionCache(size={self.size}, max_size={self._max_size}, hits={self._hits}, misses={self._misses})"
 
 class BranchHandlerV1_1(IBranchHandler):
 
     def __init__(self) -> None:
         self._branches: dict[str, BranchIngressHandlerV1_1] = dict()
         self._routes: RouteTable = RouteTable()
+        self._router: CompiledRouter|None = None
+        self._route_cache: RouteResolutionCache|None = None
+        # Handles every request that reaches the branch when set
+        self._mount: IRouteHandler|None = None
+        self._frozen: bool = False
 
     def __preprocess_path(self, path: str) -> str:
         return path.lstrip().lstrip("/").rstrip("/")
 
     def add_branch(self, name: str, branch_ingress_handler: IBranchIngressHandler) -> Self:
+        if self._frozen is True:
+            raise FrozenApplicationException("Branches can not be added once the application has been frozen")
+        if self._mount is not None:
+            raise ValueError("Branches can not be added to a branch that has a mounted handler")
         preprocessed_name: str = self.__preprocess_path(
             path=name
         )
@@ -399,9 +966,13 @@ class BranchHandlerV1_1(IBranchHandler):
                 "A route exists off of this branch with the same prefix as the branch you're trying to add."
             )
         self._branches[preprocessed_name] = branch_ingress_handler
-        return Self
+        return self
 
     def add_route(self, path: str, method: str, route_function: Callable[[IRequest], IResponse]) -> Self:
+        if self._frozen is True:
+            raise FrozenApplicationException("Routes can not be added once the application has been frozen")
+        if self._mount is not None:
+            raise ValueError("Routes can not be added to a branch that has a mounted handler")
         preprocessed_path: str = self.__preprocess_path(
             path=path
         )
@@ -415,21 +986,101 @@ class BranchHandlerV1_1(IBranchHandler):
             raise ValueError(
                 "A branch exists off of this route with the same path as the prefix of the route you're trying to add."
             )
+        route_path, path_param_spec = parse_route_path(
+            path=preprocessed_path
+        )
         new_route_handler: RouteHandlerV1_1 = RouteHandlerV1_1(
-            route_function=route_function
+            route_function=route_function,
+            path_param_spec=path_param_spec
         )
         self._routes.add_path(
-            path=path,
+            path=route_path,
             method=method,
             route_handler=new_route_handler
         )
         return self
 
+    def mount(self, route_handler: IRouteHandler) -> Self:
+        if self._frozen is True:
+            raise FrozenApplicationException("Handlers can not be mounted once the application has been frozen")
+        if len(self._branches) > 0 or len(self._routes._table) > 0 or self._mount is not None:
+            raise ValueError("Handlers can only be mounted on a branch that has no routes, branches or other mounted handlers")
+        self._mount = route_handler
+        return self
+
+    @property
+    def route_cache(self) -> RouteResolutionCache|None:
+        return self._route_cache
+
+    def freeze(self, route_cache_size: int|None = None, metrics: MetricsV1_1|None = None) -> Self:
+        self._frozen = True
+        if self._router is None:
+            # The router is made up of a lot of small objects that all live as long as the
+            # application does, collecting while they're created would keep walking over the
+            # ones created before them and make freezing slower the more routes there are
+            gc_enabled: bool = gc.isenabled()
+            gc.disable()
+            try:
+                self._router = CompiledRouter(
+                    branch_handler=self,
+                    metrics=metrics
+                )
+            finally:
+                if gc_enabled:
+                    gc.enable()
+        if route_cache_size is not None and self._route_cache is None:
+            self._route_cache = RouteResolutionCache(
+                max_size=route_cache_size
+            )
+        return self
+
+    def compile_async(self, composer: AsyncComposerV1_1) -> Self:
+        if self._router is None:
+            raise FrozenApplicationException("The branch has to be frozen before it can be compiled for asynchronous dispatch")
+        self._router.compile_async(
+            composer=composer
+        )
+        return self
+
+    def __resolve(self, request: IRequest) -> RouteMatch:
+        # The adapters split the query string off of the path
+        path: str = request.path.strip("/")
+        method: str = request.method
+        if self._route_cache is None:
+            match, path_params = self._router.resolve(
+                path=path,
+                method=method
+            )
+        else:
+            cache_key: tuple[str, str] = (path, method)
+            resolved_route: ResolvedRoute|None = self._route_cache.get(cache_key)
+            if resolved_route is None:
+                resolved_route = self._router.resolve(
+                    path=path,
+                    method=method
+                )
+                # 404s are cheap to resolve and would let requests for made up paths push the
+                # routes that are actually used out of the cache
+                resolved_match: RouteMatch = resolved_route[0]
+                if resolved_match is not resolved_match.node.not_found or resolved_match.route_handler is not None:
+                    self._route_cache.put(cache_key, resolved_route)
+            match, path_params = resolved_route
+        # The mapping is read only, so the one held by the route cache can be shared between requests
+        request.path_params = path_params
+        request.route_template = match.template
+        return match
+
+    async def handle_async(self, request: IRequest) -> IResponse:
+        return await self.__resolve(request).async_dispatcher(request)
+
     def handle(self, request: IRequest) -> IResponse:
+        if self._router is not None:
+            return self.__resolve(request).dispatcher(request)
+        if self._mount is not None:
+            return self._mount.handle(request)
         path, method = request.path, request.method
-        parsed_path: str = urlparse(path).path
         preprocessed_path: str = self.__preprocess_path(
-            path=parsed_path
+            path=path
         )
         path_prefix_characters: list[str] = list()
         for char in preprocessed_path:
@@ -445,10 +1096,19 @@ class BranchHandlerV1_1(IBranchHandler):
                 request=request
             )
         else:
+            captured: list[str] = list()
             route_handler: IRouteHandler = self._routes.get_route(
                 path=preprocessed_path,
-                method=method
+                method=method,
+                captured=captured
             )
+            if isinstance(route_handler, RouteHandlerV1_1) and len(captured) > 0:
+                path_params: Mapping[PathParamName, Any]|None = route_handler.path_params(captured)
+                if path_params is None:
+                    return NOT_FOUND_ROUTE_HANDLER.handle(
+                        request=request
+                    )
+                request.path_params = path_params
             return route_handler.handle(
                 request=request
             )
@@ -1,11 +1,19 @@
-from typing_extensions import Self
-from typing import Generator
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Generator, Iterable
 from abc import ABC, abstractmethod
 
+from chains.src.exceptions import HeaderClashException, MalformedHeaderException, ImmutableResponseException
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
 
 
 class IHeaders(ABC):
 
+    __slots__ = ()
+
     @abstractmethod
     def get_single_value_header(self, name: str) -> str|None:
         pass
@@ -38,18 +46,22 @@ class IHeaders(ABC):
     def serialize(self) -> str:
         pass
 
+    def header_list(self) -> list[tuple[str, str]]:
+        return [(header_name, str(header_value)) for header_name, header_value in self.yield_all_headers()]
+
 
 
 class HeadersV1_1(IHeaders):
 
+    __slots__ = ("_single_value_headers", "_multi_value_headers")
+
     def __init__(self) -> None:
         self._single_value_headers: dict[str, str] = dict()
         self._multi_value_headers: dict[str, list[str]] = dict()
 
     def set_single_value_header(self, name: str, value: str) -> Self:
         if name in self._multi_value_headers:
-            #TODO: Add an exception for a header clash
-            raise ValueError("Multi value headers with the same name already exists")
+            raise HeaderClashException("Multi value headers with the same name already exists")
         self._single_value_headers[name] = value
         return self
 
@@ -65,8 +77,7 @@ class HeadersV1_1(IHeaders):
 
     def add_multi_value_header(self, name: str, value: str) -> Self:
         if name in self._single_value_headers:
-            #TODO: Add an exception for a header clash
-            raise ValueError("A single value header with the same name already exists")
+            raise HeaderClashException("A single value header with the same name already exists")
         if name not in self._multi_value_headers:
             self._multi_value_headers[name] = list()
         self._multi_value_headers[name].append(value)
@@ -96,3 +107,332 @@ class HeadersV1_1(IHeaders):
         for header_name, header_value in self.yield_all_headers():
             headers_list.append(f"{header_name}: {header_value}\r\n")
         return "".join(headers_list)
+
+
+
+class CompactHeadersV1_1(IHeaders):
+
+    __slots__ = ("_headers", "_header_list")
+
+    # Maps header names that have already been validated to their lowercased keys
+    __KEYS: dict[str, str] = dict()
+    __MAX_CACHED_KEYS: int = 4096
+
+    def __init__(self) -> None:
+        # Maps the lowercased name of a header to its name and either its single
+        # value or the list of its values
+        self._headers: dict[str, tuple[str, str|list[str]]] = dict()
+        self._header_list: list[tuple[str, str]]|None = None
+
+    def __key(self, name: str) -> str:
+        key: str|None = self.__KEYS.get(name)
+        if key is not None:
+            return key
+        if len(name) < 1 or not name.isascii() or not name.isprintable() or ":" in name or " " in name:
+            raise MalformedHeaderException(f"Malformed header name '{name}'")
+        key = name.lower()
+        if len(self.__KEYS) < self.__MAX_CACHED_KEYS:
+            self.__KEYS[name] = key
+        return key
+
+    def __validate_value(self, value: Any) -> str:
+        value = str(value)
+        if "\r" in value or "\n" in value:
+            raise MalformedHeaderException("Header values can not contain line breaks")
+        if not value.isascii():
+            try:
+                value.encode("latin-1")
+            except UnicodeEncodeError:
+                raise MalformedHeaderException("Header values have to be encodable as latin-1")
+        return value
+
+    def get_single_value_header(self, name: str) -> str|None:
+        header: tuple[str, str|list[str]]|None = self._headers.get(self.__KEYS.get(name) or name.lower())
+        if header is None or header[1].__class__ is list:
+            return None
+        return header[1]
+
+    def set_single_value_header(self, name: str, value: str) -> Self:
+        key: str = self.__KEYS.get(name) or self.__key(name)
+        headers: dict[str, tuple[str, str|list[str]]] = self._headers
+        header: tuple[str, str|list[str]]|None = headers.get(key)
+        if header is not None and header[1].__class__ is list:
+            raise HeaderClashException("Multi value headers with the same name already exists")
+        if value.__class__ is not str or not value.isascii() or "\r" in value or "\n" in value:
+            value = self.__validate_value(value)
+        headers[key] = (name, value)
+        self._header_list = None
+        return self
+
+    def delete_single_value_header(self, name: str) -> Self:
+        key: str = self.__KEYS.get(name) or name.lower()
+        header: tuple[str, str|list[str]]|None = self._headers.get(key)
+        if header is not None and header[1].__class__ is not list:
+            del self._headers[key]
+            self._header_list = None
+        return self
+
+    def add_multi_value_header(self, name: str, value: str) -> Self:
+        key: str = self.__KEYS.get(name) or self.__key(name)
+        header: tuple[str, str|list[str]]|None = self._headers.get(key)
+        if header is None:
+            header = (name, list())
+            self._headers[key] = header
+        elif header[1].__class__ is not list:
+            raise HeaderClashException("A single value header with the same name already exists")
+        header[1].append(self.__validate_value(value))
+        self._header_list = None
+        return self
+
+    def yield_multi_value_header(self, name: str) -> Generator[str, str, None]:
+        header: tuple[str, str|list[str]]|None = self._headers.get(self.__KEYS.get(name) or name.lower())
+        if header is not None and header[1].__class__ is list:
+            for header_value in header[1]:
+                yield header_value
+        return None
+
+    def delete_multi_value_header(self, name: str) -> Self:
+        key: str = self.__KEYS.get(name) or name.lower()
+        header: tuple[str, str|list[str]]|None = self._headers.get(key)
+        if header is not None and header[1].__class__ is list:
+            del self._headers[key]
+            self._header_list = None
+        return self
+
+    def yield_all_headers(self) -> Generator[tuple[str, str], None, None]:
+        for header_name, header_value in self._headers.values():
+            if header_value.__class__ is list:
+                for value in header_value:
+                    yield (header_name, value)
+            else:
+                yield (header_name, header_value)
+        return None
+
+    def header_list(self) -> list[tuple[str, str]]:
+        if self._header_list is None:
+            header_list: list[tuple[str, str]] = list()
+            for header_name, header_value in self._headers.values():
+                if header_value.__class__ is list:
+                    for value in header_value:
+                        header_list.append((header_name, value))
+                else:
+                    header_list.append((header_name, header_value))
+            self._header_list = header_list
+        return self._header_list
+
+    def serialize(self) -> str:
+        headers_list: list[str] = list()
+        for header_name, header_value in self.header_list():
+            headers_list.append(f"{header_name}: {header_value}\r\n")
+        return "".join(headers_list)
+
+
+
+class ImmutableHeadersV1_1(CompactHeadersV1_1):
+
+    __slots__ = ()
+
+    def __init__(self, headers: Iterable[tuple[str, Any]]) -> None:
+        super().__init__()
+        for name, value in headers:
+            super().set_single_value_header(name=name, value=value)
+        self.header_list()
+
+    def __immutable(self) -> None:
+        raise ImmutableResponseException("These headers are shared between responses and can not be changed, copy the response to change them")
+
+    def set_single_value_header(self, name: str, value: str) -> Self:
+        self.__immutable()
+
+    def delete_single_value_header(self, name: str) -> Self:
+        self.__immutable()
+
+    def add_multi_value_header(self, name: str, value: str) -> Self:
+        self.__immutable()
+
+    def delete_multi_value_header(self, name: str) -> Self:
+        self.__immutable()
+
+
+
+class CopyOnWriteHeadersV1_1(CompactHeadersV1_1):
+
+    __slots__ = ("_owned",)
+
+    # Reads go to the headers of a shared response, they're copied the first time
+    # they're changed so the shared response stays as it is
+    def __init__(self, shared: CompactHeadersV1_1) -> None:
+        self._headers: dict[str, tuple[str, str|list[str]]] = shared._headers
+        self._header_list: list[tuple[str, str]]|None = shared.header_list()
+        self._owned: bool = False
+
+    def __own(self) -> None:
+        if self._owned is False:
+            self._headers = {
+                key: (name, list(value) if value.__class__ is list else value)
+                for key, (name, value) in self._headers.items()
+            }
+            self._owned = True
+        return None
+
+    def set_single_value_header(self, name: str, value: str) -> Self:
+        self.__own()
+        return super().set_single_value_header(name=name, value=value)
+
+    def delete_single_value_header(self, name: str) -> Self:
+        self.__own()
+        return super().delete_single_value_header(name=name)
+
+    def add_multi_value_header(self, name: str, value: str) -> Self:
+        self.__own()
+        return super().add_multi_value_header(name=name, value=value)
+
+    def delete_multi_value_header(self, name: str) -> Self:
+        self.__own()
+        return super().delete_multi_value_header(name=name)
+
+
+
+class EnvironHeadersV1_1(IHeaders):
+
+    __slots__ = ("_environ", "_parsed", "_headers", "_environ_keys")
+
+    __UNPREFIXED_KEYS: frozenset[str] = frozenset(("CONTENT_TYPE", "CONTENT_LENGTH"))
+    __UNSPLIT_KEYS: frozenset[str] = frozenset(("COOKIE",))
+
+    def __init__(self, environ: dict[str, Any]) -> None:
+        self._environ: dict[str, Any] = environ
+        # Created when they're first needed, most requests only read a few single value headers
+        self._parsed: dict[str, list[str]]|None = None
+        # Only built once a header is changed, maps a normalized key to its
+        # name, single value and multi values
+        self._headers: dict[str, tuple[str, str|None, list[str]|None]]|None = None
+        self._environ_keys: set[str]|None = None
+
+    def _reset(self, environ: dict[str, Any]) -> Self:
+        self._environ = environ
+        self._parsed = None
+        self._headers = None
+        self._environ_keys = None
+        return self
+
+    def __key(self, name: str) -> str:
+        return name.upper().replace("-", "_")
+
+    def __environ_key(self, key: str) -> str:
+        if key in self.__UNPREFIXED_KEYS:
+            return key
+        return f"HTTP_{key}"
+
+    def __display_name(self, key: str) -> str:
+        return "-".join(part.capitalize() for part in key.split("_"))
+
+    def __split(self, key: str, value: str) -> list[str]:
+        if key in self.__UNSPLIT_KEYS:
+            return [value]
+        return [header_value.strip() for header_value in value.split(",")]
+
+    def __yield_environ_headers(self) -> Generator[tuple[str, str], None, None]:
+        for environ_key, value in self._environ.items():
+            if environ_key.startswith("HTTP_"):
+                yield (environ_key[5:], value)
+            elif environ_key in self.__UNPREFIXED_KEYS and len(value) > 0:
+                yield (environ_key, value)
+        return None
+
+    def __materialize(self) -> dict[str, tuple[str, str|None, list[str]|None]]:
+        if self._headers is None:
+            self._headers = dict()
+            self._environ_keys = set()
+            for key, value in self.__yield_environ_headers():
+                self._headers[key] = (self.__display_name(key), value, None)
+                self._environ_keys.add(key)
+        return self._headers
+
+    def get_single_value_header(self, name: str) -> str|None:
+        key: str = self.__key(name)
+        if self._headers is None:
+            value: str|None = self._environ.get(self.__environ_key(key))
+            if value is None or len(value) < 1:
+                return None
+            return value
+        if key not in self._headers:
+            return None
+        return self._headers[key][1]
+
+    def set_single_value_header(self, name: str, value: str) -> Self:
+        headers: dict[str, tuple[str, str|None, list[str]|None]] = self.__materialize()
+        key: str = self.__key(name)
+        if key in headers and headers[key][2] is not None:
+            raise HeaderClashException("Multi value headers with the same name already exists")
+        headers[key] = (name, value, None)
+        self._environ_keys.discard(key)
+        return self
+
+    def delete_single_value_header(self, name: str) -> Self:
+        headers: dict[str, tuple[str, str|None, list[str]|None]] = self.__materialize()
+        key: str = self.__key(name)
+        if key in headers and headers[key][1] is not None:
+            del headers[key]
+            self._environ_keys.discard(key)
+        return self
+
+    def add_multi_value_header(self, name: str, value: str) -> Self:
+        headers: dict[str, tuple[str, str|None, list[str]|None]] = self.__materialize()
+        key: str = self.__key(name)
+        if key in self._environ_keys:
+            # Headers sent by the client can be extended as if they were multi value headers
+            display_name, environ_value, _ = headers[key]
+            headers[key] = (display_name, None, self.__split(key, environ_value))
+            self._environ_keys.discard(key)
+        if key in headers and headers[key][1] is not None:
+            raise HeaderClashException("A single value header with the same name already exists")
+        if key not in headers:
+            headers[key] = (name, None, list())
+        headers[key][2].append(value)
+        return self
+
+    def yield_multi_value_header(self, name: str) -> Generator[str, str, None]:
+        key: str = self.__key(name)
+        if self._headers is None or key in self._environ_keys:
+            if self._parsed is None:
+                self._parsed = dict()
+            if key not in self._parsed:
+                value: str|None = self.get_single_value_header(name)
+                if value is None:
+                    return None
+                self._parsed[key] = self.__split(key, value)
+            for header_value in self._parsed[key]:
+                yield header_value
+            return None
+        if key in self._headers and self._headers[key][2] is not None:
+            for header_value in self._headers[key][2]:
+                yield header_value
+        return None
+
+    def delete_multi_value_header(self, name: str) -> Self:
+        headers: dict[str, tuple[str, str|None, list[str]|None]] = self.__materialize()
+        key: str = self.__key(name)
+        if key in headers and (headers[key][2] is not None or key in self._environ_keys):
+            del headers[key]
+            self._environ_keys.discard(key)
+        return self
+
+    def yield_all_headers(self) -> Generator[tuple[str, str], None, None]:
+        if self._headers is None:
+            for key, value in self.__yield_environ_headers():
+                yield (self.__display_name(key), value)
+            return None
+        for display_name, single_value, multi_values in self._headers.values():
+            if multi_values is None:
+                yield (display_name, single_value)
+            else:
+                for header_value in multi_values:
+                    yield (display_name, header_value)
+        return None
+
+    def serialize(self) -> str:
+        headers_list: list[str] = list()
+        for header_name, header_value in self.yield_all_headers():
+            headers_list.append(f"{header_name}: {header_value}\r\n")
+        return "".join(headers_list)
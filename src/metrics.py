@@ -0,0 +1,248 @@
+from typing import Any, Awaitable, Callable, Iterable
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter_ns
+
+from chains.src.request import IRequest
+from chains.src.response import IResponse
+
+
+
+# In seconds
+DEFAULT_BUCKETS: tuple[float, ...] = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+
+class LatencyHistogram:
+
+    __slots__ = ("_bounds", "_buckets", "_counts", "_sum", "_lock")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self._buckets: tuple[float, ...] = buckets
+        # Observations are made in nanoseconds
+        self._bounds: tuple[int, ...] = tuple(int(bucket * 1_000_000_000) for bucket in buckets)
+        # One count per bucket and one for the observations above the last bucket
+        self._counts: list[int] = [0] * (len(buckets) + 1)
+        self._sum: int = 0
+        self._lock: Lock = Lock()
+
+    def observe(self, duration: int) -> None:
+        index: int = bisect_left(self._bounds, duration)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += duration
+        return None
+
+    @property
+    def count(self) -> int:
+        return sum(self._counts)
+
+    @property
+    def sum(self) -> float:
+        return self._sum / 1_000_000_000
+
+    def cumulative_counts(self) -> list[tuple[str, int]]:
+        with self._lock:
+            counts: list[int] = list(self._counts)
+        cumulative_counts: list[tuple[str, int]] = list()
+        total: int = 0
+        for bucket, count in zip((*(repr(bucket) for bucket in self._buckets), "+Inf"), counts):
+            total += count
+            cumulative_counts.append((bucket, total))
+        return cumulative_counts
+
+class MetricsV1_1:
+
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS, namespace: str = "chains") -> None:
+        self._buckets: tuple[float, ...] = tuple(sorted(buckets))
+        self._namespace: str = namespace
+        self._request_histogram: LatencyHistogram = LatencyHistogram(buckets=self._buckets)
+        # Keyed by the route template and the method
+        self._route_histograms: dict[tuple[str, str], LatencyHistogram] = dict()
+        # Keyed by the qualified name of the middleware function
+        self._middleware_histograms: dict[str, LatencyHistogram] = dict()
+        # Keyed by the route template, the method and the status code
+        self._status_counts: dict[tuple[str, str, int], int] = dict()
+        self._background_task_histogram: LatencyHistogram = LatencyHistogram(buckets=self._buckets)
+        self._background_task_wait_histogram: LatencyHistogram = LatencyHistogram(buckets=self._buckets)
+        # The background task runner whose queue depth and task counts are reported
+        self._background_tasks: Any|None = None
+        self._lock: Lock = Lock()
+
+    @property
+    def request_histogram(self) -> LatencyHistogram:
+        return self._request_histogram
+
+    @property
+    def background_task_histogram(self) -> LatencyHistogram:
+        return self._background_task_histogram
+
+    @property
+    def background_task_wait_histogram(self) -> LatencyHistogram:
+        return self._background_task_wait_histogram
+
+    def track_background_tasks(self, background_tasks: Any) -> None:
+        self._background_tasks = background_tasks
+        return None
+
+    def route_histogram(self, template: str, method: str) -> LatencyHistogram:
+        # Histograms are created while the application is being frozen, not while requests are handled
+        with self._lock:
+            if (template, method) not in self._route_histograms:
+                self._route_histograms[(template, method)] = LatencyHistogram(buckets=self._buckets)
+            return self._route_histograms[(template, method)]
+
+    def middleware_histogram(self, name: str) -> LatencyHistogram:
+        with self._lock:
+            if name not in self._middleware_histograms:
+                self._middleware_histograms[name] = LatencyHistogram(buckets=self._buckets)
+            return self._middleware_histograms[name]
+
+    def count_status(self, template: str, method: str, status_code: int) -> None:
+        key: tuple[str, str, int] = (template, method, status_code)
+        with self._lock:
+            self._status_counts[key] = self._status_counts.get(key, 0) + 1
+        return None
+
+    def __escape(self, value: str) -> str:
+        return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+    def __render_histogram(self, name: str, labels: str, histogram: LatencyHistogram) -> list[str]:
+        separator: str = "," if len(labels) > 0 else ""
+        label_set: str = f"{{{labels}}}" if len(labels) > 0 else ""
+        lines: list[str] = [
+            f'{name}_bucket{{{labels}{separator}le="{bucket}"}} {count}'
+            for bucket, count in histogram.cumulative_counts()
+        ]
+        lines.append(f"{name}_sum{label_set} {histogram.sum}")
+        lines.append(f"{name}_count{label_set} {histogram.count}")
+        return lines
+
+    def render(self) -> str:
+        namespace: str = self._namespace
+        lines: list[str] = [
+            f"# HELP {namespace}_request_duration_seconds Time taken to handle requests, including all middleware",
+            f"# TYPE {namespace}_request_duration_seconds histogram",
+            *self.__render_histogram(f"{namespace}_request_duration_seconds", "", self._request_histogram),
+            f"# HELP {namespace}_route_duration_seconds Time taken by route functions",
+            f"# TYPE {namespace}_route_duration_seconds histogram"
+        ]
+        with self._lock:
+            route_histograms: list[tuple[tuple[str, str], LatencyHistogram]] = sorted(self._route_histograms.items())
+            middleware_histograms: list[tuple[str, LatencyHistogram]] = sorted(self._middleware_histograms.items())
+            status_counts: list[tuple[tuple[str, str, int], int]] = sorted(self._status_counts.items())
+        for (template, method), histogram in route_histograms:
+            lines.extend(self.__render_histogram(
+                f"{namespace}_route_duration_seconds",
+                f'route="{self.__escape(template)}",method="{self.__escape(method)}"',
+                histogram
+            ))
+        lines.append(f"# HELP {namespace}_middleware_duration_seconds Time taken by middleware, excluding the handlers downstream of them")
+        lines.append(f"# TYPE {namespace}_middleware_duration_seconds histogram")
+        for name, histogram in middleware_histograms:
+            lines.extend(self.__render_histogram(
+                f"{namespace}_middleware_duration_seconds",
+                f'middleware="{self.__escape(name)}"',
+                histogram
+            ))
+        lines.append(f"# HELP {namespace}_requests_total Requests handled, by route, method and status code")
+        lines.append(f"# TYPE {namespace}_requests_total counter")
+        for (template, method, status_code), count in status_counts:
+            lines.append(
+                f'{namespace}_requests_total{{route="{self.__escape(template)}",method="{self.__escape(method)}",status="{status_code}"}} {count}'
+            )
+        if self._background_tasks is not None:
+            lines.extend(self.__render_background_tasks(namespace))
+        return "\n".join(lines) + "\n"
+
+    def __render_background_tasks(self, namespace: str) -> list[str]:
+        return [
+            f"# HELP {namespace}_background_task_duration_seconds Time taken to run background tasks",
+            f"# TYPE {namespace}_background_task_duration_seconds histogram",
+            *self.__render_histogram(f"{namespace}_background_task_duration_seconds", "", self._background_task_histogram),
+            f"# HELP {namespace}_background_task_wait_seconds Time background tasks spent queued before a worker ran them",
+            f"# TYPE {namespace}_background_task_wait_seconds histogram",
+            *self.__render_histogram(f"{namespace}_background_task_wait_seconds", "", self._background_task_wait_histogram),
+            f"# HELP {namespace}_background_task_queue_depth Background tasks waiting for a worker",
+            f"# TYPE {namespace}_background_task_queue_depth gauge",
+            f"{namespace}_background_task_queue_depth {self._background_tasks.queue_depth}",
+            f"# HELP {namespace}_background_tasks_total Background tasks, by outcome",
+            f"# TYPE {namespace}_background_tasks_total counter",
+            f'{namespace}_background_tasks_total{{outcome="completed"}} {self._background_tasks.completed}',
+            f'{namespace}_background_tasks_total{{outcome="failed"}} {self._background_tasks.failed}',
+            f'{namespace}_background_tasks_total{{outcome="dropped"}} {self._background_tasks.dropped}'
+        ]
+
+
+
+def middleware_name(middleware_function: Callable) -> str:
+    return f"{getattr(middleware_function, '__module__', '')}.{getattr(middleware_function, '__qualname__', repr(middleware_function))}"
+
+def timed(function: Callable[[IRequest], IResponse], histogram: LatencyHistogram) -> Callable[[IRequest], IResponse]:
+    def timed_function(request: IRequest) -> IResponse:
+        start: int = perf_counter_ns()
+        try:
+            return function(request)
+        finally:
+            histogram.observe(perf_counter_ns() - start)
+    return timed_function
+
+def async_timed(function: Callable[[IRequest], Awaitable[IResponse]], histogram: LatencyHistogram) -> Callable[[IRequest], Awaitable[IResponse]]:
+    async def timed_function(request: IRequest) -> IResponse:
+        start: int = perf_counter_ns()
+        try:
+            return await function(request)
+        finally:
+            histogram.observe(perf_counter_ns() - start)
+    return timed_function
+
+def counted(function: Callable[[IRequest], IResponse], metrics: MetricsV1_1, template: str, method: str) -> Callable[[IRequest], IResponse]:
+    def counted_function(request: IRequest) -> IResponse:
+        try:
+            response: IResponse = function(request)
+        except Exception:
+            # The error handlers upstream turn these into 500s
+            metrics.count_status(template, method, 500)
+            raise
+        metrics.count_status(template, method, response.status_code)
+        return response
+    return counted_function
+
+def async_counted(function: Callable[[IRequest], Awaitable[IResponse]], metrics: MetricsV1_1, template: str, method: str) -> Callable[[IRequest], Awaitable[IResponse]]:
+    async def counted_function(request: IRequest) -> IResponse:
+        try:
+            response: IResponse = await function(request)
+        except Exception:
+            metrics.count_status(template, method, 500)
+            raise
+        metrics.count_status(template, method, response.status_code)
+        return response
+    return counted_function
+
+def timed_middleware(
+    call_middleware: Callable[[IRequest, Callable[[IRequest], IResponse]], IResponse],
+    downstream: Callable[[IRequest], IResponse],
+    histogram: LatencyHistogram
+) -> Callable[[IRequest], IResponse]:
+    # Only the time spent in the middleware itself is recorded, the time spent
+    # downstream of it is taken out
+    def timed_function(request: IRequest) -> IResponse:
+        downstream_duration: int = 0
+
+        def timed_downstream(request: IRequest) -> IResponse:
+            nonlocal downstream_duration
+            start: int = perf_counter_ns()
+            try:
+                return downstream(request)
+            finally:
+                downstream_duration += perf_counter_ns() - start
+        start: int = perf_counter_ns()
+        try:
+            return call_middleware(request, timed_downstream)
+        finally:
+            histogram.observe(perf_counter_ns() - start - downstream_duration)
+    return timed_function
+
+
+
+Metrics = MetricsV1_1
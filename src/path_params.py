@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Mapping
+from math import isfinite
+from types import MappingProxyType
+
+from chains.src.exceptions import MalformedRoutePathException
+
+
+
+# Names wildcards that aren't named are exposed under their position among the wildcards of the route
+PathParamName = str|int
+PathParamSpec = tuple[tuple[PathParamName, Callable[[str], Any]], ...]
+
+EMPTY_PATH_PARAMS: Mapping[PathParamName, Any] = MappingProxyType(dict())
+
+
+
+def _to_int(value: str) -> int:
+    digits: str = value[1:] if value.startswith("-") else value
+    # int() also accepts whitespace, underscores, a plus sign and non ASCII digits
+    if not digits.isascii() or not digits.isdigit():
+        raise ValueError(f"{value} is not an integer")
+    return int(value)
+
+def _to_float(value: str) -> float:
+    if not value.isascii() or "_" in value or value != value.strip():
+        raise ValueError(f"{value} is not a number")
+    converted: float = float(value)
+    if not isfinite(converted):
+        raise ValueError(f"{value} is not a finite number")
+    return converted
+
+def _to_str(value: str) -> str:
+    return value
+
+def _to_uuid(value: str) -> Any:
+    # uuid is only imported by applications that have uuid wildcards
+    from uuid import UUID
+    return UUID(value)
+
+PATH_PARAM_CONVERTERS: dict[str, Callable[[str], Any]] = {
+    "str": _to_str,
+    "int": _to_int,
+    "float": _to_float,
+    "uuid": _to_uuid
+}
+
+
+
+def is_wildcard_segment(segment: str) -> bool:
+    return segment.startswith("<") and segment.endswith(">")
+
+def parse_route_path(path: str) -> tuple[str, PathParamSpec]:
+    # Returns the path with every wildcard written as '<>', the form the route table
+    # stores them in, along with the name and converter of every wildcard in order
+    segments: list[str] = list()
+    spec: list[tuple[PathParamName, Callable[[str], Any]]] = list()
+    for segment in path.split("/"):
+        if not is_wildcard_segment(segment):
+            if "<" in segment or ">" in segment:
+                raise MalformedRoutePathException(f"Malformed wildcard '{segment}', a wildcard has to take up a whole path segment")
+            segments.append(segment)
+            continue
+        converter_name, _, name = segment[1:-1].rpartition(":")
+        if len(name) < 1:
+            if len(converter_name) > 0:
+                raise MalformedRoutePathException(f"Malformed wildcard '{segment}', typed wildcards have to be named")
+            name = len(spec)
+        elif not name.isidentifier():
+            raise MalformedRoutePathException(f"Malformed wildcard '{segment}', the name has to be a valid identifier")
+        converter: Callable[[str], Any]|None = PATH_PARAM_CONVERTERS.get(converter_name if len(converter_name) > 0 else "str")
+        if converter is None:
+            raise MalformedRoutePathException(f"Unknown wildcard type '{converter_name}', the types are: {', '.join(PATH_PARAM_CONVERTERS)}")
+        if any(name == existing_name for existing_name, _ in spec):
+            raise MalformedRoutePathException(f"The wildcard name '{name}' is used more than once in the route")
+        spec.append((name, converter))
+        segments.append("<>")
+    return "/".join(segments), tuple(spec)
+
+def no_path_params(captured: list[str]) -> Mapping[PathParamName, Any]:
+    return EMPTY_PATH_PARAMS
+
+def compile_path_params(spec: PathParamSpec) -> Callable[[list[str]], Mapping[PathParamName, Any]|None]:
+    # Builds the function a route match uses to turn the values captured by its wildcards
+    # into path parameters, the function returns None when a value can't be converted
+    names: tuple[PathParamName, ...] = tuple(name for name, _ in spec)
+    if len(spec) < 1:
+        return no_path_params
+    if all(converter is _to_str for _, converter in spec):
+        return lambda captured: MappingProxyType(dict(zip(names, captured)))
+
+    def convert(captured: list[str]) -> Mapping[PathParamName, Any]|None:
+        try:
+            return MappingProxyType({
+                name: converter(value) for (name, converter), value in zip(spec, captured)
+            })
+        except ValueError:
+            return None
+    return convert
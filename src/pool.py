@@ -0,0 +1,119 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any
+from threading import Lock
+
+from chains.src.request import RequestV1_1
+from chains.src.header import EnvironHeadersV1_1
+from chains.src.streams import IRequestStream
+from chains.src.exceptions import InvalidSettingsException
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+
+# What the headers of a pooled request read from between requests, it's never written to
+EMPTY_ENVIRON: dict[str, Any] = dict()
+
+
+
+class PooledRequestV1_1(RequestV1_1):
+
+    __slots__ = ("_pool",)
+
+    def __init__(self, pool: RequestPoolV1_1, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._pool: RequestPoolV1_1 = pool
+
+    def release(self) -> None:
+        # Used as the close callback of the response in place of the one of the stream, it
+        # closes the stream and hands the request back to its pool
+        if self._stream is not None:
+            self._stream.close()
+        self._pool.release(self)
+        return None
+
+
+
+class RequestPoolV1_1:
+
+    def __init__(self, max_size: int) -> None:
+        if max_size < 1:
+            raise InvalidSettingsException("The request pool must be able to hold at least one request")
+        self._max_size: int = max_size
+        self._requests: list[PooledRequestV1_1] = list()
+        self._lock: Lock = Lock()
+        self._created: int = 0
+        self._reused: int = 0
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @property
+    def size(self) -> int:
+        return len(self._requests)
+
+    @property
+    def created(self) -> int:
+        return self._created
+
+    @property
+    def reused(self) -> int:
+        return self._reused
+
+    def acquire(self, method: str, path: str, stream: IRequestStream, environ: dict[str, Any], query_string: str = "", remote_address: str|None = None) -> PooledRequestV1_1:
+        with self._lock:
+            if len(self._requests) < 1:
+                self._created += 1
+                request: PooledRequestV1_1|None = None
+            else:
+                self._reused += 1
+                request: PooledRequestV1_1|None = self._requests.pop()
+        if request is None:
+            return PooledRequestV1_1(
+                pool=self,
+                method=method,
+                path=path,
+                stream=stream,
+                headers=EnvironHeadersV1_1(
+                    environ=environ
+                ),
+                query_string=query_string,
+                remote_address=remote_address
+            )
+        request.headers._reset(
+            environ=environ
+        )
+        return request._reset(
+            method=method,
+            path=path,
+            stream=stream,
+            query_string=query_string,
+            remote_address=remote_address
+        )
+
+    def release(self, request: PooledRequestV1_1) -> None:
+        # References to the previous request's environ and body aren't kept alive while pooled
+        request.headers._reset(
+            environ=EMPTY_ENVIRON
+        )
+        request._reset(
+            method="",
+            path=""
+        )
+        with self._lock:
+            if len(self._requests) < self._max_size:
+                self._requests.append(request)
+        return None
+
+    def clear(self) -> Self:
+        with self._lock:
+            self._requests.clear()
+            self._created = 0
+            self._reused = 0
+        return self
+
+    def __str__(self) -> str:
+        return f"RequestPoolV1_1(size={self.size}, max_size={self._max_size}, created={self._created}, reused={self._reused})"
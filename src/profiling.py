@@ -0,0 +1,176 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Callable
+from cProfile import Profile
+from hmac import compare_digest
+from io import StringIO
+from os import listdir, makedirs, remove
+from os.path import join
+from pstats import Stats
+from random import random
+from threading import Lock
+from time import time_ns
+from urllib.parse import quote, unquote
+
+from chains.src.request import IRequest
+from chains.src.response import IResponse
+from chains.src.exceptions import InvalidSettingsException
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+
+class ProfilerV1_1:
+
+    __SUFFIX: str = ".pstats"
+    __UNROUTED: str = "<unrouted>"
+
+    def __init__(
+        self,
+        directory: str,
+        sample_rate: float = 0.0,
+        header_name: str = "X-Chains-Profile",
+        header_secret: str|None = None,
+        flush_every: int = 100,
+        max_files: int = 100
+    ) -> None:
+        if not 0.0 <= sample_rate <= 1.0:
+            raise InvalidSettingsException("The sample rate has to be between 0 and 1")
+        if flush_every < 1 or max_files < 1:
+            raise InvalidSettingsException("The profiler has to flush after at least one sample and keep at least one file")
+        self._directory: str = directory
+        self._sample_rate: float = sample_rate
+        self._header_name: str = header_name
+        self._header_secret: str|None = header_secret
+        self._flush_every: int = flush_every
+        self._max_files: int = max_files
+        # Aggregated stats of the samples taken since the last flush, keyed by route template
+        self._stats: dict[str, Stats] = dict()
+        self._pending: int = 0
+        self._samples: int = 0
+        self._lock: Lock = Lock()
+        makedirs(directory, exist_ok=True)
+
+    @property
+    def directory(self) -> str:
+        return self._directory
+
+    @property
+    def samples(self) -> int:
+        return self._samples
+
+    def sample(self, request: IRequest) -> bool:
+        if self._header_secret is not None:
+            header_value: str|None = request.headers.get_single_value_header(name=self._header_name)
+            if header_value is not None and compare_digest(header_value.encode(), self._header_secret.encode()):
+                return True
+        return self._sample_rate > 0.0 and random() < self._sample_rate
+
+    def profile(self, function: Callable[[IRequest], IResponse], request: IRequest) -> IResponse:
+        profile: Profile = Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Another profiler is already active in this thread
+            return function(request)
+        try:
+            return function(request)
+        finally:
+            profile.disable()
+            # The router records the template while dispatching the request, it isn't set when the
+            # application isn't frozen or the root middleware responded without routing the request
+            template: str|None = request.route_template
+            self.__add(
+                template=template if template is not None else self.__UNROUTED,
+                profile=profile
+            )
+
+    def __add(self, template: str, profile: Profile) -> None:
+        with self._lock:
+            stats: Stats|None = self._stats.get(template)
+            if stats is None:
+                self._stats[template] = Stats(profile)
+            else:
+                stats.add(profile)
+            self._samples += 1
+            self._pending += 1
+            if self._pending < self._flush_every:
+                return None
+        self.flush()
+        return None
+
+    def flush(self) -> Self:
+        with self._lock:
+            stats: dict[str, Stats] = self._stats
+            self._stats = dict()
+            self._pending = 0
+        for template, template_stats in stats.items():
+            template_stats.dump_stats(
+                join(self._directory, f"{quote(template, safe='')}.{time_ns()}{self.__SUFFIX}")
+            )
+        self.__rotate()
+        return self
+
+    def __files(self) -> list[tuple[int, str, str]]:
+        # The time the file was written at, the route template and the name of the file
+        files: list[tuple[int, str, str]] = list()
+        for file_name in listdir(self._directory):
+            if not file_name.endswith(self.__SUFFIX):
+                continue
+            quoted_template, _, written_at = file_name[:-len(self.__SUFFIX)].rpartition(".")
+            if not (written_at.isascii() and written_at.isdigit()):
+                continue
+            files.append((int(written_at), unquote(quoted_template), file_name))
+        return sorted(files)
+
+    def __rotate(self) -> None:
+        files: list[tuple[int, str, str]] = self.__files()
+        for _, _, file_name in files[:max(len(files) - self._max_files, 0)]:
+            try:
+                remove(join(self._directory, file_name))
+            except FileNotFoundError:
+                pass
+        return None
+
+    def templates(self) -> list[str]:
+        with self._lock:
+            templates: set[str] = set(self._stats)
+        templates.update(template for _, template, _ in self.__files())
+        return sorted(templates)
+
+    def stats(self, template: str) -> Stats|None:
+        # Combines the flushed files of the route template with the samples that haven't been flushed yet
+        stats: Stats = Stats()
+        found: bool = False
+        for _, file_template, file_name in self.__files():
+            if file_template != template:
+                continue
+            try:
+                stats.add(join(self._directory, file_name))
+            except (FileNotFoundError, EOFError):
+                # Rotated out, or still being written
+                continue
+            found = True
+        with self._lock:
+            pending: Stats|None = self._stats.get(template)
+            if pending is not None:
+                stats.add(pending)
+                found = True
+        return stats if found else None
+
+    def top(self, template: str, limit: int = 20, sort_by: str = "cumulative") -> str:
+        stats: Stats|None = self.stats(template)
+        if stats is None:
+            return ""
+        output: StringIO = StringIO()
+        stats.stream = output
+        stats.strip_dirs().sort_stats(sort_by).print_stats(limit)
+        return output.getvalue()
+
+    def __str__(self) -> str:
+        return f"ProfilerV1_1(directory={self._directory}, sample_rate={self._sample_rate}, samples={self._samples})"
+
+
+
+Profiler = ProfilerV1_1
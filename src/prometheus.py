@@ -0,0 +1,60 @@
+from typing import Callable
+
+from chains.src.request import IRequest
+from chains.src.response import IResponse, ResponseV1_1, ImmutableResponseV1_1
+from chains.src.handlers import IRouteHandler
+from chains.src.error_responses import method_not_allowed_response
+from chains.src.metrics import MetricsV1_1
+from chains.src.public_interface import BranchV1_1
+
+
+
+class PrometheusHandlerV1_1(IRouteHandler):
+
+    __CONTENT_TYPE: str = "text/plain; version=0.0.4; charset=utf-8"
+    __METHOD_NOT_ALLOWED_RESPONSE: ImmutableResponseV1_1 = method_not_allowed_response(
+        allowed_methods=["GET"]
+    )
+
+    def __init__(self, metrics: MetricsV1_1) -> None:
+        self._metrics: MetricsV1_1 = metrics
+
+    @property
+    def route_function(self) -> Callable[[IRequest], IResponse]:
+        return self.handle
+
+    def handle(self, request: IRequest) -> IResponse:
+        if request.method != "GET":
+            return self.__METHOD_NOT_ALLOWED_RESPONSE.copy_on_write()
+        response: ResponseV1_1 = ResponseV1_1(
+            status_code=200,
+            status_text="OK"
+        )
+        response.body = self._metrics.render().encode()
+        response.headers.set_single_value_header(
+            name="Content-Type", value=self.__CONTENT_TYPE
+        ).set_single_value_header(
+            name="Content-Length", value=len(response.body)
+        ).set_single_value_header(
+            name="Cache-Control", value="no-store"
+        )
+        return response
+
+    def __str__(self) -> str:
+        return "prometheus metrics"
+
+
+
+class PrometheusBranchV1_1(BranchV1_1):
+
+    def __init__(self, metrics: MetricsV1_1) -> None:
+        super().__init__()
+        self._branch_ingress_handler.branch_handler.mount(
+            route_handler=PrometheusHandlerV1_1(
+                metrics=metrics
+            )
+        )
+
+
+
+PrometheusBranch = PrometheusBranchV1_1
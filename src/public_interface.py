@@ -1,13 +1,30 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import Any, Callable, Iterable, IO
-from typing_extensions import Self
-
-from chains.src.request import IRequest, RequestV1_1
-from chains.src.response import IResponse, ResponseV1_1
-from chains.src.handlers import IBranchIngressHandler, BranchIngressHandlerV1_1, RootIngressHandlerV1_1
-from chains.src.default_middlewares import root_error_handlerv1_1, catchall_error_handlerv1_1
+from functools import partial
+from io import UnsupportedOperation
+from os import fstat
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, IO
+
+from chains.src.request import IRequest, RequestV1_1, BackgroundTask
+from chains.src.response import IResponse, ResponseV1_1, ResponseBody
+from chains.src.handlers import IBranchIngressHandler, BranchIngressHandlerV1_1, RootIngressHandlerV1_1, RouteResolutionCache
+from chains.src.header import EnvironHeadersV1_1
+from chains.src.pool import RequestPoolV1_1, PooledRequestV1_1
+from chains.src.streams import RequestStreamV1_1, ResponseIterableV1_1, ResponseFileV1_1
+from chains.src.exceptions import PayloadTooLargeException, UnsupportedScopeException
+from chains.src.asgi import AsyncComposerV1_1, AsyncRequestHandler, ComposedHandler
+from chains.src.metrics import MetricsV1_1, timed, async_timed
+from chains.src.background import BackgroundTasksV1_1
+from chains.src.default_middlewares import root_error_handlerv1_1, catchall_error_handlerv1_1, async_equivalents
+
+# Only the parts of the standard library and the optional subsystems an application uses are
+# imported, so that processes that start often don't pay for the rest
+if TYPE_CHECKING:
+    from typing_extensions import Self
+    from concurrent.futures import Executor, ThreadPoolExecutor
+    from tempfile import SpooledTemporaryFile
+    from chains.src.profiling import ProfilerV1_1
 
 
 
@@ -25,6 +42,10 @@ class IBranch(ABC):
     def middleware(self, *args, **kwargs) -> Callable[[Callable], None]:
         pass
 
+    @abstractmethod
+    def add_middleware(self, middleware_function: Callable, *args, **kwargs) -> Self:
+        pass
+
     @property
     def _branch_ingress_handler(self) -> IBranchIngressHandler:
         pass
@@ -53,13 +74,21 @@ class BranchV1_1(IBranch):
 
     def middleware(self, *args, **kwargs) -> Callable[[Callable], None]:
         def decorator(middleware_function) -> None:
-            self._branch_ingress_handler.add_middleware(
+            self.add_middleware(
                 middleware_function,
                 *args,
                 **kwargs
             )
         return decorator
 
+    def add_middleware(self, middleware_function: Callable, *args, **kwargs) -> Self:
+        self._branch_ingress_handler.add_middleware(
+            middleware_function,
+            *args,
+            **kwargs
+        )
+        return self
+
     @property
     def _branch_ingress_handler(self) -> BranchIngressHandlerV1_1:
         return self.__branch_ingress_handler
@@ -75,25 +104,125 @@ class IApp(IBranch, ABC):
     def handle_request(self, request: IRequest) -> IResponse:
         pass
 
+    @abstractmethod
+    def freeze(self, route_cache_size: int|None = None) -> Self:
+        pass
+
+    @property
+    @abstractmethod
+    def route_cache(self) -> RouteResolutionCache|None:
+        pass
+
 class AppV1_1(BranchV1_1, IApp):
 
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        include_tracebacks: bool = False,
+        metrics: MetricsV1_1|None = None,
+        profiler: ProfilerV1_1|None = None,
+        background_tasks: BackgroundTasksV1_1|None = None
+    ) -> None:
         super().__init__()
+        self._metrics: MetricsV1_1|None = metrics
+        self._profiler: ProfilerV1_1|None = profiler
+        # Background tasks are run after the response when no runner is given
+        self._background_tasks: BackgroundTasksV1_1 = background_tasks if background_tasks is not None else BackgroundTasksV1_1()
         self.__root_ingress_handler: RootIngressHandlerV1_1 = RootIngressHandlerV1_1(
             primary_branch_ingress_handler=self._branch_ingress_handler
         )
         self.__root_ingress_handler.primary_branch_ingress_handler.add_middleware(
-            middleware_function=root_error_handlerv1_1
+            middleware_function=root_error_handlerv1_1,
+            include_traceback=include_tracebacks
         )
         self.__root_ingress_handler.add_middleware(
-            middleware_function=catchall_error_handlerv1_1
+            middleware_function=catchall_error_handlerv1_1,
+            include_traceback=include_tracebacks
+        )
+        self.__dispatcher: Callable[[IRequest], IResponse]|None = None
+
+    @property
+    def _root_ingress_handler(self) -> RootIngressHandlerV1_1:
+        return self.__root_ingress_handler
+
+    def _set_file_content_length(self, response: IResponse) -> None:
+        if response.headers.get_single_value_header(name="Content-Length") is not None:
+            return None
+        try:
+            response.headers.set_single_value_header(
+                name="Content-Length", value=fstat(response.body.fileno()).st_size - response.body.tell()
+            )
+        except (AttributeError, OSError, UnsupportedOperation):
+            pass
+        return None
+
+    def _payload_too_large(self, max_body_size: int) -> ResponseV1_1:
+        response: ResponseV1_1 = ResponseV1_1(
+            status_code=413,
+            status_text="PAYLOAD TOO LARGE"
+        )
+        response.body = str(PayloadTooLargeException(max_body_size=max_body_size)).encode()
+        response.headers.set_single_value_header(
+            name="Content-Type", value="text/plain"
+        ).set_single_value_header(
+            name="Content-Length", value=len(response.body)
         )
+        return response
 
     def handle_request(self, request: RequestV1_1) -> ResponseV1_1:
+        if self._profiler is not None and self._profiler.sample(request):
+            return self._profiler.profile(
+                function=self.__handle_request,
+                request=request
+            )
+        return self.__handle_request(request)
+
+    def __handle_request(self, request: RequestV1_1) -> ResponseV1_1:
+        if self.__dispatcher is not None:
+            return self.__dispatcher(request)
         return self.__root_ingress_handler.handle(
             request=request
         )
 
+    def freeze(self, route_cache_size: int|None = None) -> Self:
+        if self.__dispatcher is not None:
+            return self
+        primary_branch_ingress_handler: BranchIngressHandlerV1_1 = self.__root_ingress_handler.primary_branch_ingress_handler
+        self.__root_ingress_handler.freeze()
+        primary_branch_ingress_handler.freeze(
+            route_cache_size=route_cache_size,
+            metrics=self._metrics
+        )
+        dispatcher: Callable[[IRequest], IResponse] = self.__root_ingress_handler.compose_middleware(
+            downstream=primary_branch_ingress_handler.compose_middleware(
+                downstream=primary_branch_ingress_handler.branch_handler.handle,
+                metrics=self._metrics
+            ),
+            metrics=self._metrics
+        )
+        if self._metrics is not None:
+            dispatcher = timed(
+                function=dispatcher,
+                histogram=self._metrics.request_histogram
+            )
+        self.__dispatcher = dispatcher
+        return self
+
+    @property
+    def metrics(self) -> MetricsV1_1|None:
+        return self._metrics
+
+    @property
+    def profiler(self) -> ProfilerV1_1|None:
+        return self._profiler
+
+    @property
+    def background_tasks(self) -> BackgroundTasksV1_1:
+        return self._background_tasks
+
+    @property
+    def route_cache(self) -> RouteResolutionCache|None:
+        return self._branch_ingress_handler.branch_handler.route_cache
+
 
 
 class IWSGIApp(IApp, ABC):
@@ -104,50 +233,378 @@ class IWSGIApp(IApp, ABC):
 
 class WSGIAppV1_1(AppV1_1, IWSGIApp):
 
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(
+        self,
+        max_body_size: int|None = None,
+        body_chunk_size: int = 64*1024,
+        body_spool_threshold: int = 1024*1024,
+        request_pool_size: int|None = None,
+        include_tracebacks: bool = False,
+        metrics: MetricsV1_1|None = None,
+        profiler: ProfilerV1_1|None = None,
+        background_tasks: BackgroundTasksV1_1|None = None
+    ) -> None:
+        super().__init__(
+            include_tracebacks=include_tracebacks,
+            metrics=metrics,
+            profiler=profiler,
+            background_tasks=background_tasks
+        )
+        self._max_body_size: int|None = max_body_size
+        self._body_chunk_size: int = body_chunk_size
+        self._body_spool_threshold: int = body_spool_threshold
+        self.__request_pool: RequestPoolV1_1|None = RequestPoolV1_1(
+            max_size=request_pool_size
+        ) if request_pool_size is not None else None
+
+    @property
+    def max_body_size(self) -> int|None:
+        return self._max_body_size
+
+    @property
+    def body_chunk_size(self) -> int:
+        return self._body_chunk_size
+
+    @property
+    def body_spool_threshold(self) -> int:
+        return self._body_spool_threshold
+
+    @property
+    def request_pool(self) -> RequestPoolV1_1|None:
+        return self.__request_pool
+
+    def __content_length(self, environ: dict[str, str|list[str]|IO]) -> int|None:
+        content_length: str = environ.get("CONTENT_LENGTH", "").strip()
+        if content_length.isascii() and content_length.isdigit():
+            return int(content_length)
+        if environ.get("wsgi.input_terminated", False):
+            return None
+        return 0
 
     def __call__(self, environ: dict[str, str|list[str]|IO], start_response: Callable[[str, list[tuple[str, str]]], Any]) -> Iterable[bytes]:
         path, method = environ["PATH_INFO"], environ["REQUEST_METHOD"]
-        request: Request = Request(
-            method=method,
-            path=path
-        )
-        for key, value in environ.items():
-            if key.startswith("HTTP_"):
-                if key == "HTTP_COOKIE":
-                    request.headers.set_single_value_header(
-                        name="Cookie", value=value
-                    )
-                else:
-                    header_name: str = key[5:]
-                    header_values: list[str] = value.split(",")
-                    if len(header_values) > 1:
-                        for val in header_values:
-                            request.headers.add_multi_value_header(
-                                name=header_name, value=val.strip()
-                            )
-                    else:
-                        request.headers.set_single_value_header(
-                            name=header_name, value=value
-                        )
-            elif key == "wsgi.input":
-                body: bytes = value.read()
-                if len(body) > 0:
-                    request.body = body
+        content_length: int|None = self.__content_length(
+            environ=environ
+        )
+        if self._max_body_size is not None and content_length is not None and content_length > self._max_body_size:
+            response: Response = self._payload_too_large(
+                max_body_size=self._max_body_size
+            )
+            start_response(
+                f"{response.status_code} {response.status_text}",
+                list(response.headers.header_list())
+            )
+            return [response.body]
+        request_stream: RequestStreamV1_1 = RequestStreamV1_1(
+            input=environ["wsgi.input"],
+            content_length=content_length,
+            max_body_size=self._max_body_size,
+            chunk_size=self._body_chunk_size,
+            spool_threshold=self._body_spool_threshold
+        )
+        if self.__request_pool is not None:
+            request: PooledRequestV1_1 = self.__request_pool.acquire(
+                method=method,
+                path=path,
+                stream=request_stream,
+                environ=environ,
+                query_string=environ.get("QUERY_STRING", ""),
+                remote_address=environ.get("REMOTE_ADDR")
+            )
+            # The request goes back to the pool only once the server is done with the response
+            on_close: list[Callable[[], Any]] = [request.release]
+        else:
+            request: Request = Request(
+                method=method,
+                path=path,
+                stream=request_stream,
+                headers=EnvironHeadersV1_1(
+                    environ=environ
+                ),
+                query_string=environ.get("QUERY_STRING", ""),
+                remote_address=environ.get("REMOTE_ADDR")
+            )
+            on_close: list[Callable[[], Any]] = [request_stream.close]
 
         response: Response = self.handle_request(
             request=request
         )
+        background_tasks: tuple[BackgroundTask, ...] = request.background_tasks
+        if len(background_tasks) > 0:
+            # Run once the server is done sending the body and closes the response iterable
+            on_close.append(partial(self._background_tasks.schedule, background_tasks))
+        response_iterable: Iterable[bytes] = self.__response_iterable(
+            environ=environ,
+            response=response,
+            on_close=on_close
+        )
 
         status: str = f"{response.status_code} {response.status_text}"
-        headers: list[tuple[str, str]] = list()
-        for key, value in request.headers.yield_all_headers():
-            headers.append((key, str(value)))
+        # Servers are allowed to modify the list they receive, so the cached list isn't handed out as is
+        headers: list[tuple[str, str]] = list(response.headers.header_list())
 
         start_response(status, headers)
-        response_body: bytes = response.body if response.body is not None else b""
-        return [response_body]
+        return response_iterable
+
+    def __response_iterable(self, environ: dict[str, str|list[str]|IO], response: ResponseV1_1, on_close: list[Callable[[], Any]]) -> Iterable[bytes]:
+        body: ResponseBody|None = response.body
+        if body is None:
+            return ResponseIterableV1_1(body=(b"",), on_close=on_close)
+        if isinstance(body, (bytes, bytearray, memoryview)):
+            return ResponseIterableV1_1(body=(body,), on_close=on_close)
+        if hasattr(body, "read"):
+            self._set_file_content_length(
+                response=response
+            )
+            response_file: ResponseFileV1_1 = ResponseFileV1_1(
+                file=body,
+                chunk_size=self._body_chunk_size,
+                on_close=on_close
+            )
+            file_wrapper: Callable[[IO[bytes], int], Iterable[bytes]]|None = environ.get("wsgi.file_wrapper")
+            if file_wrapper is not None:
+                return file_wrapper(response_file, self._body_chunk_size)
+            return response_file
+        return ResponseIterableV1_1(body=body, on_close=on_close)
+
+
+
+
+class IASGIApp(IApp, ABC):
+
+    @abstractmethod
+    async def handle_request_async(self, request: IRequest) -> IResponse:
+        pass
+
+    @abstractmethod
+    async def __call__(self, scope: dict[str, Any], receive: Callable[[], Awaitable[dict[str, Any]]], send: Callable[[dict[str, Any]], Awaitable[None]]) -> None:
+        pass
+
+class ASGIAppV1_1(AppV1_1, IASGIApp):
+
+    def __init__(
+        self,
+        max_body_size: int|None = None,
+        body_chunk_size: int = 64*1024,
+        body_spool_threshold: int = 1024*1024,
+        thread_pool_size: int = 32,
+        include_tracebacks: bool = False,
+        metrics: MetricsV1_1|None = None,
+        background_tasks: BackgroundTasksV1_1|None = None
+    ) -> None:
+        # Not profiled, cProfile would attribute the other tasks running on the event loop
+        # to the sampled request
+        super().__init__(
+            include_tracebacks=include_tracebacks,
+            metrics=metrics,
+            background_tasks=background_tasks
+        )
+        self._max_body_size: int|None = max_body_size
+        self._body_chunk_size: int = body_chunk_size
+        self._body_spool_threshold: int = body_spool_threshold
+        from concurrent.futures import ThreadPoolExecutor
+        self._thread_pool_size: int = thread_pool_size
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=thread_pool_size,
+            thread_name_prefix="chains"
+        )
+        self._bridge_executors: tuple[Executor, ...] = tuple()
+        self.__async_dispatcher: AsyncRequestHandler|None = None
+
+    def freeze(self, route_cache_size: int|None = None) -> Self:
+        super().freeze(
+            route_cache_size=route_cache_size
+        )
+        if self.__async_dispatcher is not None:
+            return self
+        from chains.src.response_cache import async_equivalents as response_cache_async_equivalents
+        from chains.src.compression import async_equivalents as compression_async_equivalents
+        from chains.src.rate_limit import async_equivalents as rate_limit_async_equivalents
+        from chains.src.single_flight import async_equivalents as single_flight_async_equivalents
+        from concurrent.futures import ThreadPoolExecutor
+        composer: AsyncComposerV1_1 = AsyncComposerV1_1(
+            executor=self._executor,
+            bridge_executor_factory=partial(ThreadPoolExecutor, max_workers=self._thread_pool_size, thread_name_prefix="chains-bridge"),
+            async_equivalents={**async_equivalents, **response_cache_async_equivalents, **compression_async_equivalents, **rate_limit_async_equivalents, **single_flight_async_equivalents}
+        )
+        primary_branch_ingress_handler: BranchIngressHandlerV1_1 = self._root_ingress_handler.primary_branch_ingress_handler
+        primary_branch_ingress_handler.branch_handler.compile_async(
+            composer=composer
+        )
+        async_dispatcher: AsyncRequestHandler = self._root_ingress_handler.compose_middleware_async(
+            downstream=primary_branch_ingress_handler.compose_middleware_async(
+                downstream=ComposedHandler(
+                    async_handler=primary_branch_ingress_handler.branch_handler.handle_async
+                ),
+                composer=composer
+            ),
+            composer=composer
+        ).async_handler
+        if self._metrics is not None:
+            async_dispatcher = async_timed(
+                function=async_dispatcher,
+                histogram=self._metrics.request_histogram
+            )
+        self.__async_dispatcher = async_dispatcher
+        self._bridge_executors = composer.bridge_executors
+        return self
+
+    async def handle_request_async(self, request: IRequest) -> IResponse:
+        if self.__async_dispatcher is None:
+            self.freeze()
+        return await self.__async_dispatcher(request)
+
+    async def __call__(self, scope: dict[str, Any], receive: Callable[[], Awaitable[dict[str, Any]]], send: Callable[[dict[str, Any]], Awaitable[None]]) -> None:
+        if scope["type"] == "lifespan":
+            return await self.__lifespan(
+                receive=receive,
+                send=send
+            )
+        if scope["type"] != "http":
+            raise UnsupportedScopeException(f"Unsupported ASGI scope type '{scope['type']}'")
+        content_length: int|None = None
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.strip().isdigit():
+                content_length = int(value)
+        if self._max_body_size is not None and content_length is not None and content_length > self._max_body_size:
+            return await self.__send_response(
+                send=send,
+                response=self._payload_too_large(max_body_size=self._max_body_size)
+            )
+        # The body is spooled before routing since the request stream is read synchronously,
+        # it stays in memory up to the spool threshold and spills to disk after that
+        from tempfile import SpooledTemporaryFile
+        spool: SpooledTemporaryFile = SpooledTemporaryFile(
+            max_size=self._body_spool_threshold
+        )
+        body_size: int = 0
+        while True:
+            message: dict[str, Any] = await receive()
+            if message["type"] == "http.disconnect":
+                spool.close()
+                return None
+            chunk: bytes = message.get("body", b"")
+            body_size += len(chunk)
+            if self._max_body_size is not None and body_size > self._max_body_size:
+                spool.close()
+                return await self.__send_response(
+                    send=send,
+                    response=self._payload_too_large(max_body_size=self._max_body_size)
+                )
+            spool.write(chunk)
+            if not message.get("more_body", False):
+                break
+        spool.seek(0)
+        request_stream: RequestStreamV1_1 = RequestStreamV1_1(
+            input=spool,
+            content_length=body_size,
+            max_body_size=self._max_body_size,
+            chunk_size=self._body_chunk_size,
+            spool_threshold=self._body_spool_threshold
+        )
+        # The headers are keyed the way a WSGI server would key them, so that requests read the same
+        # under both adapters
+        environ: dict[str, Any] = dict()
+        for name, value in scope["headers"]:
+            key: str = name.decode("latin-1").upper().replace("-", "_")
+            if key not in ("CONTENT_TYPE", "CONTENT_LENGTH"):
+                key = f"HTTP_{key}"
+            header_value: str = value.decode("latin-1")
+            if key in environ:
+                # Repeated headers are combined, cookies with the separator of the Cookie header
+                header_value = f"{environ[key]}{'; ' if key == 'HTTP_COOKIE' else ','}{header_value}"
+            environ[key] = header_value
+        request: Request = Request(
+            method=scope["method"],
+            path=scope["path"],
+            stream=request_stream,
+            headers=EnvironHeadersV1_1(
+                environ=environ
+            ),
+            query_string=scope.get("query_string", b"").decode("latin-1"),
+            remote_address=scope["client"][0] if scope.get("client") is not None else None
+        )
+        try:
+            response: IResponse = await self.handle_request_async(
+                request=request
+            )
+            await self.__send_response(
+                send=send,
+                response=response
+            )
+        finally:
+            request_stream.close()
+            spool.close()
+        background_tasks: tuple[BackgroundTask, ...] = request.background_tasks
+        if len(background_tasks) > 0:
+            # Not awaited, the connection is free for the next request while the tasks run
+            from asyncio import get_running_loop
+            get_running_loop().run_in_executor(
+                self._executor,
+                partial(self._background_tasks.schedule, background_tasks)
+            )
+        return None
+
+    async def __send_response(self, send: Callable[[dict[str, Any]], Awaitable[None]], response: IResponse) -> None:
+        body: ResponseBody|None = response.body
+        if body is not None and hasattr(body, "read"):
+            self._set_file_content_length(
+                response=response
+            )
+        await send({
+            "type": "http.response.start",
+            "status": response.status_code,
+            "headers": [
+                (key.encode("latin-1"), value.encode("latin-1"))
+                for key, value in response.headers.header_list()
+            ]
+        })
+        if body is None or isinstance(body, (bytes, bytearray, memoryview)):
+            await send({"type": "http.response.body", "body": bytes(body) if body is not None else b""})
+            return None
+        from asyncio import get_running_loop
+        loop = get_running_loop()
+        try:
+            if hasattr(body, "__aiter__"):
+                async for chunk in body:
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            elif hasattr(body, "read"):
+                while True:
+                    chunk: bytes = await loop.run_in_executor(self._executor, body.read, self._body_chunk_size)
+                    if len(chunk) < 1:
+                        break
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            else:
+                iterator: Iterable[bytes] = iter(body)
+                while True:
+                    chunk: bytes|None = await loop.run_in_executor(self._executor, next, iterator, None)
+                    if chunk is None:
+                        break
+                    await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            if hasattr(body, "aclose"):
+                await body.aclose()
+            elif hasattr(body, "close"):
+                body.close()
+        return None
+
+    async def __lifespan(self, receive: Callable[[], Awaitable[dict[str, Any]]], send: Callable[[dict[str, Any]], Awaitable[None]]) -> None:
+        while True:
+            message: dict[str, Any] = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    self.freeze()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                else:
+                    await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self._executor.shutdown(wait=False)
+                for bridge_executor in self._bridge_executors:
+                    bridge_executor.shutdown(wait=False)
+                await send({"type": "lifespan.shutdown.complete"})
+                return None
 
 
 
@@ -155,3 +612,4 @@ Chains = WSGIAppV1_1
 Branch = BranchV1_1
 Request = RequestV1_1
 Response = ResponseV1_1
+ChainsASGI = ASGIAppV1_1
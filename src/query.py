@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Iterator
+
+from chains.src.exceptions import BadRequestException
+
+
+
+# Parsing is bounded so that a long query string can't keep a worker busy
+MAX_QUERY_STRING_LENGTH: int = 65536
+MAX_QUERY_FIELDS: int = 1000
+
+
+
+class QueryParamsV1_1(Mapping[str, str]):
+
+    __slots__ = ("_items", "_values")
+
+    # A read only multi-dict, indexing it gives the first value of a name and
+    # get_list() gives all of them in the order they appeared in
+    def __init__(self, items: list[tuple[str, str]]|None = None) -> None:
+        self._items: list[tuple[str, str]] = items if items is not None else list()
+        self._values: dict[str, list[str]] = dict()
+        for name, value in self._items:
+            values: list[str]|None = self._values.get(name)
+            if values is None:
+                self._values[name] = [value]
+            else:
+                values.append(value)
+
+    def __getitem__(self, name: str) -> str:
+        return self._values[name][0]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, name: object) -> bool:
+        return name in self._values
+
+    def get_list(self, name: str) -> list[str]:
+        values: list[str]|None = self._values.get(name)
+        return list(values) if values is not None else list()
+
+    def multi_items(self) -> list[tuple[str, str]]:
+        return list(self._items)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, QueryParamsV1_1):
+            return self._items == other._items
+        return super().__eq__(other)
+
+    def __str__(self) -> str:
+        return f"QueryParamsV1_1({self._items})"
+
+EMPTY_QUERY_PARAMS: QueryParamsV1_1 = QueryParamsV1_1()
+
+
+
+def _decode(component: str) -> str:
+    if "+" in component:
+        component = component.replace("+", " ")
+    if "%" in component:
+        # Only imported by applications that receive percent encoded query strings
+        from urllib.parse import unquote
+        component = unquote(component, errors="replace")
+    return component
+
+def parse_query_string(
+    query_string: str,
+    max_length: int = MAX_QUERY_STRING_LENGTH,
+    max_fields: int = MAX_QUERY_FIELDS
+) -> QueryParamsV1_1:
+    # Parses application/x-www-form-urlencoded data, names without a value get an empty one
+    if len(query_string) < 1:
+        return EMPTY_QUERY_PARAMS
+    if len(query_string) > max_length:
+        raise BadRequestException(
+            reason=f"The query string exceeds the maximum allowed length of {max_length} characters"
+        )
+    # Checked before anything is split, every field needs a separator
+    if query_string.count("&") >= max_fields:
+        raise BadRequestException(
+            reason=f"The query string has more than the maximum allowed {max_fields} fields"
+        )
+    if not query_string.isascii():
+        # Servers decode the raw bytes of the query string as latin-1, clients send UTF-8
+        try:
+            query_string = query_string.encode("latin-1").decode("utf-8", errors="replace")
+        except UnicodeEncodeError:
+            pass
+    items: list[tuple[str, str]] = list()
+    for field in query_string.split("&"):
+        if len(field) < 1:
+            continue
+        name, _, value = field.partition("=")
+        items.append((_decode(name), _decode(value)))
+    return QueryParamsV1_1(items)
+
+
+
+QueryParams = QueryParamsV1_1
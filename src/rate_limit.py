@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Awaitable, Callable
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from hashlib import blake2b
+from itertools import count
+from math import ceil
+from mmap import mmap
+from os import O_CREAT, O_RDWR, close, fstat, ftruncate, open as open_fd
+from os.path import isdir, join
+from struct import Struct
+from tempfile import gettempdir
+from threading import Lock
+from time import monotonic
+
+try:
+    from fcntl import lockf, LOCK_EX, LOCK_UN
+except ImportError:
+    # Not available on Windows, where only the in process buckets can be used
+    lockf = None
+
+from chains.src.request import IRequest
+from chains.src.response import IResponse
+from chains.src.error_responses import too_many_requests_response
+from chains.src.exceptions import InvalidSettingsException, UnsupportedPlatformException
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+
+class ITokenBuckets(ABC):
+
+    @abstractmethod
+    def take(self, key: str, rate: float, burst: float, now: float) -> float:
+        # Takes a token from the bucket of the key, returns 0 if there was one and
+        # otherwise the number of seconds until there will be one
+        pass
+
+class TokenBucketsV1_1(ITokenBuckets):
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        if max_keys < 1:
+            raise InvalidSettingsException("The token buckets must be able to hold at least one key")
+        self._max_keys: int = max_keys
+        # Maps a key to its number of tokens, the time they were counted at and the time
+        # the bucket takes to refill, the least recently used keys come first
+        self._buckets: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock: Lock = Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self._buckets)
+
+    def take(self, key: str, rate: float, burst: float, now: float) -> float:
+        with self._lock:
+            bucket: list[float]|None = self._buckets.get(key)
+            if bucket is None:
+                bucket = [burst, now, burst / rate]
+                self._buckets[key] = bucket
+            else:
+                # Threads that read the clock before waiting for the lock can be behind the bucket
+                if now > bucket[1]:
+                    bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+                    bucket[1] = now
+                self._buckets.move_to_end(key)
+            wait: float = 0.0
+            if bucket[0] >= 1.0:
+                bucket[0] -= 1.0
+            else:
+                wait = (1.0 - bucket[0]) / rate
+            self.__evict(now)
+        return wait
+
+    def __evict(self, now: float) -> None:
+        # A bucket left alone long enough to refill is the same as no bucket at all
+        buckets: OrderedDict[str, list[float]] = self._buckets
+        while len(buckets) > 0:
+            key, (_, counted_at, refill_time) = next(iter(buckets.items()))
+            if now - counted_at < refill_time and len(buckets) <= self._max_keys:
+                break
+            del buckets[key]
+        return None
+
+class SharedTokenBucketsV1_1(ITokenBuckets):
+
+    # The hash of the key, its number of tokens, the time they were counted at and the time
+    # the bucket takes to refill
+    __SLOT: Struct = Struct("<Qddd")
+
+    def __init__(self, name: str = "chains", path: str|None = None, slots: int = 65_536, group_size: int = 8) -> None:
+        if lockf is None:
+            raise UnsupportedPlatformException("Shared token buckets need fcntl, which isn't available on this platform")
+        if slots < group_size or group_size < 1:
+            raise InvalidSettingsException("There has to be at least one group of slots")
+        if path is None:
+            # /dev/shm keeps the table in memory on Linux
+            path = join("/dev/shm" if isdir("/dev/shm") else gettempdir(), f"chains-rate-limit-{name}")
+        self._path: str = path
+        self._group_size: int = group_size
+        self._groups: int = slots // group_size
+        self._group_bytes: int = group_size * self.__SLOT.size
+        size: int = self._groups * self._group_bytes
+        self._fd: int = open_fd(path, O_RDWR | O_CREAT, 0o600)
+        existing_size: int = fstat(self._fd).st_size
+        if existing_size == 0:
+            ftruncate(self._fd, size)
+        elif existing_size != size:
+            close(self._fd)
+            raise InvalidSettingsException(f"{path} was created with a different number of slots")
+        self._mmap: mmap = mmap(self._fd, size)
+        # Record locks are held by processes, the threads of a process also need locks of their own
+        self._locks: tuple[Lock, ...] = tuple(Lock() for _ in range(min(self._groups, 64)))
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def take(self, key: str, rate: float, burst: float, now: float) -> float:
+        key_hash: int = int.from_bytes(blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+        group: int = key_hash % self._groups
+        group_offset: int = group * self._group_bytes
+        refill_time: float = burst / rate
+        with self._locks[group % len(self._locks)]:
+            lockf(self._fd, LOCK_EX, self._group_bytes, group_offset)
+            try:
+                offset: int|None = None
+                tokens: float = burst
+                # An empty slot, or the slot that was used the longest time ago, is taken by new keys
+                replaceable_offset: int = group_offset
+                replaceable_counted_at: float = float("inf")
+                for slot_offset in range(group_offset, group_offset + self._group_bytes, self.__SLOT.size):
+                    slot_hash, slot_tokens, counted_at, slot_refill_time = self.__SLOT.unpack_from(self._mmap, slot_offset)
+                    if slot_hash == key_hash:
+                        offset = slot_offset
+                        if now >= counted_at:
+                            tokens = min(burst, slot_tokens + (now - counted_at) * rate)
+                        elif counted_at - now < slot_refill_time:
+                            # Read the clock before another process that got the lock first
+                            tokens, now = slot_tokens, counted_at
+                        # Otherwise the count is from before the host restarted and is discarded
+                        break
+                    # Slots of other limiters are checked against the refill time they were written with
+                    if slot_hash == 0 or now - counted_at >= slot_refill_time:
+                        counted_at = float("-inf")
+                    if counted_at < replaceable_counted_at:
+                        replaceable_offset, replaceable_counted_at = slot_offset, counted_at
+                if offset is None:
+                    offset = replaceable_offset
+                wait: float = 0.0
+                if tokens >= 1.0:
+                    tokens -= 1.0
+                else:
+                    wait = (1.0 - tokens) / rate
+                self.__SLOT.pack_into(self._mmap, offset, key_hash, tokens, now, refill_time)
+            finally:
+                lockf(self._fd, LOCK_UN, self._group_bytes, group_offset)
+        return wait
+
+    def clear(self) -> Self:
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            lockf(self._fd, LOCK_EX, 0, 0)
+            self._mmap[:] = bytes(len(self._mmap))
+            lockf(self._fd, LOCK_UN, 0, 0)
+        finally:
+            for lock in self._locks:
+                lock.release()
+        return self
+
+    def close(self) -> None:
+        self._mmap.close()
+        close(self._fd)
+        return None
+
+
+
+def client_address_key(request: IRequest) -> str|None:
+    return request.remote_address
+
+def route_key(request: IRequest) -> str|None:
+    return f"{request.method} {request.path}"
+
+def header_key(name: str) -> Callable[[IRequest], str|None]:
+    def key(request: IRequest) -> str|None:
+        return request.headers.get_single_value_header(name=name)
+    return key
+
+class RateLimiterV1_1:
+
+    # Limiters created in the same order by every worker get the same ids, so that
+    # their keys match in shared buckets
+    __ids: count = count(1)
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int|None = None,
+        key: Callable[[IRequest], str|None] = client_address_key,
+        buckets: ITokenBuckets|None = None,
+        name: str|None = None
+    ) -> None:
+        if rate <= 0:
+            raise InvalidSettingsException("The rate has to be greater than 0 requests per second")
+        self._rate: float = rate
+        self._burst: float = float(burst if burst is not None else max(ceil(rate), 1))
+        if self._burst < 1:
+            raise InvalidSettingsException("The burst has to allow at least one request")
+        self._key: Callable[[IRequest], str|None] = key
+        self._buckets: ITokenBuckets = buckets if buckets is not None else TokenBucketsV1_1()
+        # Keys are prefixed so that limiters sharing buckets don't take each other's tokens
+        self._name: str = name if name is not None else str(next(self.__ids))
+        self._prefix: str = f"{self._name}\x00"
+
+    @property
+    def buckets(self) -> ITokenBuckets:
+        return self._buckets
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def check(self, request: IRequest) -> IResponse|None:
+        # Returns the response to send when the request is over the limit
+        key: str|None = self._key(request)
+        if key is None:
+            return None
+        wait: float = self._buckets.take(self._prefix + key, self._rate, self._burst, monotonic())
+        if wait <= 0:
+            return None
+        return too_many_requests_response(
+            retry_after=max(ceil(wait), 1)
+        ).copy_on_write()
+
+
+
+def rate_limiterv1_1(request: IRequest, next: Callable[[IRequest], IResponse], rate_limiter: RateLimiterV1_1) -> IResponse:
+    response: IResponse|None = rate_limiter.check(request)
+    if response is not None:
+        return response
+    return next(request)
+
+async def async_rate_limiterv1_1(request: IRequest, next: Callable[[IRequest], Awaitable[IResponse]], rate_limiter: RateLimiterV1_1) -> IResponse:
+    response: IResponse|None = rate_limiter.check(request)
+    if response is not None:
+        return response
+    return await next(request)
+
+
+
+async_equivalents: dict[Callable, Callable] = {
+    rate_limiterv1_1: async_rate_limiterv1_1
+}
+
+
+
+RateLimiter = RateLimiterV1_1
+SharedTokenBuckets = SharedTokenBucketsV1_1
@@ -1,12 +1,30 @@
-from typing_extensions import Self
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Any, Callable, Mapping
 from abc import ABC, abstractmethod
+from io import BytesIO
+
+from chains.src.header import IHeaders, CompactHeadersV1_1
+from chains.src.streams import IRequestStream, RequestStreamV1_1
+from chains.src.path_params import PathParamName, EMPTY_PATH_PARAMS
+from chains.src.query import QueryParamsV1_1, parse_query_string
+from chains.src.forms import FormParserV1_1, MAX_FORM_PARTS, MAX_FORM_FIELD_SIZE, FORM_SPOOL_THRESHOLD
+from chains.src.exceptions import BodyNotSetException, EmptyBodyException
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
 
-from chains.src.header import IHeaders, HeadersV1_1
+
+
+# A function along with the positional and keyword arguments it's called with
+BackgroundTask = tuple[Callable[..., Any], tuple[Any, ...], dict[str, Any]]
 
 
 
 class IRequest(ABC):
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def method(self) -> str:
@@ -27,6 +45,46 @@ class IRequest(ABC):
     def path(self, path: str) -> Self:
         pass
 
+    @property
+    @abstractmethod
+    def full_path(self) -> str:
+        pass
+
+    @property
+    @abstractmethod
+    def query_string(self) -> str:
+        pass
+
+    @property
+    @abstractmethod
+    def query(self) -> QueryParamsV1_1:
+        pass
+
+    @property
+    @abstractmethod
+    def remote_address(self) -> str|None:
+        pass
+
+    @property
+    @abstractmethod
+    def path_params(self) -> Mapping[PathParamName, Any]:
+        pass
+
+    @path_params.setter
+    @abstractmethod
+    def path_params(self, path_params: Mapping[PathParamName, Any]) -> Self:
+        pass
+
+    @property
+    @abstractmethod
+    def route_template(self) -> str|None:
+        pass
+
+    @route_template.setter
+    @abstractmethod
+    def route_template(self, route_template: str) -> Self:
+        pass
+
     @property
     @abstractmethod
     def version(self) -> str:
@@ -52,21 +110,66 @@ class IRequest(ABC):
     def body(self) -> Self:
         pass
 
+    @property
+    @abstractmethod
+    def stream(self) -> IRequestStream:
+        pass
+
+    @abstractmethod
+    def form(
+        self,
+        max_parts: int = MAX_FORM_PARTS,
+        max_part_size: int|None = None,
+        max_field_size: int = MAX_FORM_FIELD_SIZE,
+        max_size: int|None = None,
+        spool_threshold: int = FORM_SPOOL_THRESHOLD
+    ) -> FormParserV1_1:
+        pass
+
+    @property
+    @abstractmethod
+    def background_tasks(self) -> tuple[BackgroundTask, ...]:
+        pass
+
+    @abstractmethod
+    def add_background_task(self, function: Callable[..., Any], *args, **kwargs) -> Self:
+        pass
+
 
 
 class RequestV1_1(IRequest):
 
+    __slots__ = ("_method", "_path", "_full_path", "_query_string", "_query", "_remote_address", "_path_params", "_route_template", "_headers", "_body", "_stream", "_body_loaded", "_background_tasks")
+
     __VERSION: str = "1.1"
 
     def __init__(
         self,
         method: str,
         path: str,
+        stream: IRequestStream|None = None,
+        headers: IHeaders|None = None,
+        query_string: str = "",
+        remote_address: str|None = None
     ):
         self._method: str = method
         self._path: str = path
-        self._headers: HeadersV1_1 = HeadersV1_1()
+        # Branches strip their prefix off of the path, this is the path the request arrived with
+        self._full_path: str = path
+        self._query_string: str = query_string
+        # Parsed when it's first used, most routes never look at the query string
+        self._query: QueryParamsV1_1|None = None
+        self._remote_address: str|None = remote_address
+        # Set by the router with the values captured by the wildcards of the route
+        self._path_params: Mapping[PathParamName, Any] = EMPTY_PATH_PARAMS
+        # Set by the router of a frozen application with the template of the route it resolved
+        self._route_template: str|None = None
+        self._headers: IHeaders = headers if headers is not None else CompactHeadersV1_1()
         self._body: bytes|None = None
+        self._stream: IRequestStream|None = stream
+        self._body_loaded: bool = stream is None
+        # Created when the first task is added, most requests don't have any
+        self._background_tasks: list[BackgroundTask]|None = None
 
     @property
     def method(self) -> str:
@@ -86,30 +189,139 @@ class RequestV1_1(IRequest):
         self._path = path
         return self
 
+    @property
+    def full_path(self) -> str:
+        return self._full_path
+
+    @property
+    def query_string(self) -> str:
+        return self._query_string
+
+    @property
+    def query(self) -> QueryParamsV1_1:
+        if self._query is None:
+            self._query = parse_query_string(self._query_string)
+        return self._query
+
+    @property
+    def remote_address(self) -> str|None:
+        return self._remote_address
+
+    @property
+    def path_params(self) -> Mapping[PathParamName, Any]:
+        return self._path_params
+
+    @path_params.setter
+    def path_params(self, path_params: Mapping[PathParamName, Any]) -> Self:
+        self._path_params = path_params
+        return self
+
+    @property
+    def route_template(self) -> str|None:
+        return self._route_template
+
+    @route_template.setter
+    def route_template(self, route_template: str) -> Self:
+        self._route_template = route_template
+        return self
+
     @property
     def version(self) -> str:
         return self.__VERSION
 
     @property
-    def headers(self) -> HeadersV1_1:
+    def headers(self) -> IHeaders:
         return self._headers
 
     @property
     def body(self) -> bytes|None:
+        if self._body_loaded is False:
+            self._body_loaded = True
+            # Spooling keeps the stream readable for whoever reads it after the body
+            self._stream.spool()
+            body: bytes = self._stream.read()
+            self._stream.seek(0)
+            if len(body) > 0:
+                self._body = body
         return self._body
 
     @body.setter
     def body(self, body: bytes) -> Self:
         if len(body) < 1:
-            #TODO: Add an exception for a zero length body
-            raise ValueError("The body has to have a minimum size/length of 1 byte")
+            raise EmptyBodyException("The body has to have a minimum size/length of 1 byte")
         self._body = body
+        self.__discard_stream()
         return self
 
     @body.deleter
     def body(self) -> Self:
-        if not self._body:
-            #TODO: Add an exception for a non existant body
-            raise ValueError("The body does not exist/ has not been set")
+        if not self.body:
+            raise BodyNotSetException("The body does not exist/ has not been set")
+        self._body = None
+        self.__discard_stream()
+        return self
+
+    @property
+    def stream(self) -> IRequestStream:
+        if self._stream is None:
+            body: bytes = self._body if self._body is not None else b""
+            self._stream = RequestStreamV1_1(
+                input=BytesIO(body),
+                content_length=len(body)
+            )
+        return self._stream
+
+    def form(
+        self,
+        max_parts: int = MAX_FORM_PARTS,
+        max_part_size: int|None = None,
+        max_field_size: int = MAX_FORM_FIELD_SIZE,
+        max_size: int|None = None,
+        spool_threshold: int = FORM_SPOOL_THRESHOLD
+    ) -> FormParserV1_1:
+        # The parts are read from the stream as the parser is iterated over
+        content_type: str|None = self._headers.get_single_value_header("Content-Type")
+        return FormParserV1_1(
+            stream=self.stream,
+            content_type=content_type if content_type is not None else "",
+            max_parts=max_parts,
+            max_part_size=max_part_size,
+            max_field_size=max_field_size,
+            max_size=max_size,
+            spool_threshold=spool_threshold
+        )
+
+    @property
+    def background_tasks(self) -> tuple[BackgroundTask, ...]:
+        if self._background_tasks is None:
+            return tuple()
+        return tuple(self._background_tasks)
+
+    def add_background_task(self, function: Callable[..., Any], *args, **kwargs) -> Self:
+        if self._background_tasks is None:
+            self._background_tasks = list()
+        self._background_tasks.append((function, args, kwargs))
+        return self
+
+    def _reset(self, method: str, path: str, stream: IRequestStream|None = None, query_string: str = "", remote_address: str|None = None) -> Self:
+        # Used by request pools, the headers object is kept and reset by its owner
+        self._method = method
+        self._path = path
+        self._full_path = path
+        self._query_string = query_string
+        self._query = None
+        self._remote_address = remote_address
+        self._path_params = EMPTY_PATH_PARAMS
+        self._route_template = None
         self._body = None
+        self._stream = stream
+        self._body_loaded = stream is None
+        self._background_tasks = None
         return self
+
+    def __discard_stream(self) -> None:
+        if self._stream is not None:
+            self._stream.close()
+        self._stream = None
+        self._body_loaded = True
+        return None
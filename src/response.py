@@ -1,12 +1,24 @@
-from typing_extensions import Self
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, IO, Any, Iterable
 from abc import ABC, abstractmethod
 
-from chains.src.header import IHeaders, HeadersV1_1
+from chains.src.header import IHeaders, CompactHeadersV1_1, ImmutableHeadersV1_1, CopyOnWriteHeadersV1_1
+from chains.src.exceptions import ImmutableResponseException, BodyNotSetException, EmptyBodyException
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+
+ResponseBody = bytes|Iterable[bytes]|IO[bytes]
 
 
 
 class IResponse(ABC):
 
+    __slots__ = ()
+
     @property
     @abstractmethod
     def version(self) -> str:
@@ -39,12 +51,12 @@ class IResponse(ABC):
 
     @property
     @abstractmethod
-    def body(self) -> bytes|None:
+    def body(self) -> ResponseBody|None:
         pass
 
     @body.setter
     @abstractmethod
-    def body(self, body: bytes) -> Self:
+    def body(self, body: ResponseBody) -> Self:
         pass
 
     @body.deleter
@@ -56,17 +68,20 @@ class IResponse(ABC):
 
 class ResponseV1_1(IResponse):
 
+    __slots__ = ("_status_code", "_status_text", "_headers", "_body")
+
     __VERSION: str = "1.1"
 
     def __init__(
         self,
         status_code: int,
-        status_text: str
+        status_text: str,
+        headers: CompactHeadersV1_1|None = None
     ) -> None:
         self._status_code: int = status_code
         self._status_text: str = status_text
-        self._headers: HeadersV1_1 = HeadersV1_1()
-        self._body: bytes|None = None
+        self._headers: CompactHeadersV1_1 = headers if headers is not None else CompactHeadersV1_1()
+        self._body: ResponseBody|None = None
 
     @property
     def version(self) -> str:
@@ -91,25 +106,112 @@ class ResponseV1_1(IResponse):
         return self
 
     @property
-    def headers(self) -> HeadersV1_1:
+    def headers(self) -> CompactHeadersV1_1:
         return self._headers
 
     @property
-    def body(self) -> bytes|None:
+    def body(self) -> ResponseBody|None:
         return self._body
 
     @body.setter
-    def body(self, body: bytes) -> Self:
-        if len(body) < 1:
-            #TODO: Add an exception for a zero length body
-            raise ValueError("The body has to have a minimum size/length of 1 byte")
+    def body(self, body: ResponseBody) -> Self:
+        if isinstance(body, (bytes, bytearray, memoryview)):
+            if len(body) < 1:
+                raise EmptyBodyException("The body has to have a minimum size/length of 1 byte")
+        elif isinstance(body, str) or not (hasattr(body, "read") or hasattr(body, "__iter__")):
+            raise TypeError("The body has to be a bytes object, an iterable of bytes objects or a binary file object")
         self._body = body
         return self
 
     @body.deleter
     def body(self) -> Self:
-        if not self._body:
-            #TODO: Add an exception for a non existant body
-            raise ValueError("The body does not exist/ has not been set")
+        if self._body is None:
+            raise BodyNotSetException("The body does not exist/ has not been set")
         self._body = None
         return self
+
+
+
+class ImmutableResponseV1_1(IResponse):
+
+    __slots__ = ("_status_code", "_status_text", "_headers", "_body")
+
+    __VERSION: str = "1.1"
+
+    def __init__(
+        self,
+        status_code: int,
+        status_text: str,
+        headers: Iterable[tuple[str, Any]],
+        body: bytes
+    ) -> None:
+        self._status_code: int = status_code
+        self._status_text: str = status_text
+        self._headers: ImmutableHeadersV1_1 = ImmutableHeadersV1_1(
+            headers=headers
+        )
+        self._body: bytes = body
+
+    def __immutable(self) -> None:
+        raise ImmutableResponseException("This response is shared between requests and can not be changed, copy it to change it")
+
+    @property
+    def version(self) -> str:
+        return self.__VERSION
+
+    @property
+    def status_code(self) -> int:
+        return self._status_code
+
+    @status_code.setter
+    def status_code(self, code: int) -> Self:
+        self.__immutable()
+
+    @property
+    def status_text(self) -> str:
+        return self._status_text
+
+    @status_text.setter
+    def status_text(self, text: str) -> Self:
+        self.__immutable()
+
+    @property
+    def headers(self) -> ImmutableHeadersV1_1:
+        return self._headers
+
+    @property
+    def body(self) -> bytes:
+        return self._body
+
+    @body.setter
+    def body(self, body: ResponseBody) -> Self:
+        self.__immutable()
+
+    @body.deleter
+    def body(self) -> Self:
+        self.__immutable()
+
+    def copy_on_write(self) -> ResponseV1_1:
+        # What's handed to middleware in place of the shared response, it only copies
+        # the headers if they're changed, so sending it unchanged costs no more
+        response: ResponseV1_1 = ResponseV1_1(
+            status_code=self._status_code,
+            status_text=self._status_text,
+            headers=CopyOnWriteHeadersV1_1(
+                shared=self._headers
+            )
+        )
+        response._body = self._body
+        return response
+
+    def copy(self) -> ResponseV1_1:
+        response: ResponseV1_1 = ResponseV1_1(
+            status_code=self._status_code,
+            status_text=self._status_text
+        )
+        response.body = self._body
+        for header_name, header_value in self._headers.header_list():
+            response.headers.set_single_value_header(
+                name=header_name, value=header_value
+            )
+        return response
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Awaitable, Callable, Hashable, Iterable
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Lock
+from time import monotonic
+
+from chains.src.request import IRequest
+from chains.src.response import IResponse, ResponseV1_1
+from chains.src.exceptions import InvalidSettingsException
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+
+class ResponseCacheEntry:
+
+    __slots__ = ("status_code", "status_text", "headers", "multi_value_names", "body", "etag", "expires_at", "size")
+
+    def __init__(
+        self,
+        status_code: int,
+        status_text: str,
+        headers: tuple[tuple[str, str], ...],
+        body: bytes,
+        etag: str,
+        expires_at: float
+    ) -> None:
+        self.status_code: int = status_code
+        self.status_text: str = status_text
+        self.headers: tuple[tuple[str, str], ...] = headers
+        header_names: list[str] = [name.lower() for name, _ in headers]
+        self.multi_value_names: frozenset[str] = frozenset(name for name in header_names if header_names.count(name) > 1)
+        self.body: bytes = body
+        self.etag: str = etag
+        self.expires_at: float = expires_at
+        self.size: int = len(body) + sum(len(name) + len(value) for name, value in headers)
+
+class ResponseCacheV1_1:
+
+    __UNCACHEABLE_DIRECTIVES: frozenset[str] = frozenset(("no-store", "no-cache", "private"))
+
+    def __init__(
+        self,
+        max_bytes: int = 64*1024*1024,
+        default_ttl: float = 60.0,
+        vary: Iterable[str] = (),
+        max_entry_bytes: int|None = None,
+        methods: Iterable[str] = ("GET", "HEAD")
+    ) -> None:
+        if max_bytes < 1:
+            raise InvalidSettingsException("The response cache must be able to hold at least one byte")
+        self._max_bytes: int = max_bytes
+        self._max_entry_bytes: int = max_entry_bytes if max_entry_bytes is not None else max_bytes
+        self._default_ttl: float = default_ttl
+        self._vary: tuple[str, ...] = tuple(vary)
+        self._vary_keys: frozenset[str] = frozenset(name.lower() for name in self._vary)
+        self._vary_header: str|None = ", ".join(self._vary) if len(self._vary) > 0 else None
+        # Requests with cookies usually get a response of their own, they're only cached
+        # when the cookies are part of the key
+        self._vary_cookies: bool = "cookie" in self._vary_keys
+        self._methods: frozenset[str] = frozenset(methods)
+        self._entries: OrderedDict[Hashable, ResponseCacheEntry] = OrderedDict()
+        self._lock: Lock = Lock()
+        self._bytes: int = 0
+        self._hits: int = 0
+        self._misses: int = 0
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    @property
+    def size(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def key(self, request: IRequest) -> Hashable|None:
+        if request.method not in self._methods:
+            return None
+        if request.headers.get_single_value_header(name="Authorization") is not None:
+            return None
+        if not self._vary_cookies and request.headers.get_single_value_header(name="Cookie") is not None:
+            return None
+        # The full path, branches with the same relative paths don't share entries
+        return (
+            request.method,
+            request.full_path,
+            request.query_string,
+            *(request.headers.get_single_value_header(name=name) for name in self._vary)
+        )
+
+    def get(self, key: Hashable) -> ResponseCacheEntry|None:
+        with self._lock:
+            entry: ResponseCacheEntry|None = self._entries.get(key)
+            if entry is not None and entry.expires_at <= monotonic():
+                self.__evict(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return entry
+
+    def put(self, key: Hashable, entry: ResponseCacheEntry) -> Self:
+        if entry.size > self._max_entry_bytes:
+            return self
+        with self._lock:
+            if key in self._entries:
+                self.__evict(key)
+            self._entries[key] = entry
+            self._bytes += entry.size
+            while self._bytes > self._max_bytes:
+                self.__evict(next(iter(self._entries)))
+        return self
+
+    def __evict(self, key: Hashable) -> None:
+        self._bytes -= self._entries.pop(key).size
+        return None
+
+    def invalidate(self, path: str) -> Self:
+        # Takes the full path, with the prefixes of the branches the route is in
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == path]:
+                self.__evict(key)
+        return self
+
+    def clear(self) -> Self:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._hits = 0
+            self._misses = 0
+        return self
+
+    def __ttl(self, response: IResponse) -> float|None:
+        cache_control: str|None = response.headers.get_single_value_header(name="Cache-Control")
+        if cache_control is None:
+            return self._default_ttl
+        max_age: float|None = None
+        shared_max_age: float|None = None
+        for directive in cache_control.lower().split(","):
+            name, _, value = directive.strip().partition("=")
+            if name in self.__UNCACHEABLE_DIRECTIVES:
+                return None
+            if name in ("max-age", "s-maxage") and value.strip('"').isascii() and value.strip('"').isdigit():
+                if name == "max-age":
+                    max_age = float(value.strip('"'))
+                else:
+                    shared_max_age = float(value.strip('"'))
+        if shared_max_age is not None:
+            return shared_max_age
+        if max_age is not None:
+            return max_age
+        return self._default_ttl
+
+    def __cacheable_vary(self, response: IResponse) -> bool:
+        vary: str|None = response.headers.get_single_value_header(name="Vary")
+        if vary is None:
+            return True
+        # Responses can only be cached if they vary on headers that are part of the key
+        return all(name.strip().lower() in self._vary_keys for name in vary.split(","))
+
+    def entry(self, response: IResponse) -> ResponseCacheEntry|None:
+        if response.status_code != 200:
+            return None
+        body: bytes|None = response.body
+        if body is None:
+            body = b""
+        elif not isinstance(body, (bytes, bytearray, memoryview)):
+            # Streamed and file backed responses aren't cached
+            return None
+        if response.headers.get_single_value_header(name="Set-Cookie") is not None or any(
+            True for _ in response.headers.yield_multi_value_header(name="Set-Cookie")
+        ):
+            return None
+        if not self.__cacheable_vary(response):
+            return None
+        ttl: float|None = self.__ttl(response)
+        if ttl is None or ttl <= 0:
+            return None
+        body = bytes(body)
+        etag: str|None = response.headers.get_single_value_header(name="ETag")
+        if etag is None:
+            etag = f'"{blake2b(body, digest_size=16).hexdigest()}"'
+            response.headers.set_single_value_header(
+                name="ETag", value=etag
+            )
+        if self._vary_header is not None and response.headers.get_single_value_header(name="Vary") is None:
+            response.headers.set_single_value_header(
+                name="Vary", value=self._vary_header
+            )
+        return ResponseCacheEntry(
+            status_code=response.status_code,
+            status_text=response.status_text,
+            headers=tuple(response.headers.header_list()),
+            body=body,
+            etag=etag,
+            expires_at=monotonic() + ttl
+        )
+
+
+
+def _etag_matches(request: IRequest, etag: str) -> bool:
+    if_none_match: str|None = request.headers.get_single_value_header(name="If-None-Match")
+    if if_none_match is None:
+        return False
+    # If-None-Match uses the weak comparison function
+    etag = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+def _not_modified_response(entry: ResponseCacheEntry) -> ResponseV1_1:
+    response: ResponseV1_1 = ResponseV1_1(
+        status_code=304,
+        status_text="NOT MODIFIED"
+    )
+    for header_name, header_value in entry.headers:
+        if header_name.lower() in ("etag", "cache-control", "vary", "expires", "last-modified"):
+            response.headers.set_single_value_header(
+                name=header_name, value=header_value
+            )
+    return response
+
+def _cached_response(request: IRequest, entry: ResponseCacheEntry) -> ResponseV1_1:
+    if _etag_matches(request, entry.etag):
+        return _not_modified_response(entry)
+    response: ResponseV1_1 = ResponseV1_1(
+        status_code=entry.status_code,
+        status_text=entry.status_text
+    )
+    if len(entry.body) > 0:
+        response.body = entry.body
+    for header_name, header_value in entry.headers:
+        if header_name.lower() in entry.multi_value_names:
+            response.headers.add_multi_value_header(
+                name=header_name, value=header_value
+            )
+        else:
+            response.headers.set_single_value_header(
+                name=header_name, value=header_value
+            )
+    return response
+
+def _store_response(request: IRequest, cache: ResponseCacheV1_1, key: Hashable, response: IResponse) -> IResponse:
+    entry: ResponseCacheEntry|None = cache.entry(response)
+    if entry is None:
+        return response
+    cache.put(key, entry)
+    if _etag_matches(request, entry.etag):
+        return _not_modified_response(entry)
+    return response
+
+
+
+def response_cachev1_1(request: IRequest, next: Callable[[IRequest], IResponse], cache: ResponseCacheV1_1) -> IResponse:
+    key: Hashable|None = cache.key(request)
+    if key is None:
+        return next(request)
+    entry: ResponseCacheEntry|None = cache.get(key)
+    if entry is not None:
+        return _cached_response(request, entry)
+    return _store_response(request, cache, key, next(request))
+
+async def async_response_cachev1_1(request: IRequest, next: Callable[[IRequest], Awaitable[IResponse]], cache: ResponseCacheV1_1) -> IResponse:
+    key: Hashable|None = cache.key(request)
+    if key is None:
+        return await next(request)
+    entry: ResponseCacheEntry|None = cache.get(key)
+    if entry is not None:
+        return _cached_response(request, entry)
+    return _store_response(request, cache, key, await next(request))
+
+
+
+async_equivalents: dict[Callable, Callable] = {
+    response_cachev1_1: async_response_cachev1_1
+}
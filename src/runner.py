@@ -0,0 +1,285 @@
+from typing import Any
+from argparse import ArgumentParser, Namespace
+from importlib import import_module
+from os import WNOHANG, _exit, cpu_count, fork, getcwd, getpid, kill, sysconf, waitpid, waitstatus_to_exitcode
+from signal import SIGINT, SIGKILL, SIGTERM, signal
+from socket import AF_INET, AF_INET6, SOCK_STREAM, SOL_SOCKET, SO_REUSEADDR, socket
+from sys import path as sys_path, stderr
+from time import monotonic, sleep
+from traceback import print_exc
+import gc
+
+from chains.src.public_interface import WSGIAppV1_1
+from chains.src.server import HTTPServerV1_1, SO_REUSEPORT
+from chains.src.exceptions import InvalidSettingsException
+
+
+
+class WorkerMemory:
+
+    __slots__ = ("pid", "rss", "shared")
+
+    def __init__(self, pid: int, rss: int, shared: int) -> None:
+        self.pid: int = pid
+        # Both in bytes, shared counts the pages that are also mapped by another process
+        self.rss: int = rss
+        self.shared: int = shared
+
+    @property
+    def shared_ratio(self) -> float:
+        return self.shared / self.rss if self.rss > 0 else 0.0
+
+    def __str__(self) -> str:
+        return f"worker {self.pid}: rss {self.rss / 1048576:.1f} MiB, shared {self.shared / 1048576:.1f} MiB ({self.shared_ratio:.0%})"
+
+def worker_memory(pid: int) -> WorkerMemory|None:
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as smaps_rollup:
+            fields: dict[str, int] = dict()
+            for line in smaps_rollup:
+                name, _, value = line.partition(":")
+                if value.strip().endswith("kB"):
+                    fields[name] = int(value.split()[0]) * 1024
+        return WorkerMemory(
+            pid=pid,
+            rss=fields.get("Rss", 0),
+            shared=fields.get("Shared_Clean", 0) + fields.get("Shared_Dirty", 0)
+        )
+    except (OSError, ValueError):
+        pass
+    try:
+        # Older kernels only count the shared pages that are backed by files here
+        with open(f"/proc/{pid}/statm") as statm:
+            _, resident, shared, *_ = statm.read().split()
+        page_size: int = sysconf("SC_PAGE_SIZE")
+        return WorkerMemory(
+            pid=pid,
+            rss=int(resident) * page_size,
+            shared=int(shared) * page_size
+        )
+    except (OSError, ValueError):
+        return None
+
+
+
+class PreforkRunnerV1_1:
+
+    def __init__(
+        self,
+        app: WSGIAppV1_1,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        workers: int|None = None,
+        backlog: int = 2048,
+        threads: int = 16,
+        gc_freeze: bool = True,
+        route_cache_size: int|None = None,
+        memory_report_interval: float|None = None,
+        restart_delay: float = 1.0,
+        graceful_timeout: float = 10.0
+    ) -> None:
+        workers = workers if workers is not None else cpu_count() or 1
+        if workers < 1:
+            raise InvalidSettingsException("The runner needs at least one worker")
+        self._app: WSGIAppV1_1 = app
+        self._host: str = host
+        self._port: int = port
+        self._workers: int = workers
+        self._backlog: int = backlog
+        self._threads: int = threads
+        self._gc_freeze: bool = gc_freeze
+        self._route_cache_size: int|None = route_cache_size
+        self._memory_report_interval: float|None = memory_report_interval
+        self._restart_delay: float = restart_delay
+        self._graceful_timeout: float = graceful_timeout
+        self._listener: socket|None = None
+        # Maps the pid of a worker to the time it was started at
+        self._worker_pids: dict[int, float] = dict()
+        self._running: bool = False
+        self._restarts: int = 0
+
+    @property
+    def worker_pids(self) -> tuple[int, ...]:
+        return tuple(self._worker_pids)
+
+    @property
+    def restarts(self) -> int:
+        return self._restarts
+
+    def memory_report(self) -> list[WorkerMemory]:
+        return [
+            memory for memory in (worker_memory(pid) for pid in self._worker_pids)
+            if memory is not None
+        ]
+
+    def run(self) -> None:
+        # Everything the workers need is built before they're forked so its pages are shared
+        self._app.freeze(
+            route_cache_size=self._route_cache_size
+        )
+        if SO_REUSEPORT is None:
+            # Workers share a socket bound by the runner where the kernel can't balance connections between them
+            self._listener = socket(AF_INET6 if ":" in self._host else AF_INET, SOCK_STREAM)
+            self._listener.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
+            self._listener.bind((self._host, self._port))
+            self._listener.listen(self._backlog)
+        gc.collect()
+        if self._gc_freeze:
+            # Keeps the collector of the workers from writing to the pages of the objects they share
+            gc.freeze()
+        self._running = True
+        previous_handlers: list[Any] = [signal(signalnum, self.__stop) for signalnum in (SIGTERM, SIGINT)]
+        print(f"[chains] Listening on {self._host}:{self._port} with {self._workers} workers, runner pid {getpid()}", file=stderr)
+        next_spawn_at: float = 0.0
+        next_report_at: float = monotonic() + (self._memory_report_interval or 0.0)
+        try:
+            while self._running:
+                now: float = monotonic()
+                if self.__reap(now):
+                    next_spawn_at = now + self._restart_delay
+                while len(self._worker_pids) < self._workers and now >= next_spawn_at and self._running:
+                    self.__spawn()
+                if self._memory_report_interval is not None and now >= next_report_at:
+                    next_report_at = now + self._memory_report_interval
+                    for memory in self.memory_report():
+                        print(f"[chains] {memory}", file=stderr)
+                sleep(0.1)
+        finally:
+            self.__shutdown()
+            for signalnum, previous_handler in zip((SIGTERM, SIGINT), previous_handlers):
+                signal(signalnum, previous_handler)
+            if self._gc_freeze:
+                gc.unfreeze()
+        return None
+
+    def __stop(self, signalnum: int, frame: Any) -> None:
+        self._running = False
+        return None
+
+    def __spawn(self) -> None:
+        pid: int = fork()
+        if pid == 0:
+            exit_code: int = 1
+            try:
+                self.__work()
+                exit_code = 0
+            except BaseException:
+                print_exc()
+            finally:
+                # The runner's cleanup must not run in the workers
+                _exit(exit_code)
+        self._worker_pids[pid] = monotonic()
+        return None
+
+    def __reap(self, now: float) -> bool:
+        # Returns whether a worker that had only just been started exited
+        crashed_early: bool = False
+        while len(self._worker_pids) > 0:
+            try:
+                pid, status = waitpid(-1, WNOHANG)
+            except ChildProcessError:
+                break
+            if pid == 0:
+                break
+            started_at: float|None = self._worker_pids.pop(pid, None)
+            if started_at is None or not self._running:
+                continue
+            self._restarts += 1
+            print(f"[chains] Worker {pid} exited with code {waitstatus_to_exitcode(status)}, restarting it", file=stderr)
+            if now - started_at < self._restart_delay:
+                crashed_early = True
+        return crashed_early
+
+    def __work(self) -> None:
+        server: HTTPServerV1_1 = HTTPServerV1_1(
+            app=self._app,
+            host=self._host,
+            port=self._port,
+            threads=self._threads,
+            backlog=self._backlog,
+            reuse_port=self._listener is None,
+            listener=self._listener
+        )
+        def stop(signalnum: int, frame: Any) -> None:
+            server.shutdown()
+        signal(SIGTERM, stop)
+        signal(SIGINT, stop)
+        try:
+            server.serve_forever()
+        finally:
+            self._app.background_tasks.shutdown()
+        return None
+
+    def __shutdown(self) -> None:
+        self._running = False
+        for pid in self._worker_pids:
+            try:
+                kill(pid, SIGTERM)
+            except ProcessLookupError:
+                pass
+        deadline: float = monotonic() + self._graceful_timeout
+        while len(self._worker_pids) > 0 and monotonic() < deadline:
+            self.__reap(monotonic())
+            sleep(0.05)
+        for pid in self._worker_pids:
+            try:
+                kill(pid, SIGKILL)
+                waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+        self._worker_pids.clear()
+        if self._listener is not None:
+            self._listener.close()
+            self._listener = None
+        return None
+
+    def __str__(self) -> str:
+        return f"PreforkRunnerV1_1(workers={self._workers}, running={len(self._worker_pids)}, restarts={self._restarts})"
+
+
+
+def load_app(app_path: str) -> WSGIAppV1_1:
+    module_name, _, attribute = app_path.partition(":")
+    # Apps are imported the same way they would be by `python -c` from the current directory
+    if getcwd() not in sys_path:
+        sys_path.insert(0, getcwd())
+    app: Any = getattr(import_module(module_name), attribute or "app")
+    if not isinstance(app, WSGIAppV1_1):
+        raise InvalidSettingsException(f"{app_path} is not a WSGI Chains application, ASGI applications need an ASGI server")
+    return app
+
+def main(argv: list[str]|None = None) -> None:
+    parser: ArgumentParser = ArgumentParser(
+        prog="python -m chains",
+        description="Runs a Chains WSGI application on a number of forked worker processes"
+    )
+    parser.add_argument("app", help="the application to run as module:attribute, the attribute defaults to app")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None, help="defaults to the number of CPUs")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--threads", type=int, default=16, help="request handling threads of every worker")
+    parser.add_argument("--no-gc-freeze", dest="gc_freeze", action="store_false")
+    parser.add_argument("--route-cache-size", type=int, default=None)
+    parser.add_argument("--memory-report-interval", type=float, default=None, metavar="SECONDS")
+    arguments: Namespace = parser.parse_args(argv)
+    try:
+        app: WSGIAppV1_1 = load_app(arguments.app)
+    except (ImportError, AttributeError, ValueError) as exception:
+        parser.error(str(exception))
+    PreforkRunnerV1_1(
+        app=app,
+        host=arguments.host,
+        port=arguments.port,
+        workers=arguments.workers,
+        backlog=arguments.backlog,
+        threads=arguments.threads,
+        gc_freeze=arguments.gc_freeze,
+        route_cache_size=arguments.route_cache_size,
+        memory_report_interval=arguments.memory_report_interval
+    ).run()
+    return None
+
+
+
+PreforkRunner = PreforkRunnerV1_1
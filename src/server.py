@@ -0,0 +1,728 @@
+from typing import Any, Callable, IO, Iterable
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from functools import partial
+from selectors import DefaultSelector, EVENT_READ
+from socket import AF_INET, AF_INET6, IPPROTO_TCP, SOL_SOCKET, SO_REUSEADDR, TCP_NODELAY, socket, socketpair
+from threading import Lock
+from time import monotonic, time
+from traceback import print_exc
+from urllib.parse import unquote
+
+try:
+    from socket import SO_REUSEPORT
+except ImportError:
+    SO_REUSEPORT = None
+
+from chains.src.request import RequestV1_1, BackgroundTask
+from chains.src.response import IResponse, ResponseBody
+from chains.src.header import EnvironHeadersV1_1
+from chains.src.streams import RequestStreamV1_1
+from chains.src.exceptions import BadRequestException, InvalidSettingsException, UnsupportedPlatformException
+from chains.src.error_responses import bad_request_response
+from chains.src.public_interface import WSGIAppV1_1
+from chains.src.pool import PooledRequestV1_1
+
+
+
+# Header names that are stored without the HTTP_ prefix, the same as in a WSGI environ
+UNPREFIXED_HEADER_KEYS: frozenset[str] = frozenset(("CONTENT_TYPE", "CONTENT_LENGTH"))
+
+# Responses to these never have a body
+BODYLESS_STATUS_CODES: frozenset[int] = frozenset((204, 304))
+
+# Unread request bodies up to this size are read and thrown away so the connection can be kept alive
+MAX_DRAIN_SIZE: int = 64*1024
+
+MAX_LINE_SIZE: int = 8*1024
+
+# The second and the Date header value of it
+_date: list[Any] = [0, ""]
+
+def http_date() -> str:
+    # Formatted at most once a second
+    now: int = int(time())
+    if _date[0] != now:
+        _date[1] = formatdate(now, usegmt=True)
+        _date[0] = now
+    return _date[1]
+
+
+
+class Connection:
+
+    __slots__ = ("socket", "remote_address", "buffer", "last_active")
+
+    def __init__(self, socket: socket, remote_address: str|None) -> None:
+        self.socket: socket = socket
+        self.remote_address: str|None = remote_address
+        # Bytes received from the client that haven't been parsed yet
+        self.buffer: bytearray = bytearray()
+        self.last_active: float = monotonic()
+
+    def fileno(self) -> int:
+        return self.socket.fileno()
+
+    def has_head(self) -> bool:
+        # Empty lines before a request line are allowed and skipped
+        while self.buffer[:2] == b"\r\n":
+            del self.buffer[:2]
+        return b"\r\n\r\n" in self.buffer
+
+    def pop_head(self) -> bytes:
+        end: int = self.buffer.find(b"\r\n\r\n")
+        head: bytes = bytes(self.buffer[:end])
+        del self.buffer[:end + 4]
+        return head
+
+    def read(self, size: int = -1) -> bytes:
+        if len(self.buffer) > 0:
+            if size < 0 or size >= len(self.buffer):
+                data: bytes = bytes(self.buffer)
+                self.buffer.clear()
+                return data
+            data = bytes(self.buffer[:size])
+            del self.buffer[:size]
+            return data
+        return self.socket.recv(size if size >= 0 else 64*1024)
+
+    def readline(self, limit: int = -1) -> bytes:
+        while True:
+            end: int = self.buffer.find(b"\n")
+            if end >= 0 and (limit < 0 or end < limit):
+                return self.read(end + 1)
+            if limit >= 0 and len(self.buffer) >= limit:
+                return self.read(limit)
+            chunk: bytes = self.socket.recv(64*1024)
+            if len(chunk) < 1:
+                return self.read()
+            self.buffer += chunk
+
+    def close(self) -> None:
+        try:
+            self.socket.close()
+        except OSError:
+            pass
+        return None
+
+class BodyReader:
+
+    __slots__ = ("_connection", "_remaining", "_interim_response")
+
+    def __init__(self, connection: Connection, content_length: int, interim_response: bytes|None = None) -> None:
+        self._connection: Connection = connection
+        self._remaining: int = content_length
+        # Sent before the body is read for clients that wait for a 100 Continue
+        self._interim_response: bytes|None = interim_response
+
+    @property
+    def done(self) -> bool:
+        return self._remaining < 1
+
+    @property
+    def awaiting_continue(self) -> bool:
+        return self._interim_response is not None and not self.done
+
+    @property
+    def malformed(self) -> bool:
+        return False
+
+    def _continue(self) -> None:
+        if self._interim_response is not None:
+            self._connection.socket.sendall(self._interim_response)
+            self._interim_response = None
+        return None
+
+    def read(self, size: int = -1) -> bytes:
+        if self._remaining < 1:
+            return b""
+        self._continue()
+        data: bytes = self._connection.read(self._remaining if size < 0 else min(size, self._remaining))
+        if len(data) < 1:
+            # The client went away before sending the whole body
+            self._remaining = 0
+        self._remaining -= len(data)
+        return data
+
+    def readline(self, limit: int = -1) -> bytes:
+        if self._remaining < 1:
+            return b""
+        self._continue()
+        line: bytes = self._connection.readline(self._remaining if limit < 0 else min(limit, self._remaining))
+        if len(line) < 1:
+            self._remaining = 0
+        self._remaining -= len(line)
+        return line
+
+    def drain(self, max_size: int) -> bool:
+        # Returns whether the rest of the body was read and the connection can be reused
+        if self.done:
+            return True
+        if self.awaiting_continue or self._remaining > max_size:
+            return False
+        while not self.done:
+            if len(self.read(64*1024)) < 1:
+                return False
+        return True
+
+class ChunkedBodyReader(BodyReader):
+
+    __slots__ = ("_finished", "_malformed")
+
+    def __init__(self, connection: Connection, interim_response: bytes|None = None) -> None:
+        super().__init__(
+            connection=connection,
+            content_length=0,
+            interim_response=interim_response
+        )
+        self._finished: bool = False
+        # The rest of the connection can't be parsed after a malformed chunk
+        self._malformed: bool = False
+
+    @property
+    def done(self) -> bool:
+        return self._finished
+
+    @property
+    def malformed(self) -> bool:
+        return self._malformed
+
+    def __malformed(self, reason: str) -> BadRequestException:
+        self._finished = True
+        self._malformed = True
+        return BadRequestException(reason)
+
+    def __line(self) -> bytes:
+        line: bytes = self._connection.readline(MAX_LINE_SIZE)
+        if not line.endswith(b"\n"):
+            raise self.__malformed("The chunked request body ended unexpectedly")
+        return line
+
+    def __next_chunk(self) -> None:
+        size: bytes = self.__line().split(b";", 1)[0].strip()
+        if len(size) < 1 or len(size.strip(b"0123456789abcdefABCDEF")) > 0:
+            raise self.__malformed("Malformed chunk size in the chunked request body")
+        self._remaining = int(size, 16)
+        if self._remaining == 0:
+            # Trailers aren't made available to the application
+            while self.__line() not in (b"\r\n", b"\n"):
+                pass
+            self._finished = True
+        return None
+
+    def __end_chunk(self) -> None:
+        if self._remaining == 0 and self.__line() not in (b"\r\n", b"\n"):
+            raise self.__malformed("Malformed chunk in the chunked request body")
+        return None
+
+    def read(self, size: int = -1) -> bytes:
+        if self._finished:
+            return b""
+        self._continue()
+        if self._remaining == 0:
+            self.__next_chunk()
+            if self._finished:
+                return b""
+        data: bytes = self._connection.read(self._remaining if size < 0 else min(size, self._remaining))
+        if len(data) < 1:
+            self._finished = True
+            return b""
+        self._remaining -= len(data)
+        self.__end_chunk()
+        return data
+
+    def readline(self, limit: int = -1) -> bytes:
+        if self._finished:
+            return b""
+        self._continue()
+        if self._remaining == 0:
+            self.__next_chunk()
+            if self._finished:
+                return b""
+        line: bytes = self._connection.readline(self._remaining if limit < 0 else min(limit, self._remaining))
+        if len(line) < 1:
+            self._finished = True
+            return b""
+        self._remaining -= len(line)
+        self.__end_chunk()
+        return line
+
+    def drain(self, max_size: int) -> bool:
+        if self._finished:
+            return not self._malformed
+        if self.awaiting_continue:
+            return False
+        drained: int = 0
+        while not self._finished:
+            drained += len(self.read(64*1024))
+            if drained > max_size:
+                return False
+        return True
+
+
+
+def parse_head(head: bytes) -> tuple[str, str, str, str, dict[str, str]]:
+    # Returns the method, path, query string, version and the headers of a request,
+    # keyed the same way as in a WSGI environ
+    lines: list[str] = head.decode("latin-1").split("\r\n")
+    request_line: list[str] = lines[0].split(" ")
+    if len(request_line) != 3:
+        raise BadRequestException("Malformed request line")
+    method, target, version = request_line
+    if version != "HTTP/1.1" and version != "HTTP/1.0":
+        if not version.startswith("HTTP/"):
+            raise BadRequestException("Malformed request line")
+        raise BadRequestException(f"{version} isn't supported", status_code=505, status_text="HTTP VERSION NOT SUPPORTED")
+    if len(method) < 1 or not method.isascii() or not method.isprintable():
+        raise BadRequestException("Malformed request method")
+    if target.startswith(("http://", "https://")):
+        # The absolute form that's sent to proxies
+        target = "/" + target.partition("://")[2].partition("/")[2]
+    elif not target.startswith("/") and target != "*":
+        raise BadRequestException("Malformed request target")
+    path, _, query_string = target.partition("?")
+    headers: dict[str, str] = dict()
+    for line in lines[1:]:
+        if line[:1] in (" ", "\t"):
+            raise BadRequestException("Header values folded over multiple lines aren't supported")
+        name, separator, value = line.partition(":")
+        if len(separator) < 1 or len(name) < 1 or " " in name or "\t" in name:
+            raise BadRequestException("Malformed header")
+        if "_" in name:
+            # Dropped since they would be indistinguishable from the header with dashes
+            continue
+        key: str = name.upper().replace("-", "_")
+        if key not in UNPREFIXED_HEADER_KEYS:
+            key = f"HTTP_{key}"
+        value = value.strip(" \t")
+        existing_value: str|None = headers.get(key)
+        if existing_value is None:
+            headers[key] = value
+        elif key == "CONTENT_LENGTH":
+            if existing_value != value:
+                raise BadRequestException("Conflicting Content-Length headers")
+        else:
+            headers[key] = f"{existing_value}{'; ' if key == 'HTTP_COOKIE' else ', '}{value}"
+    return (method, unquote(path, "latin-1"), query_string, version, headers)
+
+
+
+class HTTPServerV1_1:
+
+    def __init__(
+        self,
+        app: WSGIAppV1_1,
+        host: str = "127.0.0.1",
+        port: int = 8000,
+        threads: int = 16,
+        backlog: int = 2048,
+        keep_alive_timeout: float = 5.0,
+        timeout: float = 30.0,
+        max_header_size: int = 64*1024,
+        reuse_port: bool = False,
+        listener: socket|None = None
+    ) -> None:
+        if threads < 1:
+            raise InvalidSettingsException("The server needs at least one thread")
+        if reuse_port and SO_REUSEPORT is None:
+            raise UnsupportedPlatformException("SO_REUSEPORT isn't available on this platform")
+        self._app: WSGIAppV1_1 = app
+        self._keep_alive_timeout: float = keep_alive_timeout
+        self._timeout: float = timeout
+        self._max_header_size: int = max_header_size
+        if listener is None:
+            listener = socket(AF_INET6 if ":" in host else AF_INET)
+            listener.setsockopt(SOL_SOCKET, SO_REUSEADDR, 1)
+            if reuse_port:
+                listener.setsockopt(SOL_SOCKET, SO_REUSEPORT, 1)
+            listener.bind((host, port))
+            listener.listen(backlog)
+        listener.setblocking(False)
+        self._listener: socket = listener
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=threads,
+            thread_name_prefix="chains-server"
+        )
+        # Connections handed back by the worker threads once they're done with a request
+        self._returned_connections: deque[Connection] = deque()
+        self._wakeup_reader, self._wakeup_writer = socketpair()
+        self._wakeup_reader.setblocking(False)
+        self._wakeup_writer.setblocking(False)
+        self._idle_connections: dict[int, Connection] = dict()
+        self._busy_connections: set[Connection] = set()
+        self._lock: Lock = Lock()
+        self._running: bool = False
+        self._requests: int = 0
+
+    @property
+    def server_address(self) -> tuple[str, int]:
+        return self._listener.getsockname()[:2]
+
+    @property
+    def requests(self) -> int:
+        return self._requests
+
+    @property
+    def connections(self) -> int:
+        return len(self._idle_connections) + len(self._busy_connections)
+
+    def serve_forever(self) -> None:
+        self._app.freeze()
+        self._running = True
+        selector: DefaultSelector = DefaultSelector()
+        selector.register(self._listener, EVENT_READ)
+        selector.register(self._wakeup_reader, EVENT_READ)
+        next_sweep_at: float = monotonic() + 1.0
+        try:
+            while self._running:
+                for key, _ in selector.select(timeout=1.0):
+                    if key.fileobj is self._listener:
+                        self.__accept(selector)
+                    elif key.fileobj is self._wakeup_reader:
+                        self.__take_back(selector)
+                    else:
+                        self.__receive(selector, key.fileobj)
+                now: float = monotonic()
+                if now >= next_sweep_at:
+                    next_sweep_at = now + 1.0
+                    self.__close_idle_connections(selector, now)
+        finally:
+            selector.close()
+            for connection in self._idle_connections.values():
+                connection.close()
+            self._idle_connections.clear()
+            self._executor.shutdown(wait=True)
+            self._listener.close()
+            self._wakeup_reader.close()
+            self._wakeup_writer.close()
+        return None
+
+    def shutdown(self) -> None:
+        # Can be called from other threads and signal handlers, requests that are being handled are finished
+        self._running = False
+        self.__wake_up()
+        return None
+
+    def __wake_up(self) -> None:
+        try:
+            self._wakeup_writer.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass
+        return None
+
+    def __accept(self, selector: DefaultSelector) -> None:
+        for _ in range(64):
+            try:
+                client_socket, address = self._listener.accept()
+            except (BlockingIOError, InterruptedError):
+                return None
+            except OSError:
+                # Out of file descriptors or the client went away, the next event retries
+                return None
+            client_socket.setblocking(False)
+            if client_socket.family in (AF_INET, AF_INET6):
+                client_socket.setsockopt(IPPROTO_TCP, TCP_NODELAY, 1)
+            connection: Connection = Connection(
+                socket=client_socket,
+                remote_address=address[0] if isinstance(address, tuple) else None
+            )
+            self._idle_connections[client_socket.fileno()] = connection
+            selector.register(connection, EVENT_READ)
+        return None
+
+    def __take_back(self, selector: DefaultSelector) -> None:
+        try:
+            while len(self._wakeup_reader.recv(4096)) > 0:
+                pass
+        except (BlockingIOError, InterruptedError):
+            pass
+        while len(self._returned_connections) > 0:
+            connection: Connection = self._returned_connections.popleft()
+            with self._lock:
+                self._busy_connections.discard(connection)
+            if not self._running:
+                connection.close()
+                continue
+            connection.socket.setblocking(False)
+            connection.last_active = monotonic()
+            self._idle_connections[connection.fileno()] = connection
+            selector.register(connection, EVENT_READ)
+        return None
+
+    def __receive(self, selector: DefaultSelector, connection: Connection) -> None:
+        try:
+            data: bytes = connection.socket.recv(64*1024)
+        except (BlockingIOError, InterruptedError):
+            return None
+        except OSError:
+            data = b""
+        if len(data) < 1:
+            self.__forget(selector, connection)
+            connection.close()
+            return None
+        connection.buffer += data
+        connection.last_active = monotonic()
+        if connection.has_head():
+            self.__forget(selector, connection)
+            with self._lock:
+                self._busy_connections.add(connection)
+            self._executor.submit(self.__serve, connection)
+        elif len(connection.buffer) > self._max_header_size:
+            self.__forget(selector, connection)
+            self.__send_error(connection, BadRequestException(
+                "The request headers are too large", status_code=431, status_text="REQUEST HEADER FIELDS TOO LARGE"
+            ))
+            connection.close()
+        return None
+
+    def __forget(self, selector: DefaultSelector, connection: Connection) -> None:
+        selector.unregister(connection)
+        self._idle_connections.pop(connection.fileno(), None)
+        return None
+
+    def __close_idle_connections(self, selector: DefaultSelector, now: float) -> None:
+        expired: list[Connection] = [
+            connection for connection in self._idle_connections.values()
+            if now - connection.last_active > self._keep_alive_timeout
+        ]
+        for connection in expired:
+            self.__forget(selector, connection)
+            connection.close()
+        return None
+
+    def __serve(self, connection: Connection) -> None:
+        # Runs on a worker thread, which has the connection to itself until the selector gets it back
+        keep_alive: bool = False
+        try:
+            connection.socket.settimeout(self._timeout)
+            keep_alive = True
+            while keep_alive and self._running:
+                keep_alive = self.__handle(connection)
+                if not connection.has_head():
+                    break
+        except BadRequestException as exception:
+            keep_alive = False
+            self.__send_error(connection, exception)
+        except OSError:
+            # The client went away or timed out
+            keep_alive = False
+        except Exception:
+            keep_alive = False
+            print_exc()
+        if keep_alive and self._running:
+            self._returned_connections.append(connection)
+            self.__wake_up()
+            return None
+        with self._lock:
+            self._busy_connections.discard(connection)
+        connection.close()
+        return None
+
+    def __send_error(self, connection: Connection, exception: BadRequestException) -> None:
+        response: IResponse = bad_request_response(exception)
+        try:
+            # The rest of a malformed request can't be found, so the connection is closed after it
+            connection.socket.sendall(self.__head(
+                response=response,
+                headers=response.headers.header_list() + [("Connection", "close")]
+            ))
+            connection.socket.sendall(response.body)
+        except OSError:
+            pass
+        return None
+
+    def __head(self, response: IResponse, headers: Iterable[tuple[str, str]]) -> bytes:
+        lines: list[str] = [f"HTTP/1.1 {response.status_code} {response.status_text}\r\n"]
+        for header_name, header_value in headers:
+            lines.append(f"{header_name}: {header_value}\r\n")
+        lines.append("\r\n")
+        return "".join(lines).encode("latin-1")
+
+    def __handle(self, connection: Connection) -> bool:
+        # Returns whether the connection can be kept alive for another request
+        head: bytes = connection.pop_head()
+        if len(head) > self._max_header_size:
+            raise BadRequestException(
+                "The request headers are too large", status_code=431, status_text="REQUEST HEADER FIELDS TOO LARGE"
+            )
+        method, path, query_string, version, headers = parse_head(head)
+        with self._lock:
+            self._requests += 1
+        connection_header: str = headers.get("HTTP_CONNECTION", "").lower()
+        keep_alive: bool = "close" not in connection_header if version == "HTTP/1.1" else "keep-alive" in connection_header
+        interim_response: bytes|None = None
+        if headers.get("HTTP_EXPECT", "").lower() == "100-continue" and version == "HTTP/1.1":
+            interim_response = b"HTTP/1.1 100 Continue\r\n\r\n"
+        transfer_encoding: str|None = headers.get("HTTP_TRANSFER_ENCODING")
+        if transfer_encoding is not None:
+            if "CONTENT_LENGTH" in headers:
+                raise BadRequestException("Requests can't have both a Transfer-Encoding and a Content-Length")
+            if transfer_encoding.lower() != "chunked":
+                raise BadRequestException(
+                    f"The {transfer_encoding} transfer encoding isn't supported", status_code=501, status_text="NOT IMPLEMENTED"
+                )
+            content_length: int|None = None
+            body_reader: BodyReader = ChunkedBodyReader(
+                connection=connection,
+                interim_response=interim_response
+            )
+        else:
+            content_length_header: str = headers.get("CONTENT_LENGTH", "")
+            # str.isdigit() is true for digits int() doesn't parse, like '²'
+            if len(content_length_header) > 0 and not (content_length_header.isascii() and content_length_header.isdigit()):
+                raise BadRequestException("Malformed Content-Length")
+            content_length = int(content_length_header) if len(content_length_header) > 0 else 0
+            body_reader = BodyReader(
+                connection=connection,
+                content_length=content_length,
+                interim_response=interim_response
+            )
+
+        app: WSGIAppV1_1 = self._app
+        if app.max_body_size is not None and content_length is not None and content_length > app.max_body_size:
+            response: IResponse = app._payload_too_large(
+                max_body_size=app.max_body_size
+            )
+            self.__send(connection, method, version, response, False)
+            return False
+        request_stream: RequestStreamV1_1 = RequestStreamV1_1(
+            input=body_reader,
+            content_length=content_length,
+            max_body_size=app.max_body_size,
+            chunk_size=app.body_chunk_size,
+            spool_threshold=app.body_spool_threshold
+        )
+        if app.request_pool is not None:
+            request: PooledRequestV1_1 = app.request_pool.acquire(
+                method=method,
+                path=path,
+                stream=request_stream,
+                environ=headers,
+                query_string=query_string,
+                remote_address=connection.remote_address
+            )
+            on_close: list[Callable[[], Any]] = [request.release]
+        else:
+            request = RequestV1_1(
+                method=method,
+                path=path,
+                stream=request_stream,
+                headers=EnvironHeadersV1_1(
+                    environ=headers
+                ),
+                query_string=query_string,
+                remote_address=connection.remote_address
+            )
+            on_close = [request_stream.close]
+        try:
+            response = app.handle_request(
+                request=request
+            )
+            background_tasks: tuple[BackgroundTask, ...] = request.background_tasks
+            if len(background_tasks) > 0:
+                on_close.append(partial(app.background_tasks.schedule, background_tasks))
+            # Applications don't set hop-by-hop headers, the connection is closed here when the rest
+            # of the request can't be read, such as after a malformed chunk or a body that's too large
+            if body_reader.malformed or (response.status_code == 413 and not body_reader.done):
+                keep_alive = False
+            keep_alive = self.__send(connection, method, version, response, keep_alive)
+        finally:
+            for callback in on_close:
+                callback()
+        if not keep_alive:
+            return False
+        try:
+            return body_reader.drain(MAX_DRAIN_SIZE)
+        except BadRequestException:
+            # The response was already sent
+            return False
+
+    def __send(self, connection: Connection, method: str, version: str, response: IResponse, keep_alive: bool) -> bool:
+        body: ResponseBody|None = response.body
+        if body is not None and hasattr(body, "read"):
+            self._app._set_file_content_length(
+                response=response
+            )
+        headers: list[tuple[str, str]] = list(response.headers.header_list())
+        content_length: int|None = None
+        has_connection: bool = False
+        has_date: bool = False
+        for header_name, header_value in headers:
+            lowered_name: str = header_name.lower()
+            if lowered_name == "content-length":
+                content_length = int(header_value)
+            elif lowered_name == "connection":
+                has_connection = True
+                if "close" in header_value.lower():
+                    keep_alive = False
+            elif lowered_name == "date":
+                has_date = True
+        if not has_date:
+            headers.append(("Date", http_date()))
+        has_body: bool = response.status_code >= 200 and response.status_code not in BODYLESS_STATUS_CODES
+        send_body: bool = has_body and method != "HEAD"
+        in_memory: bool = body is None or isinstance(body, (bytes, bytearray, memoryview))
+        chunked: bool = False
+        if in_memory:
+            if content_length is None and has_body:
+                headers.append(("Content-Length", str(len(body) if body is not None else 0)))
+        elif content_length is None and send_body:
+            if version == "HTTP/1.1":
+                headers.append(("Transfer-Encoding", "chunked"))
+                chunked = True
+            else:
+                # Without a length or chunks the end of the body is marked by closing the connection
+                keep_alive = False
+        if not has_connection:
+            if not keep_alive and version == "HTTP/1.1":
+                headers.append(("Connection", "close"))
+            elif keep_alive and version == "HTTP/1.0":
+                headers.append(("Connection", "keep-alive"))
+        head: bytes = self.__head(
+            response=response,
+            headers=headers
+        )
+        client_socket: socket = connection.socket
+        if in_memory:
+            client_socket.sendall(head + body if send_body and body is not None else head)
+            return keep_alive
+        try:
+            client_socket.sendall(head)
+            if send_body:
+                self.__send_stream(client_socket, body, content_length, chunked)
+        finally:
+            if hasattr(body, "close"):
+                body.close()
+        return keep_alive
+
+    def __send_stream(self, client_socket: socket, body: IO[bytes]|Iterable[bytes], content_length: int|None, chunked: bool) -> None:
+        if content_length is not None and hasattr(body, "fileno"):
+            try:
+                body.fileno()
+            except OSError:
+                pass
+            else:
+                # Copied from the file to the socket by the kernel
+                client_socket.sendfile(body, offset=body.tell(), count=content_length)
+                return None
+        chunk_size: int = self._app.body_chunk_size
+        chunks: Iterable[bytes] = iter(partial(body.read, chunk_size), b"") if hasattr(body, "read") else body
+        for chunk in chunks:
+            if len(chunk) < 1:
+                continue
+            if chunked:
+                client_socket.sendall(b"%x\r\n%b\r\n" % (len(chunk), chunk))
+            else:
+                client_socket.sendall(chunk)
+        if chunked:
+            client_socket.sendall(b"0\r\n\r\n")
+        return None
+
+    def __str__(self) -> str:
+        host, port = self.server_address
+        return f"HTTPServerV1_1(address={host}:{port}, connections={self.connections}, requests={self._requests})"
+
+
+
+HTTPServer = HTTPServerV1_1
@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Awaitable, Callable, Hashable, Iterable
+from threading import Event, Lock
+
+from chains.src.request import IRequest
+from chains.src.response import IResponse, ResponseV1_1
+from chains.src.exceptions import InvalidSettingsException
+
+# asyncio is only imported by applications that wait for flights asynchronously
+if TYPE_CHECKING:
+    from asyncio import Event as AsyncEvent
+
+
+
+class SharedResponse:
+
+    __slots__ = ("status_code", "status_text", "headers", "multi_value_names", "body")
+
+    def __init__(self, status_code: int, status_text: str, headers: tuple[tuple[str, str], ...], body: bytes|None) -> None:
+        self.status_code: int = status_code
+        self.status_text: str = status_text
+        self.headers: tuple[tuple[str, str], ...] = headers
+        header_names: list[str] = [name.lower() for name, _ in headers]
+        self.multi_value_names: frozenset[str] = frozenset(name for name in header_names if header_names.count(name) > 1)
+        self.body: bytes|None = body
+
+    def response(self) -> ResponseV1_1:
+        # Every waiter gets a response of its own, so middleware can change it freely
+        response: ResponseV1_1 = ResponseV1_1(
+            status_code=self.status_code,
+            status_text=self.status_text
+        )
+        if self.body is not None:
+            response.body = self.body
+        for header_name, header_value in self.headers:
+            if header_name.lower() in self.multi_value_names:
+                response.headers.add_multi_value_header(
+                    name=header_name, value=header_value
+                )
+            else:
+                response.headers.set_single_value_header(
+                    name=header_name, value=header_value
+                )
+        return response
+
+class Flight:
+
+    __slots__ = ("event", "shared_response")
+
+    def __init__(self, event: Event|AsyncEvent) -> None:
+        self.event: Event|AsyncEvent = event
+        # Left as None when the response of the first request can't be shared
+        self.shared_response: SharedResponse|None = None
+
+class SingleFlightV1_1:
+
+    def __init__(
+        self,
+        vary: Iterable[str] = (),
+        methods: Iterable[str] = ("GET", "HEAD"),
+        timeout: float = 10.0
+    ) -> None:
+        if timeout <= 0:
+            raise InvalidSettingsException("The timeout has to be greater than 0 seconds")
+        self._vary: tuple[str, ...] = tuple(vary)
+        # Requests with cookies usually get a response of their own, they're only coalesced
+        # when the cookies are part of the key
+        self._vary_cookies: bool = any(name.lower() == "cookie" for name in self._vary)
+        self._methods: frozenset[str] = frozenset(methods)
+        self._timeout: float = timeout
+        self._flights: dict[Hashable, Flight] = dict()
+        # Flights of the ASGI application, which are only ever touched by its event loop
+        self._async_flights: dict[Hashable, Flight] = dict()
+        self._lock: Lock = Lock()
+        self._leaders: int = 0
+        self._coalesced: int = 0
+        self._fallbacks: int = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights) + len(self._async_flights)
+
+    @property
+    def leaders(self) -> int:
+        return self._leaders
+
+    @property
+    def coalesced(self) -> int:
+        return self._coalesced
+
+    @property
+    def fallbacks(self) -> int:
+        return self._fallbacks
+
+    def key(self, request: IRequest) -> Hashable|None:
+        if request.method not in self._methods:
+            return None
+        if request.headers.get_single_value_header(name="Authorization") is not None:
+            return None
+        if not self._vary_cookies and request.headers.get_single_value_header(name="Cookie") is not None:
+            return None
+        # The full path, branches with the same relative paths don't share flights
+        return (
+            request.method,
+            request.full_path,
+            request.query_string,
+            *(request.headers.get_single_value_header(name=name) for name in self._vary)
+        )
+
+    def join(self, key: Hashable) -> tuple[Flight, bool]:
+        # Returns the flight of the key and whether the caller is the one that has to handle the request
+        with self._lock:
+            flight: Flight|None = self._flights.get(key)
+            if flight is not None:
+                return (flight, False)
+            flight = Flight(event=Event())
+            self._flights[key] = flight
+            self._leaders += 1
+            return (flight, True)
+
+    def join_async(self, key: Hashable) -> tuple[Flight, bool]:
+        flight: Flight|None = self._async_flights.get(key)
+        if flight is not None:
+            return (flight, False)
+        from asyncio import Event as AsyncEvent
+        flight = Flight(event=AsyncEvent())
+        self._async_flights[key] = flight
+        self._leaders += 1
+        return (flight, True)
+
+    def __share(self, flight: Flight, response: IResponse|None) -> None:
+        if response is None:
+            return None
+        body: bytes|None = response.body
+        if body is not None and not isinstance(body, (bytes, bytearray, memoryview)):
+            # Streamed and file backed bodies can only be read once
+            return None
+        if response.headers.get_single_value_header(name="Set-Cookie") is not None or any(
+            True for _ in response.headers.yield_multi_value_header(name="Set-Cookie")
+        ):
+            return None
+        flight.shared_response = SharedResponse(
+            status_code=response.status_code,
+            status_text=response.status_text,
+            headers=tuple(response.headers.header_list()),
+            body=bytes(body) if body is not None else None
+        )
+        return None
+
+    def land(self, key: Hashable, flight: Flight, response: IResponse|None) -> None:
+        # Called by the first request once it has a response, or None if it failed
+        self.__share(flight, response)
+        with self._lock:
+            self._flights.pop(key, None)
+        flight.event.set()
+        return None
+
+    def land_async(self, key: Hashable, flight: Flight, response: IResponse|None) -> None:
+        self.__share(flight, response)
+        self._async_flights.pop(key, None)
+        flight.event.set()
+        return None
+
+    def __shared_response(self, flight: Flight, landed: bool) -> ResponseV1_1|None:
+        with self._lock:
+            if landed and flight.shared_response is not None:
+                self._coalesced += 1
+                return flight.shared_response.response()
+            self._fallbacks += 1
+        return None
+
+    def wait(self, flight: Flight) -> ResponseV1_1|None:
+        # Returns None when the waiter has to handle the request itself, because the
+        # first request timed out, failed or got a response that can't be shared
+        return self.__shared_response(flight, flight.event.wait(self._timeout))
+
+    async def wait_async(self, flight: Flight) -> ResponseV1_1|None:
+        from asyncio import TimeoutError as AsyncTimeoutError, wait_for
+        try:
+            await wait_for(flight.event.wait(), self._timeout)
+        except AsyncTimeoutError:
+            return self.__shared_response(flight, False)
+        return self.__shared_response(flight, True)
+
+    def __str__(self) -> str:
+        return f"SingleFlightV1_1(in_flight={self.in_flight}, leaders={self._leaders}, coalesced={self._coalesced}, fallbacks={self._fallbacks})"
+
+
+
+def single_flightv1_1(request: IRequest, next: Callable[[IRequest], IResponse], single_flight: SingleFlightV1_1) -> IResponse:
+    key: Hashable|None = single_flight.key(request)
+    if key is None:
+        return next(request)
+    flight, leader = single_flight.join(key)
+    if leader:
+        response: IResponse|None = None
+        try:
+            response = next(request)
+            return response
+        finally:
+            single_flight.land(key, flight, response)
+    shared_response: ResponseV1_1|None = single_flight.wait(flight)
+    if shared_response is not None:
+        return shared_response
+    return next(request)
+
+async def async_single_flightv1_1(request: IRequest, next: Callable[[IRequest], Awaitable[IResponse]], single_flight: SingleFlightV1_1) -> IResponse:
+    key: Hashable|None = single_flight.key(request)
+    if key is None:
+        return await next(request)
+    flight, leader = single_flight.join_async(key)
+    if leader:
+        response: IResponse|None = None
+        try:
+            response = await next(request)
+            return response
+        finally:
+            single_flight.land_async(key, flight, response)
+    shared_response: ResponseV1_1|None = await single_flight.wait_async(flight)
+    if shared_response is not None:
+        return shared_response
+    return await next(request)
+
+
+
+async_equivalents: dict[Callable, Callable] = {
+    single_flightv1_1: async_single_flightv1_1
+}
+
+
+
+SingleFlight = SingleFlightV1_1
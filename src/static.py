@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, IO, Callable, Iterator
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from mimetypes import guess_type
+from mmap import mmap, ACCESS_READ
+from os import fstat, stat_result
+from os.path import isfile, join, realpath, sep
+from threading import Lock
+
+from chains.src.request import IRequest
+from chains.src.response import IResponse, ResponseV1_1, ImmutableResponseV1_1
+from chains.src.handlers import IRouteHandler
+from chains.src.error_responses import NOT_FOUND_RESPONSE, method_not_allowed_response
+from chains.src.public_interface import BranchV1_1
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+
+
+class MappedFileRangeV1_1:
+
+    def __init__(self, file: IO[bytes], start: int, end: int, chunk_size: int) -> None:
+        self._file: IO[bytes] = file
+        self._mmap: mmap = mmap(file.fileno(), 0, access=ACCESS_READ)
+        self._start: int = start
+        self._end: int = end
+        self._chunk_size: int = chunk_size
+
+    def __iter__(self) -> Iterator[bytes]:
+        for offset in range(self._start, self._end, self._chunk_size):
+            yield self._mmap[offset:min(offset + self._chunk_size, self._end)]
+        return None
+
+    def close(self) -> None:
+        self._mmap.close()
+        self._file.close()
+        return None
+
+class StaticFileCache:
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int) -> None:
+        self._max_bytes: int = max_bytes
+        self._max_entry_bytes: int = max_entry_bytes
+        # Maps a path, its modification time and its size to the contents of the file
+        self._entries: OrderedDict[tuple[str, int, int], bytes] = OrderedDict()
+        self._bytes: int = 0
+        self._lock: Lock = Lock()
+
+    @property
+    def max_entry_bytes(self) -> int:
+        return self._max_entry_bytes
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def get(self, key: tuple[str, int, int]) -> bytes|None:
+        with self._lock:
+            contents: bytes|None = self._entries.get(key)
+            if contents is not None:
+                self._entries.move_to_end(key)
+            return contents
+
+    def put(self, key: tuple[str, int, int], contents: bytes) -> Self:
+        if len(contents) > self._max_entry_bytes:
+            return self
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = contents
+                self._bytes += len(contents)
+            while self._bytes > self._max_bytes:
+                _, evicted_contents = self._entries.popitem(last=False)
+                self._bytes -= len(evicted_contents)
+        return self
+
+    def clear(self) -> Self:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+        return self
+
+class StaticFilesHandlerV1_1(IRouteHandler):
+
+    __METHODS: tuple[str, ...] = ("GET", "HEAD")
+    __METHOD_NOT_ALLOWED_RESPONSE: ImmutableResponseV1_1 = method_not_allowed_response(
+        allowed_methods=list(__METHODS)
+    )
+
+    def __init__(
+        self,
+        directory: str,
+        index_file: str|None = "index.html",
+        chunk_size: int = 64*1024,
+        cache_max_bytes: int = 16*1024*1024,
+        cache_max_entry_bytes: int = 64*1024
+    ) -> None:
+        self._directory: str = realpath(directory)
+        self._index_file: str|None = index_file
+        self._chunk_size: int = chunk_size
+        self._cache: StaticFileCache = StaticFileCache(
+            max_bytes=cache_max_bytes,
+            max_entry_bytes=cache_max_entry_bytes
+        )
+
+    @property
+    def route_function(self) -> Callable[[IRequest], IResponse]:
+        return self.handle
+
+    @property
+    def cache(self) -> StaticFileCache:
+        return self._cache
+
+    def __resolve(self, path: str) -> str|None:
+        path = realpath(path)
+        # Symbolic links can't be used to get out of the directory
+        if path != self._directory and not path.startswith(self._directory + sep):
+            return None
+        return path
+
+    def __file_path(self, request_path: str) -> str|None:
+        segments: list[str] = list()
+        for segment in request_path.split("/"):
+            if segment in ("", "."):
+                continue
+            if segment == ".." or "\\" in segment or "\0" in segment:
+                return None
+            segments.append(segment)
+        path: str|None = self.__resolve(join(self._directory, *segments))
+        if path is None:
+            return None
+        if not isfile(path):
+            if self._index_file is None:
+                return None
+            path = self.__resolve(join(path, self._index_file))
+            if path is None or not isfile(path):
+                return None
+        return path
+
+    def __accepts_gzip(self, request: IRequest) -> bool:
+        accept_encoding: str|None = request.headers.get_single_value_header(name="Accept-Encoding")
+        if accept_encoding is None:
+            return False
+        for coding in accept_encoding.lower().split(","):
+            name, _, parameters = coding.partition(";")
+            if name.strip() in ("gzip", "*"):
+                return parameters.replace(" ", "") not in ("q=0", "q=0.0", "q=0.00", "q=0.000")
+        return False
+
+    def __etag(self, file_stat: stat_result) -> str:
+        return f'"{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}"'
+
+    def __not_modified(self, request: IRequest, etag: str, file_stat: stat_result) -> bool:
+        if_none_match: str|None = request.headers.get_single_value_header(name="If-None-Match")
+        if if_none_match is not None:
+            return any(
+                candidate.strip() in ("*", etag, f"W/{etag}") for candidate in if_none_match.split(",")
+            )
+        if_modified_since: str|None = request.headers.get_single_value_header(name="If-Modified-Since")
+        if if_modified_since is not None:
+            try:
+                return int(file_stat.st_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+    def __range(self, request: IRequest, etag: str, last_modified: str, size: int) -> tuple[int, int]|bool|None:
+        # Returns the start and end of the requested range, None for the whole file
+        # and False if the range can't be satisfied
+        range_header: str|None = request.headers.get_single_value_header(name="Range")
+        if range_header is None:
+            return None
+        if_range: str|None = request.headers.get_single_value_header(name="If-Range")
+        if if_range is not None and if_range.strip() not in (etag, last_modified):
+            return None
+        unit, _, ranges = range_header.partition("=")
+        if unit.strip().lower() != "bytes" or "," in ranges:
+            # Multipart ranges aren't supported, the whole file is sent instead
+            return None
+        first, _, last = ranges.strip().partition("-")
+        first, last = first.strip(), last.strip()
+        if len(first) < 1:
+            if not (last.isascii() and last.isdigit()) or int(last) < 1:
+                return False
+            return (max(size - int(last), 0), size)
+        if not (first.isascii() and first.isdigit()) or (len(last) > 0 and not (last.isascii() and last.isdigit())):
+            return None
+        start: int = int(first)
+        end: int = size if len(last) < 1 else min(int(last) + 1, size)
+        if start >= size or start >= end:
+            return False
+        return (start, end)
+
+    def handle(self, request: IRequest) -> IResponse:
+        if request.method not in self.__METHODS:
+            return self.__METHOD_NOT_ALLOWED_RESPONSE.copy_on_write()
+        path: str|None = self.__file_path(request.path)
+        if path is None:
+            return NOT_FOUND_RESPONSE.copy_on_write()
+        content_type, _ = guess_type(path)
+        content_encoding: str|None = None
+        if self.__accepts_gzip(request):
+            # The compressed sibling is checked the same way, it can be a link as well
+            gzip_path: str|None = self.__resolve(f"{path}.gz")
+            if gzip_path is not None and isfile(gzip_path):
+                path, content_encoding = gzip_path, "gzip"
+        try:
+            file: IO[bytes] = open(path, "rb")
+        except OSError:
+            return NOT_FOUND_RESPONSE.copy_on_write()
+        file_stat: stat_result = fstat(file.fileno())
+        etag: str = self.__etag(file_stat)
+        last_modified: str = formatdate(file_stat.st_mtime, usegmt=True)
+
+        response: ResponseV1_1 = ResponseV1_1(
+            status_code=200,
+            status_text="OK"
+        )
+        response.headers.set_single_value_header(
+            name="ETag", value=etag
+        ).set_single_value_header(
+            name="Last-Modified", value=last_modified
+        ).set_single_value_header(
+            name="Accept-Ranges", value="bytes"
+        ).set_single_value_header(
+            name="Vary", value="Accept-Encoding"
+        )
+        if content_encoding is not None:
+            response.headers.set_single_value_header(
+                name="Content-Encoding", value=content_encoding
+            )
+        if self.__not_modified(request, etag, file_stat):
+            file.close()
+            response.status_code, response.status_text = 304, "NOT MODIFIED"
+            return response
+        response.headers.set_single_value_header(
+            name="Content-Type", value=content_type if content_type is not None else "application/octet-stream"
+        )
+
+        size: int = file_stat.st_size
+        byte_range: tuple[int, int]|bool|None = self.__range(request, etag, last_modified, size)
+        if byte_range is False:
+            file.close()
+            response.status_code, response.status_text = 416, "RANGE NOT SATISFIABLE"
+            response.headers.set_single_value_header(
+                name="Content-Range", value=f"bytes */{size}"
+            ).set_single_value_header(
+                name="Content-Length", value=0
+            )
+            return response
+        start, end = byte_range if byte_range is not None else (0, size)
+        if byte_range is not None:
+            response.status_code, response.status_text = 206, "PARTIAL CONTENT"
+            response.headers.set_single_value_header(
+                name="Content-Range", value=f"bytes {start}-{end - 1}/{size}"
+            )
+        response.headers.set_single_value_header(
+            name="Content-Length", value=end - start
+        )
+        if request.method == "HEAD" or end - start < 1:
+            file.close()
+            return response
+
+        if size <= self._cache.max_entry_bytes:
+            cache_key: tuple[str, int, int] = (path, file_stat.st_mtime_ns, size)
+            contents: bytes|None = self._cache.get(cache_key)
+            if contents is None:
+                contents = file.read()
+                self._cache.put(cache_key, contents)
+            file.close()
+            response.body = contents if byte_range is None else contents[start:end]
+        elif byte_range is None:
+            # Sent with wsgi.file_wrapper when the server has one
+            response.body = file
+        else:
+            response.body = MappedFileRangeV1_1(
+                file=file,
+                start=start,
+                end=end,
+                chunk_size=self._chunk_size
+            )
+        return response
+
+    def __str__(self) -> str:
+        return f"static files: {self._directory}"
+
+
+
+class StaticBranchV1_1(BranchV1_1):
+
+    def __init__(
+        self,
+        directory: str,
+        index_file: str|None = "index.html",
+        chunk_size: int = 64*1024,
+        cache_max_bytes: int = 16*1024*1024,
+        cache_max_entry_bytes: int = 64*1024
+    ) -> None:
+        super().__init__()
+        self.__static_files_handler: StaticFilesHandlerV1_1 = StaticFilesHandlerV1_1(
+            directory=directory,
+            index_file=index_file,
+            chunk_size=chunk_size,
+            cache_max_bytes=cache_max_bytes,
+            cache_max_entry_bytes=cache_max_entry_bytes
+        )
+        self._branch_ingress_handler.branch_handler.mount(
+            route_handler=self.__static_files_handler
+        )
+
+    @property
+    def static_files_handler(self) -> StaticFilesHandlerV1_1:
+        return self.__static_files_handler
+
+
+
+StaticBranch = StaticBranchV1_1
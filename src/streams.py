@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, IO, Any, Callable, Generator, Iterable, Iterator
+from abc import ABC, abstractmethod
+
+from chains.src.exceptions import PayloadTooLargeException, StreamNotRewindableException, InvalidSettingsException
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+    from tempfile import SpooledTemporaryFile
+
+
+
+class IRequestStream(ABC):
+
+    __slots__ = ()
+
+    @abstractmethod
+    def read(self, size: int = -1) -> bytes:
+        pass
+
+    @abstractmethod
+    def readline(self, limit: int = -1) -> bytes:
+        pass
+
+    @abstractmethod
+    def __iter__(self) -> Generator[bytes, None, None]:
+        pass
+
+    @abstractmethod
+    def spool(self) -> Self:
+        pass
+
+    @abstractmethod
+    def seek(self, offset: int) -> Self:
+        pass
+
+    @abstractmethod
+    def close(self) -> None:
+        pass
+
+
+
+class RequestStreamV1_1(IRequestStream):
+
+    __slots__ = ("_input", "_remaining", "_max_body_size", "_chunk_size", "_spool_threshold", "_bytes_read", "_spool")
+
+    def __init__(
+        self,
+        input: IO[bytes],
+        content_length: int|None,
+        max_body_size: int|None = None,
+        chunk_size: int = 64*1024,
+        spool_threshold: int = 1024*1024
+    ) -> None:
+        if chunk_size < 1:
+            raise InvalidSettingsException("The chunk size of a request stream has to be at least 1 byte")
+        self._input: IO[bytes] = input
+        self._remaining: int|None = content_length
+        self._max_body_size: int|None = max_body_size
+        self._chunk_size: int = chunk_size
+        self._spool_threshold: int = spool_threshold
+        self._bytes_read: int = 0
+        self._spool: SpooledTemporaryFile|None = None
+
+    @property
+    def content_length(self) -> int|None:
+        if self._remaining is None:
+            return None
+        return self._bytes_read + self._remaining
+
+    @property
+    def bytes_read(self) -> int:
+        return self._bytes_read
+
+    @property
+    def spooled(self) -> bool:
+        return self._spool is not None
+
+    def __read_chunk(self, size: int) -> bytes:
+        if self._remaining is not None:
+            if self._remaining < 1:
+                return b""
+            size = min(size, self._remaining)
+        chunk: bytes = self._input.read(size)
+        if self._remaining is not None:
+            if len(chunk) < 1:
+                # The client went away before sending the whole body
+                self._remaining = 0
+            else:
+                self._remaining -= len(chunk)
+        self._bytes_read += len(chunk)
+        if self._max_body_size is not None and self._bytes_read > self._max_body_size:
+            raise PayloadTooLargeException(
+                max_body_size=self._max_body_size
+            )
+        return chunk
+
+    def read(self, size: int = -1) -> bytes:
+        if self._spool is not None:
+            return self._spool.read(size)
+        if size >= 0:
+            return self.__read_chunk(size)
+        chunks: list[bytes] = list()
+        while True:
+            chunk: bytes = self.__read_chunk(self._chunk_size)
+            if len(chunk) < 1:
+                break
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+    def readline(self, limit: int = -1) -> bytes:
+        if self._spool is not None:
+            return self._spool.readline(limit)
+        if self._remaining is not None:
+            if self._remaining < 1:
+                return b""
+            if limit < 0 or limit > self._remaining:
+                limit = self._remaining
+        line: bytes = self._input.readline(limit)
+        if self._remaining is not None:
+            self._remaining = 0 if len(line) < 1 else self._remaining - len(line)
+        self._bytes_read += len(line)
+        if self._max_body_size is not None and self._bytes_read > self._max_body_size:
+            raise PayloadTooLargeException(
+                max_body_size=self._max_body_size
+            )
+        return line
+
+    def __iter__(self) -> Generator[bytes, None, None]:
+        while True:
+            chunk: bytes = self.read(self._chunk_size)
+            if len(chunk) < 1:
+                return None
+            yield chunk
+
+    def spool(self) -> Self:
+        if self._spool is not None:
+            return self
+        from tempfile import SpooledTemporaryFile
+        spool: SpooledTemporaryFile = SpooledTemporaryFile(
+            max_size=self._spool_threshold
+        )
+        while True:
+            chunk: bytes = self.__read_chunk(self._chunk_size)
+            if len(chunk) < 1:
+                break
+            spool.write(chunk)
+        spool.seek(0)
+        self._spool = spool
+        return self
+
+    def seek(self, offset: int) -> Self:
+        if self._spool is None:
+            raise StreamNotRewindableException("Only a spooled request stream can be rewound")
+        self._spool.seek(offset)
+        return self
+
+    def close(self) -> None:
+        if self._spool is not None:
+            self._spool.close()
+        return None
+
+
+
+class ResponseIterableV1_1:
+
+    def __init__(self, body: Iterable[bytes], on_close: list[Callable[[], Any]]|None = None) -> None:
+        self._body: Iterable[bytes] = body
+        self._on_close: list[Callable[[], Any]] = on_close if on_close is not None else list()
+        self._closed: bool = False
+
+    def __iter__(self) -> Iterator[bytes]:
+        return iter(self._body)
+
+    def add_close_callback(self, callback: Callable[[], Any]) -> Self:
+        self._on_close.append(callback)
+        return self
+
+    def close(self) -> None:
+        if self._closed is True:
+            return None
+        self._closed = True
+        try:
+            if hasattr(self._body, "close"):
+                self._body.close()
+        finally:
+            for callback in self._on_close:
+                callback()
+        return None
+
+class ResponseFileV1_1(ResponseIterableV1_1):
+
+    def __init__(self, file: IO[bytes], chunk_size: int = 64*1024, on_close: list[Callable[[], Any]]|None = None) -> None:
+        super().__init__(
+            body=file,
+            on_close=on_close
+        )
+        self._file: IO[bytes] = file
+        self._chunk_size: int = chunk_size
+
+    def read(self, size: int = -1) -> bytes:
+        return self._file.read(size)
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self._file.tell()
+
+    def __iter__(self) -> Generator[bytes, None, None]:
+        while True:
+            chunk: bytes = self._file.read(self._chunk_size)
+            if len(chunk) < 1:
+                return None
+            yield chunk
@@ -0,0 +1,35 @@
+# The repository is expected to be cloned as a directory named 'chains' (see
+# the README), run the tests with: python -m pytest chains/tests
+import sys
+from pathlib import Path
+from typing import Any, Callable
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))
+
+from chains.benchmarks.harness import make_environ
+
+
+
+WSGIResult = tuple[str, list[tuple[str, str]], bytes]
+
+def call_wsgi(application: Callable, path: str, method: str = "GET", headers: dict[str, str]|None = None, body: bytes = b"", query_string: str = "", content_type: str|None = None) -> WSGIResult:
+    environ: dict[str, Any] = make_environ(path=path, method=method, headers=headers, body=body, query_string=query_string)
+    if content_type is not None:
+        environ["CONTENT_TYPE"] = content_type
+    started: dict[str, Any] = dict()
+    def start_response(status: str, response_headers: list[tuple[str, str]], exc_info: Any = None) -> Callable[[bytes], None]:
+        started["status"], started["headers"] = status, response_headers
+        return lambda data: None
+    response_iterable = application(environ, start_response)
+    try:
+        body_bytes: bytes = b"".join(response_iterable)
+    finally:
+        if hasattr(response_iterable, "close"):
+            response_iterable.close()
+    return started["status"], started["headers"], body_bytes
+
+@pytest.fixture
+def wsgi() -> Callable[..., WSGIResult]:
+    return call_wsgi
@@ -0,0 +1,98 @@
+import asyncio
+import gzip
+from typing import Any
+
+from chains import ChainsASGI, Request, Response, RequestHandler
+from chains.src.compression import CompressionV1_1, compressionv1_1
+
+
+
+async def call_asgi(application: ChainsASGI, path: str, method: str = "GET", headers: list[tuple[bytes, bytes]]|None = None, body: bytes = b"") -> tuple[int, bytes]:
+    scope: dict[str, Any] = {"type": "http", "method": method, "path": path, "query_string": b"", "headers": headers if headers is not None else []}
+    messages: list[dict[str, Any]] = [{"type": "http.request", "body": body, "more_body": False}]
+    sent: list[dict[str, Any]] = list()
+    async def receive() -> dict[str, Any]:
+        return messages.pop(0)
+    async def send(message: dict[str, Any]) -> None:
+        sent.append(message)
+    await application(scope, receive, send)
+    return sent[0]["status"], b"".join(message.get("body", b"") for message in sent[1:])
+
+
+
+def test_sync_middleware_over_async_middleware_does_not_exhaust_the_thread_pool():
+    application: ChainsASGI = ChainsASGI(thread_pool_size=2)
+
+    @application.route(path="/items", method="GET")
+    def items(request: Request) -> Response:
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = b"items"
+        return response
+
+    @application.middleware()
+    async def async_middleware(request: Request, next: RequestHandler) -> Response:
+        return await next(request)
+
+    @application.middleware()
+    def sync_middleware(request: Request, next: RequestHandler) -> Response:
+        return next(request)
+
+    async def main() -> list[tuple[int, bytes]]:
+        return await asyncio.wait_for(
+            asyncio.gather(*(call_asgi(application, "/items") for _ in range(8))),
+            timeout=10
+        )
+    assert asyncio.run(main()) == [(200, b"items")] * 8
+
+def test_nested_sync_middleware_do_not_deadlock_their_bridge_pools():
+    application: ChainsASGI = ChainsASGI(thread_pool_size=2)
+
+    @application.route(path="/items", method="GET")
+    async def items(request: Request) -> Response:
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = b"items"
+        return response
+
+    for _ in range(2):
+        @application.middleware()
+        async def async_middleware(request: Request, next: RequestHandler) -> Response:
+            return await next(request)
+
+        @application.middleware()
+        def sync_middleware(request: Request, next: RequestHandler) -> Response:
+            return next(request)
+
+    async def main() -> list[tuple[int, bytes]]:
+        return await asyncio.wait_for(
+            asyncio.gather(*(call_asgi(application, "/items") for _ in range(8))),
+            timeout=10
+        )
+    assert asyncio.run(main()) == [(200, b"items")] * 8
+
+def test_headers_are_read_by_their_names():
+    application: ChainsASGI = ChainsASGI()
+    application.add_middleware(compressionv1_1, compression=CompressionV1_1(minimum_size=10))
+
+    @application.route(path="/form", method="POST")
+    def form(request: Request) -> Response:
+        with request.form() as parsed_form:
+            fields: list[str] = [f"{part.name}={part.value}" for part in parsed_form]
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = "|".join(fields + [
+            request.headers.get_single_value_header(name="Content-Type"),
+            request.headers.get_single_value_header(name="Accept"),
+            request.headers.get_single_value_header(name="Cookie")
+        ]).encode() * 10
+        return response
+
+    headers: list[tuple[bytes, bytes]] = [
+        (b"content-type", b"application/x-www-form-urlencoded"),
+        (b"accept", b"text/html, application/json"),
+        (b"accept-encoding", b"gzip"),
+        (b"cookie", b"a=1"),
+        (b"cookie", b"b=2")
+    ]
+    status, body = asyncio.run(call_asgi(application, "/form", method="POST", headers=headers, body=b"name=chains"))
+    assert status == 200
+    # Only compressed when Accept-Encoding was read
+    assert gzip.decompress(body) == b"name=chains|application/x-www-form-urlencoded|text/html, application/json|a=1; b=2" * 10
@@ -0,0 +1,72 @@
+from threading import Event, Timer, get_ident
+from time import perf_counter
+
+import pytest
+
+from chains.src.background import BackgroundTasksV1_1
+from chains.src.exceptions import InvalidSettingsException
+
+
+
+def occupy_worker(background_tasks: BackgroundTasksV1_1) -> Event:
+    # Keeps the only worker busy until the returned event is set
+    started: Event = Event()
+    release: Event = Event()
+    def wait() -> None:
+        started.set()
+        release.wait(timeout=5)
+    background_tasks.schedule([(wait, (), {})])
+    assert started.wait(timeout=5)
+    return release
+
+
+
+def test_tasks_run_inline_without_workers():
+    background_tasks: BackgroundTasksV1_1 = BackgroundTasksV1_1()
+    threads: list[int] = list()
+    def fail() -> None:
+        raise ValueError("fails")
+    background_tasks.schedule([(threads.append, (get_ident(),), {}), (fail, (), {})])
+    assert threads == [get_ident()]
+    assert (background_tasks.completed, background_tasks.failed) == (1, 1)
+
+def test_tasks_are_dropped_when_the_queue_is_full():
+    background_tasks: BackgroundTasksV1_1 = BackgroundTasksV1_1(max_workers=1, max_queue_size=1)
+    release: Event = occupy_worker(background_tasks)
+    ran: list[int] = list()
+    background_tasks.schedule([(ran.append, (1,), {}), (ran.append, (2,), {})])
+    assert background_tasks.dropped == 1
+    release.set()
+    background_tasks.shutdown()
+    assert ran == [1]
+    assert background_tasks.completed == 2
+
+def test_blocked_tasks_are_dropped_after_the_timeout():
+    background_tasks: BackgroundTasksV1_1 = BackgroundTasksV1_1(max_workers=1, max_queue_size=1, policy="block", block_timeout=0.05)
+    release: Event = occupy_worker(background_tasks)
+    ran: list[int] = list()
+    start: float = perf_counter()
+    background_tasks.schedule([(ran.append, (1,), {}), (ran.append, (2,), {})])
+    assert perf_counter() - start >= 0.05
+    assert background_tasks.dropped == 1
+    release.set()
+    background_tasks.shutdown()
+    assert ran == [1]
+
+def test_blocked_tasks_wait_for_room_in_the_queue():
+    background_tasks: BackgroundTasksV1_1 = BackgroundTasksV1_1(max_workers=1, max_queue_size=1, policy="block")
+    release: Event = occupy_worker(background_tasks)
+    ran: list[int] = list()
+    background_tasks.schedule([(ran.append, (1,), {})])
+    # The queue is full, so the second task is only queued once the worker is released
+    Timer(0.05, release.set).start()
+    background_tasks.schedule([(ran.append, (2,), {})])
+    assert release.is_set()
+    background_tasks.shutdown()
+    assert ran == [1, 2]
+    assert background_tasks.dropped == 0
+
+@pytest.mark.parametrize("settings", [{"max_workers": -1}, {"max_queue_size": 0}, {"policy": "wait"}])
+def test_invalid_settings_are_rejected(settings: dict):
+    with pytest.raises(InvalidSettingsException):
+        BackgroundTasksV1_1(**settings)
@@ -0,0 +1,42 @@
+import gzip
+
+from chains import Chains, Request, Response
+from chains.src.compression import CompressionV1_1, compressionv1_1
+
+
+
+BODIES: dict[str, bytes] = {"a": b"a" * 1000, "b": b"b" * 1000}
+
+def compressing_application(compression: CompressionV1_1) -> Chains:
+    application: Chains = Chains()
+    application.add_middleware(compressionv1_1, compression=compression)
+
+    @application.route(path="/<name>", method="GET")
+    def body(request: Request) -> Response:
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = BODIES[request.path_params["name"]]
+        return response
+
+    return application
+
+def get_gzipped(wsgi, application: Chains, path: str) -> bytes:
+    return gzip.decompress(wsgi(application, path, headers={"Accept-Encoding": "gzip"})[2])
+
+
+
+def test_compressed_bodies_are_cached_without_the_body(wsgi):
+    compression: CompressionV1_1 = CompressionV1_1(cache_max_bytes=100)
+    application: Chains = compressing_application(compression)
+    for _ in range(2):
+        assert get_gzipped(wsgi, application, "/a") == BODIES["a"]
+    assert (compression.hits, compression.misses) == (1, 1)
+    # Only the compressed body counts against the size of the cache
+    cached_bytes: int = compression.cache_bytes
+    assert 0 < cached_bytes < 100
+    # Bodies that would take the cache over its size evict the least recently used ones
+    compression = CompressionV1_1(cache_max_bytes=cached_bytes)
+    application = compressing_application(compression)
+    for name in ("a", "b", "a"):
+        assert get_gzipped(wsgi, application, f"/{name}") == BODIES[name]
+    assert (compression.hits, compression.misses) == (0, 3)
+    assert compression.cache_bytes <= cached_bytes
@@ -0,0 +1,86 @@
+from io import BytesIO
+from typing import Any, Callable
+from wsgiref.handlers import SimpleHandler
+from wsgiref.util import setup_testing_defaults
+
+import pytest
+
+from chains import Chains, Request, Response
+from chains.src.error_responses import NOT_FOUND_RESPONSE
+from chains.src.rate_limit import RateLimiter, rate_limiterv1_1, route_key
+
+
+
+def request_id(request: Request, next: Callable[[Request], Response]) -> Response:
+    response: Response = next(request)
+    response.headers.set_single_value_header(name="X-Request-Id", value="abc")
+    return response
+
+def application_with(*middlewares: tuple) -> Chains:
+    application: Chains = Chains()
+    for middleware_function, kwargs in middlewares:
+        application.add_middleware(middleware_function, **kwargs)
+
+    @application.route(path="/items", method="GET")
+    def items(request: Request) -> Response:
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = b"items"
+        return response
+
+    return application
+
+
+
+@pytest.mark.parametrize("frozen", [False, True])
+@pytest.mark.parametrize("path, method, status", [
+    ("/missing", "GET", "404"),
+    ("/items", "POST", "405")
+])
+def test_middleware_can_change_shared_error_responses(wsgi, frozen, path, method, status):
+    application: Chains = application_with((request_id, dict()))
+    if frozen:
+        application.freeze()
+    for _ in range(2):
+        response_status, headers, _ = wsgi(application, path, method=method)
+        assert response_status.split()[0] == status
+        assert ("X-Request-Id", "abc") in headers
+    assert NOT_FOUND_RESPONSE.headers.get_single_value_header(name="X-Request-Id") is None
+
+def test_middleware_can_change_rate_limited_responses(wsgi):
+    application: Chains = application_with(
+        (rate_limiterv1_1, dict(rate_limiter=RateLimiter(rate=1, burst=1, key=route_key))),
+        (request_id, dict())
+    )
+    assert wsgi(application, "/items")[0].split()[0] == "200"
+    for _ in range(2):
+        status, headers, _ = wsgi(application, "/items")
+        assert status.split()[0] == "429"
+        assert ("X-Request-Id", "abc") in headers
+        assert [value for name, value in headers if name == "X-Request-Id"] == ["abc"]
+
+def test_unchanged_error_responses_are_sent_as_they_are(wsgi):
+    status, headers, body = wsgi(application_with(), "/missing")
+    assert status.split()[0] == "404"
+    assert headers == NOT_FOUND_RESPONSE.headers.header_list()
+    assert body == NOT_FOUND_RESPONSE.body
+
+def call_wsgiref(application: Chains, path: str, method: str = "GET", query_string: str = "", body: bytes = b"") -> bytes:
+    # wsgiref checks that applications don't set hop-by-hop headers
+    environ: dict[str, Any] = {"REQUEST_METHOD": method, "PATH_INFO": path, "QUERY_STRING": query_string, "CONTENT_LENGTH": str(len(body))}
+    setup_testing_defaults(environ)
+    output: BytesIO = BytesIO()
+    SimpleHandler(BytesIO(body), output, BytesIO(), environ).run(application)
+    return output.getvalue()
+
+def test_error_responses_are_accepted_by_wsgiref():
+    application: Chains = Chains(max_body_size=4)
+
+    @application.route(path="/query", method="POST")
+    def query(request: Request) -> Response:
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = str(len(request.query)).encode()
+        return response
+
+    assert call_wsgiref(application, "/query", method="POST").startswith(b"HTTP/1.0 200 ")
+    assert call_wsgiref(application, "/query", method="POST", query_string="&".join(["a=1"] * 2000)).startswith(b"HTTP/1.0 400 ")
+    assert call_wsgiref(application, "/query", method="POST", body=b"too large").startswith(b"HTTP/1.0 413 ")
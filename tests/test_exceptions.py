@@ -0,0 +1,24 @@
+import pytest
+
+from chains import Chains, Request, Response
+from chains.src.exceptions import FrozenApplicationException, InvalidSettingsException, DuplicateRouteException
+from chains.src.rate_limit import RateLimiter
+
+
+
+def route(request: Request) -> Response:
+    return Response(status_code=200, status_text="OK")
+
+def test_configuration_errors_have_their_own_types():
+    application: Chains = Chains()
+    application.route(path="/items", method="GET")(route)
+    with pytest.raises(DuplicateRouteException):
+        application.route(path="/items", method="GET")(route)
+    application.freeze()
+    with pytest.raises(FrozenApplicationException):
+        application.route(path="/other", method="GET")(route)
+    with pytest.raises(InvalidSettingsException):
+        RateLimiter(rate=0)
+    # They're still the built in exceptions that were raised before
+    with pytest.raises(ValueError):
+        RateLimiter(rate=1, burst=0)
@@ -0,0 +1,134 @@
+from io import BytesIO
+
+import pytest
+
+from chains import Chains, Request, Response
+from chains.src.exceptions import BadRequestException
+from chains.src.forms import FormParser, parse_header_parameters
+from chains.src.streams import RequestStreamV1_1
+
+
+
+BOUNDARY: str = "----chains"
+CONTENT_TYPE: str = f"multipart/form-data; boundary={BOUNDARY}"
+
+def multipart_body(*parts: tuple[str, str|None, bytes], closed: bool = True) -> bytes:
+    body: bytearray = bytearray(b"preamble\r\n")
+    for name, filename, data in parts:
+        disposition: str = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename is not None else "")
+        body += f"--{BOUNDARY}\r\nContent-Disposition: {disposition}\r\n\r\n".encode() + data + b"\r\n"
+    if closed:
+        body += f"--{BOUNDARY}--\r\nepilogue".encode()
+    return bytes(body)
+
+def parser(body: bytes, content_type: str = CONTENT_TYPE, **kwargs) -> FormParser:
+    stream: RequestStreamV1_1 = RequestStreamV1_1(
+        input=BytesIO(body),
+        content_length=len(body)
+    )
+    return FormParser(stream=stream, content_type=content_type, **kwargs)
+
+def parse(body: bytes, content_type: str = CONTENT_TYPE, **kwargs) -> list[tuple[str, str|None, bytes]]:
+    with parser(body, content_type, **kwargs) as form:
+        return [(part.name, part.filename, part.read()) for part in form]
+
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 7, 13, 64, 4096])
+def test_boundaries_split_across_chunks(chunk_size):
+    parts: list[tuple[str, str|None, bytes]] = [
+        ("title", None, b"hello"),
+        ("empty", None, b""),
+        ("upload", "a.bin", b"\r\n--" + BOUNDARY[:-1].encode() + b"\r\n" + bytes(range(256)) * 3),
+        ("last", None, b"-")
+    ]
+    assert parse(multipart_body(*parts), chunk_size=chunk_size) == parts
+
+def test_missing_closing_boundary():
+    with pytest.raises(BadRequestException) as exception:
+        parse(multipart_body(("title", None, b"hello"), closed=False))
+    assert exception.value.status_code == 400
+
+def test_part_limit():
+    body: bytes = multipart_body(*((f"field{i}", None, b"x") for i in range(4)))
+    assert len(parse(body, max_parts=4)) == 4
+    with pytest.raises(BadRequestException) as exception:
+        parse(body, max_parts=3)
+    assert exception.value.status_code == 413
+
+@pytest.mark.parametrize("chunk_size", [5, 4096])
+def test_field_limits(chunk_size):
+    body: bytes = multipart_body(("title", None, b"x" * 11), ("upload", "a.bin", b"x" * 100))
+    with pytest.raises(BadRequestException) as exception:
+        parse(body, max_field_size=10, chunk_size=chunk_size)
+    assert exception.value.status_code == 413
+    assert len(parse(body, max_field_size=11, chunk_size=chunk_size)) == 2
+    with pytest.raises(BadRequestException) as exception:
+        parse(body, max_part_size=99, chunk_size=chunk_size)
+    assert exception.value.status_code == 413
+    with pytest.raises(BadRequestException) as exception:
+        parse(b"a=1&b=" + b"x" * 11, content_type="application/x-www-form-urlencoded", max_field_size=10, chunk_size=chunk_size)
+    assert exception.value.status_code == 413
+
+def test_total_size_limit():
+    body: bytes = multipart_body(("upload", "a.bin", b"x" * 1000))
+    with pytest.raises(BadRequestException) as exception:
+        parse(body, max_size=len(body) - 1, chunk_size=64)
+    assert exception.value.status_code == 413
+
+def test_parts_spill_to_disk():
+    data: bytes = bytes(range(256)) * 40
+    with parser(multipart_body(("small", None, b"x" * 100), ("upload", "a.bin", data)), spool_threshold=4096, chunk_size=512) as form:
+        small, upload = list(form)
+        assert small.spilled is False
+        assert upload.spilled is True
+        assert upload.size == len(data)
+        assert upload.file.read() == data
+        assert upload.read() == data
+        file = upload.file
+    # Leaving the block deletes the temporary files
+    assert file.closed
+
+def test_in_memory_parts_are_limited_together():
+    # Every part is under the spool threshold, together they aren't
+    parts: list[tuple[str, str|None, bytes]] = [(f"upload{i}", f"{i}.bin", bytes([i]) * 1000) for i in range(20)]
+    with parser(multipart_body(*parts), spool_threshold=4096, chunk_size=256) as form:
+        assert [(part.name, part.filename, part.read()) for part in form] == parts
+        assert form.bytes_in_memory <= 4096
+        assert sum(part.size for part in form.parts if not part.spilled) == form.bytes_in_memory
+        assert any(part.spilled for part in form.parts)
+
+def test_urlencoded_forms():
+    assert parse(b"a=1&b=hello+world&c=%C3%A9&d", content_type="application/x-www-form-urlencoded", chunk_size=3) == [
+        ("a", None, b"1"),
+        ("b", None, b"hello world"),
+        ("c", None, "é".encode()),
+        ("d", None, b"")
+    ]
+
+@pytest.mark.parametrize("charset", ["bogus", "rot13", ""])
+def test_unknown_filename_charsets_fall_back_to_utf8(charset):
+    assert parse_header_parameters(f"form-data; name=a; filename*={charset}''%C3%A9.txt") == ("form-data", {"name": "a", "filename": "é.txt"})
+
+def test_form_errors_get_error_responses(wsgi):
+    application: Chains = Chains()
+
+    @application.route(path="/upload", method="POST")
+    def upload(request: Request) -> Response:
+        with request.form(max_parts=1) as form:
+            names: list[str] = [part.filename or part.name for part in form]
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = ",".join(names).encode()
+        return response
+
+    body: bytes = multipart_body(("upload", "a.bin", b"data"))
+    for content_type, status in [
+        (f"multipart/form-data; boundary={BOUNDARY}", "200"),
+        ("multipart/form-data; boundary=other", "400"),
+        ("text/plain", "415")
+    ]:
+        assert wsgi(application, "/upload", method="POST", body=body, content_type=content_type)[0].split()[0] == status
+    status: str = wsgi(application, "/upload", method="POST", body=multipart_body(("a", None, b"1"), ("b", None, b"2")), content_type=CONTENT_TYPE)[0]
+    assert status.split()[0] == "413"
+    header: bytes = f"--{BOUNDARY}\r\nContent-Disposition: form-data; name=\"upload\"; filename*=bogus''%C3%A9.txt\r\n\r\ndata\r\n--{BOUNDARY}--\r\n".encode()
+    assert wsgi(application, "/upload", method="POST", body=header, content_type=CONTENT_TYPE)[2] == "é.txt".encode()
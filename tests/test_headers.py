@@ -0,0 +1,79 @@
+from typing import Any
+
+import pytest
+
+from chains.src.header import EnvironHeadersV1_1, CompactHeadersV1_1
+from chains.src.exceptions import HeaderClashException, MalformedHeaderException
+
+
+
+def environ_headers() -> tuple[dict[str, Any], EnvironHeadersV1_1]:
+    environ: dict[str, Any] = {
+        "REQUEST_METHOD": "GET",
+        "HTTP_USER_AGENT": "agent",
+        "HTTP_ACCEPT": "text/html, application/json",
+        "HTTP_COOKIE": "a=1, b=2",
+        "CONTENT_TYPE": "text/plain",
+        "CONTENT_LENGTH": ""
+    }
+    return environ, EnvironHeadersV1_1(environ=environ)
+
+
+
+def test_environ_headers_are_read_without_being_copied():
+    _, headers = environ_headers()
+    assert headers.get_single_value_header(name="User-Agent") == "agent"
+    assert headers.get_single_value_header(name="user_agent") == "agent"
+    assert headers.get_single_value_header(name="Content-Type") == "text/plain"
+    # Servers set an empty CONTENT_LENGTH when the request has no body
+    assert headers.get_single_value_header(name="Content-Length") is None
+    assert headers.get_single_value_header(name="Request-Method") is None
+    assert list(headers.yield_multi_value_header(name="Accept")) == ["text/html", "application/json"]
+    # Commas in cookies aren't separators
+    assert list(headers.yield_multi_value_header(name="Cookie")) == ["a=1, b=2"]
+    assert headers._headers is None
+    assert sorted(headers.yield_all_headers()) == [
+        ("Accept", "text/html, application/json"), ("Content-Type", "text/plain"), ("Cookie", "a=1, b=2"), ("User-Agent", "agent")
+    ]
+
+def test_changes_are_made_to_a_copy_of_the_environ():
+    environ, headers = environ_headers()
+    headers.add_multi_value_header(name="Accept", value="text/plain")
+    headers.set_single_value_header(name="X-Added", value="1")
+    headers.delete_single_value_header(name="User-Agent")
+    assert list(headers.yield_multi_value_header(name="accept")) == ["text/html", "application/json", "text/plain"]
+    assert headers.get_single_value_header(name="X-Added") == "1"
+    assert headers.get_single_value_header(name="User-Agent") is None
+    assert headers.get_single_value_header(name="Content-Type") == "text/plain"
+    assert environ["HTTP_USER_AGENT"] == "agent"
+    assert "HTTP_X_ADDED" not in environ
+
+def test_compact_headers_are_case_insensitive():
+    headers: CompactHeadersV1_1 = CompactHeadersV1_1()
+    headers.set_single_value_header(name="Content-Type", value="text/plain")
+    headers.set_single_value_header(name="content-type", value="text/html")
+    headers.add_multi_value_header(name="Set-Cookie", value="a=1")
+    headers.add_multi_value_header(name="SET-COOKIE", value="b=2")
+    assert headers.get_single_value_header(name="CONTENT-TYPE") == "text/html"
+    assert list(headers.yield_multi_value_header(name="set-cookie")) == ["a=1", "b=2"]
+    # The name the header was first added with is the one that is sent
+    assert headers.header_list() == [("content-type", "text/html"), ("Set-Cookie", "a=1"), ("Set-Cookie", "b=2")]
+    headers.delete_single_value_header(name="CONTENT-type")
+    headers.delete_multi_value_header(name="set-COOKIE")
+    assert headers.header_list() == []
+
+def test_compact_headers_reject_clashes_and_malformed_headers():
+    headers: CompactHeadersV1_1 = CompactHeadersV1_1()
+    headers.set_single_value_header(name="X-Single", value="1")
+    headers.add_multi_value_header(name="X-Multi", value="1")
+    with pytest.raises(HeaderClashException):
+        headers.add_multi_value_header(name="x-single", value="2")
+    with pytest.raises(HeaderClashException):
+        headers.set_single_value_header(name="x-multi", value="2")
+    with pytest.raises(MalformedHeaderException):
+        headers.set_single_value_header(name="X Bad", value="1")
+    with pytest.raises(MalformedHeaderException):
+        headers.set_single_value_header(name="X-Split", value="1\r\nX-Injected: 1")
+    with pytest.raises(MalformedHeaderException):
+        headers.add_multi_value_header(name="X-Multi", value="\u2603")
+    assert headers.get_single_value_header(name="X-Split") is None
@@ -0,0 +1,52 @@
+from chains import Chains, Metrics, PrometheusBranch, Request, Response
+from chains.src.metrics import LatencyHistogram
+
+
+
+def metered_application(metrics: Metrics) -> Chains:
+    application: Chains = Chains(metrics=metrics)
+
+    @application.route(path="/items/<item_id>", method="GET")
+    def item(request: Request) -> Response:
+        if request.path_params["item_id"] == "missing":
+            return Response(status_code=404, status_text="NOT FOUND")
+        return Response(status_code=200, status_text="OK")
+
+    application.add_branch(path="/metrics", branch=PrometheusBranch(metrics=metrics))
+    return application.freeze()
+
+
+
+def test_histograms_count_observations_into_buckets():
+    histogram: LatencyHistogram = LatencyHistogram(buckets=(0.001, 0.01))
+    # Observations are in nanoseconds, a bucket holds the observations up to and including its bound
+    for duration in (500_000, 1_000_000, 5_000_000, 20_000_000):
+        histogram.observe(duration)
+    assert histogram.count == 4
+    assert histogram.sum == 0.0265
+    assert histogram.cumulative_counts() == [("0.001", 2), ("0.01", 3), ("+Inf", 4)]
+
+def test_requests_are_reported_by_route_and_status(wsgi):
+    metrics: Metrics = Metrics(buckets=(10.0, 0.5))
+    application: Chains = metered_application(metrics)
+    for item_id in ("1", "2", "missing"):
+        wsgi(application, f"/items/{item_id}")
+    rendered: str = metrics.render()
+    assert 'chains_request_duration_seconds_bucket{le="+Inf"} 3' in rendered
+    assert 'chains_request_duration_seconds_count 3' in rendered
+    # Routes are reported by their template without the parameter names, not by the requested path
+    assert 'chains_route_duration_seconds_bucket{route="/items/<>",method="GET",le="0.5"} 3' in rendered
+    assert 'chains_route_duration_seconds_count{route="/items/<>",method="GET"} 3' in rendered
+    assert 'chains_requests_total{route="/items/<>",method="GET",status="200"} 2' in rendered
+    assert 'chains_requests_total{route="/items/<>",method="GET",status="404"} 1' in rendered
+    assert rendered.index('le="0.5"') < rendered.index('le="10.0"')
+
+def test_metrics_are_served_by_the_prometheus_branch(wsgi):
+    metrics: Metrics = Metrics(namespace="shop")
+    application: Chains = metered_application(metrics)
+    wsgi(application, "/items/1")
+    status, headers, body = wsgi(application, "/metrics")
+    assert status.split()[0] == "200"
+    assert dict(headers)["Content-Type"].startswith("text/plain; version=0.0.4")
+    assert b'shop_requests_total{route="/items/<>",method="GET",status="200"} 1' in body
+    assert wsgi(application, "/metrics", method="POST")[0].split()[0] == "405"
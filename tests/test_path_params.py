@@ -0,0 +1,56 @@
+from uuid import UUID
+
+import pytest
+
+from chains import Chains, Request, Response
+from chains.src.exceptions import MalformedRoutePathException
+from chains.src.path_params import parse_route_path
+
+
+
+def params_application() -> Chains:
+    application: Chains = Chains()
+
+    def params(request: Request) -> Response:
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = repr(sorted(request.path_params.items(), key=lambda item: str(item[0]))).encode()
+        return response
+
+    for path in ("/ints/<int:id>", "/floats/<float:value>", "/uuids/<uuid:id>", "/strs/<name>/<>"):
+        application.route(path=path, method="GET")(params)
+    return application
+
+
+
+@pytest.mark.parametrize("frozen", [False, True])
+@pytest.mark.parametrize("path, expected", [
+    ("/ints/42", [("id", 42)]),
+    ("/ints/-7", [("id", -7)]),
+    ("/floats/1.5", [("value", 1.5)]),
+    ("/uuids/12345678-1234-5678-1234-567812345678", [("id", UUID("12345678-1234-5678-1234-567812345678"))]),
+    ("/strs/a/b", [(1, "b"), ("name", "a")])
+])
+def test_captured_values_are_converted(wsgi, frozen, path, expected):
+    application: Chains = params_application()
+    if frozen:
+        application.freeze(route_cache_size=8)
+    for _ in range(2):
+        assert wsgi(application, path)[2] == repr(expected).encode()
+
+@pytest.mark.parametrize("frozen", [False, True])
+@pytest.mark.parametrize("path", [
+    "/ints/x", "/ints/1.5", "/ints/+1", "/ints/1_000", "/ints/٣",
+    "/floats/nan", "/floats/inf", "/floats/1_0", "/uuids/not-a-uuid"
+])
+def test_values_that_can_not_be_converted_are_not_found(wsgi, frozen, path):
+    application: Chains = params_application()
+    if frozen:
+        application.freeze(route_cache_size=8)
+    assert wsgi(application, path)[0].split()[0] == "404"
+
+@pytest.mark.parametrize("path", [
+    "/items/id<int:x>", "/items/<int:>", "/items/<int:1x>", "/items/<bytes:x>", "/items/<x>/<int:x>"
+])
+def test_malformed_wildcards_are_rejected(path):
+    with pytest.raises(MalformedRoutePathException):
+        parse_route_path(path)
@@ -0,0 +1,45 @@
+from chains import Chains, Request, Response
+from chains.src.pool import EMPTY_ENVIRON
+
+
+
+def pooled_application(seen: list[Request]) -> Chains:
+    application: Chains = Chains(request_pool_size=2)
+
+    @application.route(path="/echo", method="POST")
+    def echo(request: Request) -> Response:
+        seen.append(request)
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = f"{request.headers.get_single_value_header(name='X-Name')}:{request.query_string}:".encode() + request.stream.read()
+        return response
+
+    return application
+
+
+
+def test_requests_are_reused_without_keeping_the_previous_request(wsgi):
+    seen: list[Request] = list()
+    application: Chains = pooled_application(seen)
+    assert wsgi(application, "/echo", method="POST", headers={"X-Name": "a"}, body=b"first", query_string="n=1")[2] == b"a:n=1:first"
+    assert wsgi(application, "/echo", method="POST", body=b"second")[2] == b"None::second"
+    assert seen[0] is seen[1]
+    assert (application.request_pool.created, application.request_pool.reused, application.request_pool.size) == (1, 1, 1)
+    # Nothing of the last request is held while the request waits in the pool
+    pooled: Request = seen[0]
+    assert pooled.headers._environ is EMPTY_ENVIRON
+    assert pooled.headers._parsed is None and pooled.headers._environ_keys is None
+    assert pooled._stream is None and pooled.path == "" and pooled.query_string == ""
+
+def test_streams_are_closed_when_requests_are_released(wsgi):
+    application: Chains = Chains(request_pool_size=2)
+    spools: list = list()
+
+    @application.route(path="/spool", method="POST")
+    def spool(request: Request) -> Response:
+        spools.append(request.stream.spool()._spool)
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = request.stream.read()
+        return response
+
+    assert wsgi(application, "/spool", method="POST", body=b"body")[2] == b"body"
+    assert spools[0].closed
@@ -0,0 +1,26 @@
+from pathlib import Path
+
+import pytest
+
+from chains import Chains, ChainsASGI, Profiler, Request, Response
+
+
+
+def test_samples_are_recorded_under_the_route_they_were_dispatched_to(wsgi, tmp_path: Path):
+    profiler: Profiler = Profiler(directory=str(tmp_path), sample_rate=1.0)
+    application: Chains = Chains(profiler=profiler)
+
+    @application.route(path="/user/<int:user_id>", method="GET")
+    def user(request: Request) -> Response:
+        return Response(status_code=200, status_text="OK")
+
+    assert wsgi(application, "/user/1")[0].split()[0] == "200"
+    application.freeze()
+    assert wsgi(application, "/user/1")[0].split()[0] == "200"
+    assert wsgi(application, "/missing")[0].split()[0] == "404"
+    assert profiler.templates() == ["/user/<>", "<unmatched>", "<unrouted>"]
+    assert profiler.samples == 3
+
+def test_the_asgi_application_does_not_take_a_profiler(tmp_path: Path):
+    with pytest.raises(TypeError):
+        ChainsASGI(profiler=Profiler(directory=str(tmp_path)))
@@ -0,0 +1,43 @@
+import pytest
+
+from chains import Chains, Request, Response
+from chains.src.exceptions import BadRequestException
+from chains.src.query import QueryParams, parse_query_string
+
+
+
+def test_repeated_names_keep_every_value_in_order():
+    query: QueryParams = parse_query_string("tag=a&page=2&tag=b&&flag&tag=")
+    assert query["tag"] == "a"
+    assert query.get_list("tag") == ["a", "b", ""]
+    assert query.get_list("missing") == []
+    assert query["flag"] == ""
+    assert list(query) == ["tag", "page", "flag"]
+    assert len(query) == 3
+    assert query.multi_items() == [("tag", "a"), ("page", "2"), ("tag", "b"), ("flag", ""), ("tag", "")]
+
+def test_values_are_decoded():
+    query: QueryParams = parse_query_string("q=hello+world&path=%2Fa%2Fb&name=caf%C3%A9&bad=%ZZ")
+    assert query["q"] == "hello world"
+    assert query["path"] == "/a/b"
+    assert query["name"] == "café"
+    assert query["bad"] == "%ZZ"
+    # Servers hand the raw UTF-8 bytes of the query string over decoded as latin-1
+    assert parse_query_string("name=café".encode().decode("latin-1"))["name"] == "café"
+
+@pytest.mark.parametrize("query_string", ["a=" + "x" * 100, "&".join(["a=1"] * 11)])
+def test_query_strings_over_the_limits_are_rejected(query_string):
+    with pytest.raises(BadRequestException):
+        parse_query_string(query_string, max_length=64, max_fields=10)
+
+def test_limits_are_checked_when_the_query_is_first_read(wsgi):
+    application: Chains = Chains()
+
+    @application.route(path="/search", method="GET")
+    def search(request: Request) -> Response:
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = ",".join(request.query.get_list("q")).encode()
+        return response
+
+    assert wsgi(application, "/search", query_string="q=a&q=b")[2] == b"a,b"
+    assert wsgi(application, "/search", query_string="&".join(["q=a"] * 2000))[0].split()[0] == "400"
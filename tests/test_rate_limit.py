@@ -0,0 +1,40 @@
+from pathlib import Path
+
+from chains import Chains, Request, Response
+from chains.src.rate_limit import RateLimiter, SharedTokenBuckets, TokenBucketsV1_1, ITokenBuckets, rate_limiterv1_1, route_key
+
+
+
+def limited_application(buckets: ITokenBuckets) -> Chains:
+    application: Chains = Chains()
+    # Both limiters see the same key for every request
+    application.add_middleware(rate_limiterv1_1, rate_limiter=RateLimiter(rate=0.001, burst=1, key=route_key, buckets=buckets))
+    application.add_middleware(rate_limiterv1_1, rate_limiter=RateLimiter(rate=0.001, burst=1, key=route_key, buckets=buckets))
+
+    @application.route(path="/items", method="GET")
+    def items(request: Request) -> Response:
+        return Response(status_code=200, status_text="OK")
+
+    return application
+
+
+
+def test_limiters_sharing_buckets_keep_their_own_tokens(wsgi, tmp_path: Path):
+    shared: SharedTokenBuckets = SharedTokenBuckets(path=str(tmp_path / "buckets"), slots=64)
+    try:
+        for buckets in (TokenBucketsV1_1(), shared):
+            application: Chains = limited_application(buckets)
+            assert wsgi(application, "/items")[0].split()[0] == "200"
+            assert wsgi(application, "/items")[0].split()[0] == "429"
+    finally:
+        shared.close()
+
+def test_buckets_are_evicted_after_their_own_refill_time():
+    buckets: TokenBucketsV1_1 = TokenBucketsV1_1()
+    buckets.take("slow", rate=0.1, burst=1, now=0.0)
+    # A limiter that refills in a second must not evict the bucket that takes ten seconds
+    buckets.take("fast", rate=1.0, burst=1, now=2.0)
+    assert buckets.size == 2
+    assert buckets.take("slow", rate=0.1, burst=1, now=2.0) > 0
+    buckets.take("fast", rate=1.0, burst=1, now=13.0)
+    assert buckets.size == 1
@@ -0,0 +1,84 @@
+import pytest
+
+from chains import Chains, Branch, Request, Response
+from chains.src.response_cache import ResponseCacheV1_1, response_cachev1_1
+
+
+
+def counted_response(body: bytes, calls: list[bytes], cache_control: str|None = None) -> Response:
+    calls.append(body)
+    response: Response = Response(status_code=200, status_text="OK")
+    response.body = body
+    if cache_control is not None:
+        response.headers.set_single_value_header(name="Cache-Control", value=cache_control)
+    return response
+
+
+
+def test_responses_are_cached_and_revalidated(wsgi):
+    application: Chains = Chains()
+    cache: ResponseCacheV1_1 = ResponseCacheV1_1()
+    application.add_middleware(response_cachev1_1, cache=cache)
+    calls: list[bytes] = list()
+
+    @application.route(path="/items", method="GET")
+    def items(request: Request) -> Response:
+        return counted_response(b"items", calls)
+
+    _, headers, body = wsgi(application, "/items")
+    etag: str = dict(headers)["ETag"]
+    assert wsgi(application, "/items")[2] == body == b"items"
+    assert wsgi(application, "/items", headers={"If-None-Match": etag})[0].split()[0] == "304"
+    assert calls == [b"items"]
+    assert (cache.hits, cache.misses) == (2, 1)
+
+def test_branches_with_the_same_relative_path_do_not_share_entries(wsgi):
+    application: Chains = Chains()
+    cache: ResponseCacheV1_1 = ResponseCacheV1_1()
+    calls: list[bytes] = list()
+    for name in ("a", "b"):
+        branch: Branch = Branch()
+        branch.add_middleware(response_cachev1_1, cache=cache)
+        def items(request: Request, name: str = name) -> Response:
+            return counted_response(name.encode(), calls)
+        branch.route(path="/items", method="GET")(items)
+        application.add_branch(path=f"/{name}", branch=branch)
+
+    for _ in range(2):
+        assert wsgi(application, "/a/items")[2] == b"a"
+        assert wsgi(application, "/b/items")[2] == b"b"
+    assert calls == [b"a", b"b"]
+    cache.invalidate(path="/a/items")
+    assert wsgi(application, "/a/items")[2] == b"a"
+    assert wsgi(application, "/b/items")[2] == b"b"
+    assert calls == [b"a", b"b", b"a"]
+
+def test_malformed_max_age_uses_the_default_ttl(wsgi):
+    application: Chains = Chains()
+    application.add_middleware(response_cachev1_1, cache=ResponseCacheV1_1(default_ttl=60))
+    calls: list[bytes] = list()
+
+    @application.route(path="/items", method="GET")
+    def items(request: Request) -> Response:
+        return counted_response(b"items", calls, cache_control="max-age=\xb2")
+
+    for _ in range(2):
+        assert wsgi(application, "/items")[0].split()[0] == "200"
+    assert calls == [b"items"]
+
+@pytest.mark.parametrize("vary, expected_calls", [
+    ((), [b"a=1", b"a=2", b"a=1"]),
+    (("Cookie",), [b"a=1", b"a=2"])
+])
+def test_requests_with_cookies_are_only_cached_when_varying_on_them(wsgi, vary, expected_calls):
+    application: Chains = Chains()
+    application.add_middleware(response_cachev1_1, cache=ResponseCacheV1_1(vary=vary))
+    calls: list[bytes] = list()
+
+    @application.route(path="/session", method="GET")
+    def session(request: Request) -> Response:
+        return counted_response(request.headers.get_single_value_header(name="Cookie").encode(), calls)
+
+    for cookie in ("a=1", "a=2", "a=1"):
+        assert wsgi(application, "/session", headers={"Cookie": cookie})[2] == cookie.encode()
+    assert calls == expected_calls
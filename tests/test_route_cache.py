@@ -0,0 +1,23 @@
+from chains import Chains, Request, Response
+
+
+
+def test_resolutions_are_cached_except_for_not_found(wsgi):
+    application: Chains = Chains()
+
+    @application.route(path="/items/<int:item_id>", method="GET")
+    def item(request: Request) -> Response:
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = str(request.path_params["item_id"]).encode()
+        return response
+
+    application.freeze(route_cache_size=2)
+    for _ in range(2):
+        assert wsgi(application, "/items/1")[2] == b"1"
+        assert wsgi(application, "/items/1", method="POST")[0].split()[0] == "405"
+    assert (application.route_cache.hits, application.route_cache.misses) == (2, 2)
+    for path in ("/missing", "/items/x", "/items/1/x"):
+        assert wsgi(application, path)[0].split()[0] == "404"
+    assert application.route_cache.size == 2
+    assert wsgi(application, "/items/1")[2] == b"1"
+    assert application.route_cache.hits == 3
@@ -0,0 +1,84 @@
+from socket import create_connection, socket
+from threading import Thread
+from typing import Generator
+
+import pytest
+
+from chains import Chains, Request, Response
+from chains.src.exceptions import BadRequestException
+from chains.src.server import HTTPServer, parse_head
+
+
+
+@pytest.fixture
+def server() -> Generator[HTTPServer, None, None]:
+    application: Chains = Chains()
+
+    @application.route(path="/echo", method="POST")
+    def echo(request: Request) -> Response:
+        response: Response = Response(status_code=200, status_text="OK")
+        response.body = (request.body or b"") + b"|" + request.query_string.encode()
+        return response
+
+    server: HTTPServer = HTTPServer(app=application, port=0, threads=2)
+    thread: Thread = Thread(target=server.serve_forever)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+
+def exchange(server: HTTPServer, data: bytes) -> bytes:
+    # Sends the requests and reads until the server closes the connection
+    connection: socket = create_connection(server.server_address, timeout=5)
+    connection.sendall(data)
+    received: bytearray = bytearray()
+    while True:
+        chunk: bytes = connection.recv(65536)
+        if len(chunk) < 1:
+            break
+        received += chunk
+    connection.close()
+    return bytes(received)
+
+
+
+def test_parse_head():
+    method, path, query_string, version, headers = parse_head(
+        b"GET /a%20b/c?x=1&y=2 HTTP/1.1\r\nHost: example.com\r\nContent-Type: text/plain\r\nCookie: a=1\r\nCookie: b=2\r\nAccept: a\r\nAccept: b\r\nX_Dropped: 1"
+    )
+    assert (method, path, query_string, version) == ("GET", "/a b/c", "x=1&y=2", "HTTP/1.1")
+    assert headers == {"HTTP_HOST": "example.com", "CONTENT_TYPE": "text/plain", "HTTP_COOKIE": "a=1; b=2", "HTTP_ACCEPT": "a, b"}
+
+@pytest.mark.parametrize("head, status_code", [
+    (b"GET /\r\nHost: x", 400),
+    (b"GET / HTTP/2.0", 505),
+    (b"GET x HTTP/1.1", 400),
+    (b"GET / HTTP/1.1\r\nHost: x\r\n folded", 400),
+    (b"GET / HTTP/1.1\r\nBad Header: x", 400),
+    (b"GET / HTTP/1.1\r\nContent-Length: 1\r\nContent-Length: 2", 400)
+])
+def test_parse_head_rejects_malformed_heads(head, status_code):
+    with pytest.raises(BadRequestException) as exception:
+        parse_head(head)
+    assert exception.value.status_code == status_code
+
+def test_keep_alive_and_pipelined_requests(server):
+    received: bytes = exchange(server,
+        b"POST /echo?n=1 HTTP/1.1\r\nHost: x\r\nContent-Length: 3\r\n\r\nabc"
+        b"POST /echo?n=2 HTTP/1.1\r\nHost: x\r\nTransfer-Encoding: chunked\r\n\r\n2\r\nde\r\n1;ext=1\r\nf\r\n0\r\n\r\n"
+        b"POST /echo?n=3 HTTP/1.1\r\nHost: x\r\nContent-Length: 0\r\nConnection: close\r\n\r\n"
+    )
+    assert received.count(b"HTTP/1.1 200 OK\r\n") == 3
+    assert received.index(b"abc|n=1") < received.index(b"def|n=2") < received.index(b"|n=3")
+
+@pytest.mark.parametrize("headers, status", [
+    (b"Content-Length: \xb2\r\n", b"400"),
+    (b"Content-Length: -1\r\n", b"400"),
+    (b"Content-Length: 1\r\nTransfer-Encoding: chunked\r\n", b"400"),
+    (b"Transfer-Encoding: gzip\r\n", b"501"),
+    (b"Transfer-Encoding: chunked\r\n\r\nzz\r\n", b"400")
+])
+def test_malformed_requests_get_error_responses(server, headers, status):
+    received: bytes = exchange(server, b"POST /echo HTTP/1.1\r\nHost: x\r\n" + headers + b"\r\n")
+    assert received.startswith(b"HTTP/1.1 " + status + b" ")
+    assert b"\r\nConnection: close\r\n" in received
@@ -0,0 +1,119 @@
+from pathlib import Path
+from subprocess import CompletedProcess, run
+from sys import executable
+from threading import Barrier, Thread
+from time import sleep
+from typing import Callable
+
+from chains import Chains, Branch, Request, Response
+from chains.src.single_flight import SingleFlight, single_flightv1_1
+
+
+
+def run_concurrently(requests: list[Callable[[], object]]) -> list[object]:
+    results: list[object] = [None] * len(requests)
+    barrier: Barrier = Barrier(len(requests))
+    def run(index: int) -> None:
+        barrier.wait()
+        results[index] = requests[index]()
+    threads: list[Thread] = [Thread(target=run, args=(index,)) for index in range(len(requests))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def slow_response(body: bytes) -> Response:
+    # Keeps the first request in flight long enough for the others to join it
+    sleep(0.2)
+    response: Response = Response(status_code=200, status_text="OK")
+    response.body = body
+    return response
+
+
+
+def test_identical_requests_are_coalesced(wsgi):
+    application: Chains = Chains()
+    single_flight: SingleFlight = SingleFlight()
+    application.add_middleware(single_flightv1_1, single_flight=single_flight)
+    calls: list[int] = list()
+
+    @application.route(path="/items", method="GET")
+    def items(request: Request) -> Response:
+        calls.append(1)
+        return slow_response(b"items")
+    application.freeze()
+
+    results = run_concurrently([lambda: wsgi(application, "/items")] * 8)
+    assert {body for _, _, body in results} == {b"items"}
+    assert len(calls) == 1
+    assert single_flight.coalesced == 7
+
+def test_requests_with_different_cookies_are_not_coalesced(wsgi):
+    application: Chains = Chains()
+    single_flight: SingleFlight = SingleFlight()
+    application.add_middleware(single_flightv1_1, single_flight=single_flight)
+
+    @application.route(path="/me", method="GET")
+    def me(request: Request) -> Response:
+        return slow_response(f"profile of {request.headers.get_single_value_header('Cookie')}".encode())
+    application.freeze()
+
+    results = run_concurrently([
+        lambda: wsgi(application, "/me", headers={"Cookie": "session=alice"}),
+        lambda: wsgi(application, "/me", headers={"Cookie": "session=bob"})
+    ])
+    assert [body for _, _, body in results] == [b"profile of session=alice", b"profile of session=bob"]
+    assert single_flight.coalesced == 0
+
+def test_cookies_in_vary_are_part_of_the_key(wsgi):
+    application: Chains = Chains()
+    single_flight: SingleFlight = SingleFlight(vary=("Cookie",))
+    application.add_middleware(single_flightv1_1, single_flight=single_flight)
+
+    @application.route(path="/me", method="GET")
+    def me(request: Request) -> Response:
+        return slow_response(f"profile of {request.headers.get_single_value_header('Cookie')}".encode())
+    application.freeze()
+
+    results = run_concurrently([
+        lambda: wsgi(application, "/me", headers={"Cookie": "session=alice"}),
+        lambda: wsgi(application, "/me", headers={"Cookie": "session=bob"}),
+        lambda: wsgi(application, "/me", headers={"Cookie": "session=bob"})
+    ])
+    assert [body for _, _, body in results] == [b"profile of session=alice", b"profile of session=bob", b"profile of session=bob"]
+    assert single_flight.coalesced == 1
+
+def test_branches_with_the_same_relative_path_do_not_share_flights(wsgi):
+    application: Chains = Chains()
+    single_flight: SingleFlight = SingleFlight()
+    for name in ("a", "b"):
+        branch: Branch = Branch()
+        branch.add_middleware(single_flightv1_1, single_flight=single_flight)
+        def items(request: Request, name: str = name) -> Response:
+            return slow_response(name.encode())
+        branch.route(path="/items", method="GET")(items)
+        application.add_branch(path=f"/{name}", branch=branch)
+    application.freeze()
+
+    results = run_concurrently([
+        lambda: wsgi(application, "/a/items"),
+        lambda: wsgi(application, "/b/items")
+    ])
+    assert [body for _, _, body in results] == [b"a", b"b"]
+
+def test_wsgi_applications_do_not_import_asyncio():
+    # Run in a fresh interpreter, the other tests may have imported asyncio already
+    code: str = (
+        "import sys\n"
+        "from chains import Chains, Request, Response\n"
+        "from chains.src.single_flight import SingleFlight, single_flightv1_1\n"
+        "from chains.tests.conftest import call_wsgi\n"
+        "application = Chains()\n"
+        "application.add_middleware(single_flightv1_1, single_flight=SingleFlight())\n"
+        "application.route(path='/items', method='GET')(lambda request: Response(status_code=200, status_text='OK'))\n"
+        "assert call_wsgi(application, '/items')[0].startswith('200')\n"
+        "assert 'asyncio' not in sys.modules, 'asyncio was imported'\n"
+    )
+    completed: CompletedProcess = run([executable, "-c", code], cwd=str(Path(__file__).resolve().parents[2]), capture_output=True, text=True)
+    assert completed.returncode == 0, completed.stderr
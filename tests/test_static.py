@@ -0,0 +1,65 @@
+import gzip
+from pathlib import Path
+
+import pytest
+
+from chains import Chains, StaticBranch
+
+
+
+@pytest.fixture
+def static(tmp_path: Path) -> tuple[Chains, Path]:
+    public: Path = tmp_path / "public"
+    public.mkdir()
+    (public / "app.js").write_bytes(b"console.log(1)")
+    (public / "app.js.gz").write_bytes(gzip.compress(b"console.log(1)"))
+    (public / "index.html").write_bytes(b"<html></html>")
+    (public / "docs").mkdir()
+    secret: Path = tmp_path / "secret.txt"
+    secret.write_bytes(b"secret")
+    application: Chains = Chains()
+    application.add_branch("/static", StaticBranch(directory=str(public)))
+    return application, public
+
+def status(response: tuple) -> str:
+    return response[0].split()[0]
+
+
+
+def test_files_are_served(wsgi, static):
+    application, _ = static
+    assert wsgi(application, "/static/app.js")[2] == b"console.log(1)"
+    assert wsgi(application, "/static/")[2] == b"<html></html>"
+    _, headers, body = wsgi(application, "/static/app.js", headers={"Accept-Encoding": "gzip"})
+    assert ("Content-Encoding", "gzip") in headers
+    assert gzip.decompress(body) == b"console.log(1)"
+    assert status(wsgi(application, "/static/../secret.txt")) == "404"
+
+def test_links_out_of_the_directory_are_not_followed(wsgi, static):
+    application, public = static
+    secret: Path = public.parent / "secret.txt"
+    (public / "linked.txt").symlink_to(secret)
+    (public / "docs" / "index.html").symlink_to(secret)
+    # A compressed sibling that points outside of the directory
+    (public / "style.css").write_bytes(b"body {}")
+    (public / "style.css.gz").symlink_to(secret)
+    assert status(wsgi(application, "/static/linked.txt")) == "404"
+    assert status(wsgi(application, "/static/docs/")) == "404"
+    status_line, headers, body = wsgi(application, "/static/style.css", headers={"Accept-Encoding": "gzip"})
+    assert status_line.split()[0] == "200"
+    assert body == b"body {}"
+    assert ("Content-Encoding", "gzip") not in headers
+
+@pytest.mark.parametrize("range_header, expected_status, expected_body", [
+    ("bytes=0-6", "206", b"console"),
+    ("bytes=-3", "206", b"(1)"),
+    ("bytes=100-", "416", None),
+    ("bytes=\xb2-", "200", b"console.log(1)"),
+    ("bytes=-\xb2", "416", None)
+])
+def test_ranges(wsgi, static, range_header, expected_status, expected_body):
+    application, _ = static
+    status_line, _, body = wsgi(application, "/static/app.js", headers={"Range": range_header})
+    assert status_line.split()[0] == expected_status
+    if expected_body is not None:
+        assert body == expected_body